@@ -0,0 +1,57 @@
+"""Add llm_question_cache table
+
+Revision ID: 0c5a8e3f7d14
+Revises: 7b2e4d9a1f36
+Create Date: 2026-10-19 16:41:37.512093
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0c5a8e3f7d14"
+down_revision = "7b2e4d9a1f36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_question_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("canvas_course_id", sa.Integer(), nullable=True),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("normalized_question", sa.String(), nullable=False),
+        sa.Column("question", sa.Text(), nullable=False),
+        sa.Column("answer", sa.Text(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_llm_question_cache_id"), "llm_question_cache", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_llm_question_cache_canvas_course_id"),
+        "llm_question_cache",
+        ["canvas_course_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_llm_question_cache_scope",
+        "llm_question_cache",
+        ["user_id", "canvas_course_id", "model"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_question_cache_scope", table_name="llm_question_cache")
+    op.drop_index(op.f("ix_llm_question_cache_canvas_course_id"), table_name="llm_question_cache")
+    op.drop_index(op.f("ix_llm_question_cache_id"), table_name="llm_question_cache")
+    op.drop_table("llm_question_cache")
@@ -0,0 +1,32 @@
+"""Add retention and dedup indexes to sync_runs and notification_logs
+
+Revision ID: 4f1d6c8b2a97
+Revises: 0c5a8e3f7d14
+Create Date: 2026-10-19 18:02:11.408153
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4f1d6c8b2a97"
+down_revision = "0c5a8e3f7d14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_sync_runs_started_at", "sync_runs", ["started_at"], unique=False)
+    op.create_index(
+        "ix_notification_logs_dedup",
+        "notification_logs",
+        ["user_id", "notification_type", "sent_at"],
+        unique=False,
+    )
+    op.create_index("ix_notification_logs_sent_at", "notification_logs", ["sent_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_logs_sent_at", table_name="notification_logs")
+    op.drop_index("ix_notification_logs_dedup", table_name="notification_logs")
+    op.drop_index("ix_sync_runs_started_at", table_name="sync_runs")
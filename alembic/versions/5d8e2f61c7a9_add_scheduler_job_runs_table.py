@@ -0,0 +1,46 @@
+"""Add scheduler_job_runs table for job run history
+
+Revision ID: 5d8e2f61c7a9
+Revises: a3c91e7d4b20
+Create Date: 2026-10-19 10:02:17.845130
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d8e2f61c7a9"
+down_revision = "a3c91e7d4b20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_job_runs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("job_key", sa.String(), nullable=False),
+        sa.Column("outcome", sa.String(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_ms", sa.Float(), nullable=True),
+        sa.Column("overlapped", sa.Boolean(), nullable=True),
+        sa.Column("exception", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_scheduler_job_runs_id"), "scheduler_job_runs", ["id"], unique=False)
+    op.create_index(
+        "ix_scheduler_job_runs_key_finished",
+        "scheduler_job_runs",
+        ["job_key", "finished_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scheduler_job_runs_key_finished", table_name="scheduler_job_runs")
+    op.drop_index(op.f("ix_scheduler_job_runs_id"), table_name="scheduler_job_runs")
+    op.drop_table("scheduler_job_runs")
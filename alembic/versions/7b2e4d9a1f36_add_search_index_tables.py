@@ -0,0 +1,69 @@
+"""Add search index tables
+
+Revision ID: 7b2e4d9a1f36
+Revises: e91f0a6b2c58
+Create Date: 2026-10-19 15:02:11.208417
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7b2e4d9a1f36"
+down_revision = "e91f0a6b2c58"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "search_passages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("source_type", sa.String(), nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=False),
+        sa.Column("canvas_course_id", sa.Integer(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_search_passages_id"), "search_passages", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_search_passages_canvas_course_id"),
+        "search_passages",
+        ["canvas_course_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_search_passages_source", "search_passages", ["source_type", "source_id"], unique=False
+    )
+    op.create_table(
+        "search_postings",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("term", sa.String(), nullable=False),
+        sa.Column("passage_id", sa.Integer(), nullable=False),
+        sa.Column("term_frequency", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["passage_id"], ["search_passages.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_search_postings_term", "search_postings", ["term"], unique=False)
+    op.create_index(
+        op.f("ix_search_postings_passage_id"), "search_postings", ["passage_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_search_postings_passage_id"), table_name="search_postings")
+    op.drop_index("ix_search_postings_term", table_name="search_postings")
+    op.drop_table("search_postings")
+    op.drop_index("ix_search_passages_source", table_name="search_passages")
+    op.drop_index(op.f("ix_search_passages_canvas_course_id"), table_name="search_passages")
+    op.drop_index(op.f("ix_search_passages_id"), table_name="search_passages")
+    op.drop_table("search_passages")
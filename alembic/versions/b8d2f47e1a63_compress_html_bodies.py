@@ -0,0 +1,81 @@
+"""Store syllabus and description HTML compressed, with cleaned plain text
+
+Revision ID: b8d2f47e1a63
+Revises: 4f1d6c8b2a97
+Create Date: 2026-10-19 19:14:37.520918
+
+"""
+
+import zlib
+
+import sqlalchemy as sa
+
+from alembic import op
+from backend.utils.text import html_to_text
+
+# revision identifiers, used by Alembic.
+revision = "b8d2f47e1a63"
+down_revision = "4f1d6c8b2a97"
+branch_labels = None
+depends_on = None
+
+# (table, raw HTML column, compressed column, plain text column)
+BODIES = (
+    ("courses", "syllabus_body", "syllabus_body_zlib", "syllabus_text"),
+    ("assignments", "description", "description_zlib", "description_text"),
+)
+BATCH_SIZE = 500
+
+
+def _copy_in_batches(table: str, source: str, targets: dict) -> None:
+    """Fill each target column with its function of `source`, `BATCH_SIZE` rows at a time."""
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT id, {source} FROM {table} "  # noqa: S608 (module constants)
+                f"WHERE id > :last_id AND {source} IS NOT NULL ORDER BY id LIMIT {BATCH_SIZE}"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            return
+        assignments = ", ".join(f"{column} = :{column}" for column in targets)
+        bind.execute(
+            sa.text(f"UPDATE {table} SET {assignments} WHERE id = :id"),  # noqa: S608
+            [
+                {"id": row_id, **{column: fn(value) for column, fn in targets.items()}}
+                for row_id, value in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    for table, raw, compressed, text in BODIES:
+        op.add_column(table, sa.Column(compressed, sa.LargeBinary(), nullable=True))
+        op.add_column(table, sa.Column(text, sa.Text(), nullable=True))
+        _copy_in_batches(
+            table,
+            raw,
+            {
+                compressed: lambda value: zlib.compress(value.encode("utf-8"), 6),
+                text: lambda value: html_to_text(value) or None,
+            },
+        )
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column(raw)
+
+
+def downgrade() -> None:
+    for table, raw, compressed, text in BODIES:
+        op.add_column(table, sa.Column(raw, sa.Text(), nullable=True))
+        _copy_in_batches(
+            table,
+            compressed,
+            {raw: lambda value: zlib.decompress(value).decode("utf-8")},
+        )
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column(text)
+            batch.drop_column(compressed)
@@ -0,0 +1,59 @@
+"""Add llm_analysis_cache table
+
+Revision ID: c47b19e0f3d2
+Revises: 5d8e2f61c7a9
+Create Date: 2026-10-19 11:20:54.660312
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c47b19e0f3d2"
+down_revision = "5d8e2f61c7a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_analysis_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("operation", sa.String(), nullable=False),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("prompt_version", sa.String(), nullable=False),
+        sa.Column("input_hash", sa.String(length=64), nullable=False),
+        sa.Column("scope", sa.String(), nullable=True),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_accessed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_llm_analysis_cache_cache_key"), "llm_analysis_cache", ["cache_key"], unique=True
+    )
+    op.create_index(op.f("ix_llm_analysis_cache_id"), "llm_analysis_cache", ["id"], unique=False)
+    op.create_index(
+        op.f("ix_llm_analysis_cache_scope"), "llm_analysis_cache", ["scope"], unique=False
+    )
+    op.create_index(
+        op.f("ix_llm_analysis_cache_last_accessed_at"),
+        "llm_analysis_cache",
+        ["last_accessed_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_llm_analysis_cache_last_accessed_at"), table_name="llm_analysis_cache")
+    op.drop_index(op.f("ix_llm_analysis_cache_scope"), table_name="llm_analysis_cache")
+    op.drop_index(op.f("ix_llm_analysis_cache_id"), table_name="llm_analysis_cache")
+    op.drop_index(op.f("ix_llm_analysis_cache_cache_key"), table_name="llm_analysis_cache")
+    op.drop_table("llm_analysis_cache")
@@ -0,0 +1,28 @@
+"""Add worker id and heartbeat to jobs so restarts only requeue abandoned jobs
+
+Revision ID: d5a17c3e9b42
+Revises: b8d2f47e1a63
+Create Date: 2026-10-19 21:02:18.604113
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5a17c3e9b42"
+down_revision = "b8d2f47e1a63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("worker_id", sa.String(), nullable=True))
+    op.add_column("jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("jobs") as batch:
+        batch.drop_column("heartbeat_at")
+        batch.drop_column("worker_id")
@@ -0,0 +1,32 @@
+"""Add syllabus summary status columns to courses
+
+Revision ID: e91f0a6b2c58
+Revises: c47b19e0f3d2
+Create Date: 2026-10-19 12:41:08.209514
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e91f0a6b2c58"
+down_revision = "c47b19e0f3d2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("courses", sa.Column("syllabus_summary_status", sa.String(), nullable=True))
+    op.add_column("courses", sa.Column("syllabus_summary_error", sa.Text(), nullable=True))
+    op.add_column(
+        "courses",
+        sa.Column("syllabus_summary_updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("courses", "syllabus_summary_updated_at")
+    op.drop_column("courses", "syllabus_summary_error")
+    op.drop_column("courses", "syllabus_summary_status")
@@ -1,22 +1,27 @@
 
+import json
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.orm import Session
 
-from backend.db.session import get_db
-from backend.models import User
-from backend.services.ai_service import CanvasAIService, get_ai_service
+from backend.config import get_settings
+from backend.db.routing import get_read_db, read_router
+from backend.db.session import engine, get_db, pool_stats, replica_engine
+from backend.models import Course, User
+from backend.services.ai_service import CanvasAIService, get_ai_read_service, get_ai_service
 from backend.services.canvas_client import (
     get_all_assignments,
     get_user_courses,
     get_all_user_courses,
 )
-from backend.services.mock_llm_service import (
-    MockCanvasLLMService,
-    get_mock_llm_service,
-)
-from backend.services.scheduler_service import get_scheduler_service
+from backend.services.job_history import load_job_runs, summarize_runs
+from backend.services.job_queue import JobQueue, get_job_queue, serialize_job
+from backend.services.llm_backend import LLMService, llm_service_for
+from backend.services.llm_dispatcher import get_llm_dispatcher
+from backend.services.response_cache import get_response_cache
 from backend.services.sync_service import CanvasSyncService, get_sync_service
+from backend.services.telemetry import CONTENT_TYPE, REGISTRY
 
 router = APIRouter()
 
@@ -138,19 +143,26 @@ def sync_assignments(
 # AI-powered routes
 @router.get("/ai/deadlines")
 def get_upcoming_deadlines(
-    days_ahead: int = 7, user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_service)
+    days_ahead: int = 7,
+    user_id: int = 1,
+    ai_service: CanvasAIService = Depends(get_ai_read_service),
 ):
     """Get upcoming assignment deadlines with AI insights."""
     try:
-        deadlines = ai_service.get_upcoming_deadlines(user_id, days_ahead)
-        return {"deadlines": deadlines, "count": len(deadlines)}
+        def compute():
+            deadlines = ai_service.get_upcoming_deadlines(user_id, days_ahead)
+            return {"deadlines": deadlines, "count": len(deadlines)}
+
+        return get_response_cache().get_or_compute(
+            "ai_deadlines", user_id, {"days_ahead": days_ahead}, compute
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/ai/overdue")
 def get_overdue_assignments(
-    user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_service)
+    user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_read_service)
 ):
     """Get overdue assignments."""
     try:
@@ -161,23 +173,33 @@ def get_overdue_assignments(
 
 
 @router.get("/ai/workload")
-def get_workload_analysis(user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_service)):
+def get_workload_analysis(
+    user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_read_service)
+):
     """Get course workload analysis."""
     try:
-        workload = ai_service.get_course_workload_analysis(user_id)
-        return {"course_workload": workload}
+        return get_response_cache().get_or_compute(
+            "ai_workload",
+            user_id,
+            {},
+            lambda: {"course_workload": ai_service.get_course_workload_analysis(user_id)},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/ai/recommendations")
 def get_study_recommendations(
-    user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_service)
+    user_id: int = 1, ai_service: CanvasAIService = Depends(get_ai_read_service)
 ):
     """Get AI-powered study recommendations."""
     try:
-        recommendations = ai_service.generate_study_recommendations(user_id)
-        return {"recommendations": recommendations}
+        return get_response_cache().get_or_compute(
+            "ai_recommendations",
+            user_id,
+            {},
+            lambda: {"recommendations": ai_service.generate_study_recommendations(user_id)},
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -204,10 +226,10 @@ def create_deadline_notification(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# LLM-powered intelligence routes (using mock service for demo)
+# LLM-powered intelligence routes (mock or real service per route, see LLM_BACKEND)
 @router.post("/llm/syllabus/{course_id}")
 def analyze_syllabus(
-    course_id: int, llm_service: MockCanvasLLMService = Depends(get_mock_llm_service)
+    course_id: int, llm_service: LLMService = Depends(llm_service_for("syllabus"))
 ):
     """Analyze and summarize course syllabus using LLM."""
     try:
@@ -217,9 +239,31 @@ def analyze_syllabus(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/llm/syllabus/status")
+def get_syllabus_summary_status(db: Session = Depends(get_read_db)):
+    """Get background syllabus summary status (pending, ready, failed) per course."""
+    courses = db.query(Course).order_by(Course.canvas_course_id).all()
+    return {
+        "courses": [
+            {
+                "course_id": course.canvas_course_id,
+                "course_name": course.name,
+                "status": course.syllabus_summary_status,
+                "error": course.syllabus_summary_error,
+                "updated_at": (
+                    course.syllabus_summary_updated_at.isoformat()
+                    if course.syllabus_summary_updated_at
+                    else None
+                ),
+            }
+            for course in courses
+        ]
+    }
+
+
 @router.post("/llm/assignment/{assignment_id}")
 def analyze_assignment(
-    assignment_id: int, llm_service: MockCanvasLLMService = Depends(get_mock_llm_service)
+    assignment_id: int, llm_service: LLMService = Depends(llm_service_for("assignment"))
 ):
     """Analyze assignment content and provide insights using LLM."""
     try:
@@ -229,11 +273,33 @@ def analyze_assignment(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/llm/course/{course_id}/assignments/analyze")
+def analyze_course_assignments(
+    course_id: int,
+    max_concurrency: Optional[int] = None,
+    llm_service: LLMService = Depends(llm_service_for("course_assignments")),
+):
+    """Analyze all assignments in a course, streaming NDJSON results as they complete.
+
+    Already-cached analyses are returned first; the final line is a run summary.
+    """
+    try:
+        results = llm_service.analyze_course_assignments(course_id, max_concurrency)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def _ndjson():
+        for result in results:
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
 @router.post("/llm/study-plan")
 def generate_study_plan(
     user_id: int = 1,
     days_ahead: int = 14,
-    llm_service: MockCanvasLLMService = Depends(get_mock_llm_service),
+    llm_service: LLMService = Depends(llm_service_for("study_plan")),
 ):
     """Generate AI-powered personalized study plan."""
     try:
@@ -248,7 +314,7 @@ def ask_question(
     question: str,
     user_id: int = 1,
     context_course_id: Optional[int] = None,
-    llm_service: MockCanvasLLMService = Depends(get_mock_llm_service),
+    llm_service: LLMService = Depends(llm_service_for("ask")),
 ):
     """Ask questions about coursework with AI-powered responses."""
     try:
@@ -258,61 +324,147 @@ def ask_question(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/llm/ask/stream")
+def ask_question_stream(
+    question: str,
+    user_id: int = 1,
+    context_course_id: Optional[int] = None,
+    llm_service: LLMService = Depends(llm_service_for("ask_stream")),
+):
+    """Stream an answer as Server-Sent Events.
+
+    Emits `token` events as text is generated and a final `done` event with the full
+    answer and timing metadata (time to first token, total).
+    """
+    try:
+        events = llm_service.stream_answer(user_id, question, context_course_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def _sse():
+        for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+    return StreamingResponse(
+        _sse(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the browser as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/llm/dispatcher/stats")
+def get_llm_dispatcher_stats():
+    """Concurrency, rate limiting, queue depth and wait times of outbound LLM calls."""
+    return get_llm_dispatcher().stats()
+
+
+@router.get("/db/pool/stats")
+def get_db_pool_stats():
+    """Connection pool occupancy, checkout wait times and read routing for this process."""
+    return {
+        "primary": pool_stats(engine),
+        "replica": pool_stats(replica_engine) if replica_engine is not None else None,
+        "read_routing": read_router.stats(),
+    }
+
+
+@router.get("/cache/stats")
+def get_cache_stats():
+    """Hit rates, sync generation and size of the dashboard response cache."""
+    return get_response_cache().stats()
+
+
+@router.get("/internal/metrics", include_in_schema=False)
+def get_internal_metrics():
+    """Operational metrics of this process in the Prometheus text format."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # Scheduler and automation routes
 @router.get("/scheduler/status")
-def get_scheduler_status():
-    """Get status of all scheduled jobs."""
+def get_scheduler_status(
+    job_queue: JobQueue = Depends(get_job_queue), db: Session = Depends(get_read_db)
+):
+    """Get status of scheduled jobs, their run history and the background job queue."""
     try:
-        scheduler = get_scheduler_service()
-        jobs = scheduler.get_job_status()
-        return {"scheduler_status": "running", "jobs": jobs}
+        if get_settings().run_scheduler_in_api:
+            from backend.services.scheduler_service import get_scheduler_service
+
+            scheduler = get_scheduler_service()
+            return {
+                "scheduler_status": "running",
+                "jobs": scheduler.get_job_status(),
+                "history": scheduler.history.summary(),
+                "queue": job_queue.stats(),
+            }
+        # The worker owns the scheduler; read its persisted run history instead
+        return {
+            "scheduler_status": "external",
+            "jobs": [],
+            "history": summarize_runs(load_job_runs(db)),
+            "queue": job_queue.stats(),
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/scheduler/sync-now")
-def trigger_manual_sync():
-    """Manually trigger a sync job."""
+def trigger_manual_sync(user_id: int = 1, job_queue: JobQueue = Depends(get_job_queue)):
+    """Queue a full sync for the background worker."""
     try:
-        scheduler = get_scheduler_service()
-        result = scheduler.trigger_sync_now()
-        return result
+        job = job_queue.enqueue("full_sync", {"user_id": user_id}, user_id=user_id)
+        return {"status": "success", "message": "Manual sync queued", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/jobs/{job_id}")
+def get_job(job_id: int, job_queue: JobQueue = Depends(get_job_queue)):
+    """Get the status and result of a background job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return serialize_job(job)
+
+
 # Metrics endpoint for dashboard
 @router.get("/metrics")
 def get_metrics():
     """Get dashboard metrics and counts."""
     try:
-        # Get current counts
-        courses = get_all_user_courses()
-        assignments = get_all_assignments()
-        
-        # Count upcoming deadlines (next 7 days)
-        from datetime import datetime, timedelta
-        now = datetime.utcnow()
-        next_week = now + timedelta(days=7)
-        
-        deadlines = 0
-        for assignment in assignments:
-            if assignment.get('due_at'):
-                try:
-                    due_date = datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00'))
-                    if now <= due_date <= next_week:
-                        deadlines += 1
-                except (ValueError, TypeError):
-                    continue
-        
-        # Get scheduled jobs count (simplified to avoid type issues)
-        scheduled_jobs = 3  # Fixed count for now - there are typically 3 main scheduled jobs
-        
-        return {
-            "courses": len(courses),
-            "assignments": len(assignments),
-            "deadlines": deadlines,
-            "scheduled_jobs": scheduled_jobs
-        }
+        return get_response_cache().get_or_compute("metrics", None, {}, _dashboard_metrics)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _dashboard_metrics():
+    """Counts for the dashboard; fetched live from Canvas, so cached by the route."""
+    # Get current counts
+    courses = get_all_user_courses()
+    assignments = get_all_assignments()
+    
+    # Count upcoming deadlines (next 7 days)
+    from datetime import datetime, timedelta
+    now = datetime.utcnow()
+    next_week = now + timedelta(days=7)
+    
+    deadlines = 0
+    for assignment in assignments:
+        if assignment.get('due_at'):
+            try:
+                due_date = datetime.fromisoformat(assignment['due_at'].replace('Z', '+00:00'))
+                if now <= due_date <= next_week:
+                    deadlines += 1
+            except (ValueError, TypeError):
+                continue
+    
+    # Get scheduled jobs count (simplified to avoid type issues)
+    scheduled_jobs = 3  # Fixed count for now - there are typically 3 main scheduled jobs
+    
+    return {
+        "courses": len(courses),
+        "assignments": len(assignments),
+        "deadlines": deadlines,
+        "scheduled_jobs": scheduled_jobs
+    }
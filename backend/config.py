@@ -5,7 +5,8 @@ from dotenv import load_dotenv
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load environment variables from .env when present
+# The one place .env is loaded into os.environ, for libraries that read it directly;
+# Settings reads the same file itself
 load_dotenv()
 
 
@@ -19,7 +20,114 @@ class Settings(BaseSettings):
     canvas_api_url: Optional[str] = None
     canvas_api_key: Optional[str] = None
     openai_api_key: Optional[str] = None
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint override
     database_url: Optional[str] = None
+    database_replica_url: Optional[str] = None  # optional read replica for dashboard queries
+    # How long read routing trusts its cached latest finished sync id on the primary
+    database_replica_sync_ttl_seconds: float = 5.0
+
+    # Database engine and connection pool
+    db_echo: bool = False
+    db_connection_budget: int = 60  # connections across the API, worker and its job processes
+    db_pool_size: int = 0  # per process; 0 splits the budget across processes
+    db_max_overflow: int = -1  # per process; -1 splits the budget across processes
+    db_pool_timeout_seconds: float = 10.0  # wait for a free connection before failing
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 30000  # Postgres only; 0 disables
+    sqlite_wal: bool = True
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size_mb: int = 256
+
+    # Background worker
+    run_scheduler_in_api: bool = False  # legacy single-process mode
+    worker_processes: int = 2
+    worker_poll_interval_seconds: int = 5
+    worker_id: Optional[str] = None  # stable id (e.g. pod name); defaults to host and pid
+    job_lease_seconds: int = 300  # running jobs without a heartbeat this long are requeued
+
+    # Per-user sync scheduling
+    sync_window_start_hour: int = 6
+    sync_window_minutes: int = 60  # user syncs are spread across this window
+    sync_max_concurrency: int = 2  # max user syncs running at once
+
+    # Retention of history tables (run daily by the worker); 0 keeps rows forever
+    retention_sync_runs_days: int = 30
+    retention_notification_logs_days: int = 90
+    retention_scheduler_job_runs_days: int = 14
+    retention_batch_size: int = 1000  # rows deleted per transaction
+    retention_max_seconds: float = 60.0  # time budget per run; leftovers go next run
+    retention_archive_dir: Optional[str] = None  # write removed rows as gzipped JSON lines
+    retention_hour: int = 3
+
+    # Dashboard response cache; REDIS_URL shares it and its sync generation across processes
+    redis_url: Optional[str] = None
+    response_cache_enabled: bool = True
+    response_cache_ttl_seconds: int = 120  # bounds staleness of "days until due" and the like
+    response_cache_max_entries: int = 1000  # in-process tier
+
+    # Columnar assignment snapshot for analytics (needs numpy); off computes them in SQL
+    analytics_snapshot_enabled: bool = False
+    analytics_snapshot_max_age_seconds: int = 300  # also rebuilt when a sync finishes
+
+    # SQL statement auditing per request and job, to catch N+1 queries
+    query_audit_mode: str = "warn"  # off, warn, or raise (used by the test suite)
+    query_audit_repeat_threshold: int = 10  # same statement shape more often is an N+1
+    query_audit_header: bool = False  # dev: X-DB-Queries and X-DB-Time-Ms response headers
+
+    # Scheduler run history
+    scheduler_history_size: int = 500  # in-memory ring buffer of job runs
+    scheduler_history_persist: bool = True  # also write runs to scheduler_job_runs
+
+    # Shared LLM HTTP client and dispatcher
+    llm_http_max_connections: int = 20
+    llm_request_timeout_seconds: float = 60.0
+    llm_max_concurrency: int = 8  # concurrent LLM calls per process
+    llm_requests_per_minute: int = 0  # 0 disables rate limiting
+    llm_queue_timeout_seconds: float = 30.0  # max wait for a slot before failing
+
+    # LLM backend per route: "mock" or "real", with overrides such as "ask=real,ask_stream=real"
+    llm_backend: str = "mock"
+    llm_backend_routes: str = ""
+
+    # Simulated model behaviour of the mock backend, for load testing (off by default)
+    mock_llm_latency_ms: float = 0.0  # median latency per call (time to first token)
+    mock_llm_latency_distribution: str = "fixed"  # fixed, uniform or lognormal
+    mock_llm_latency_spread: float = 0.5  # uniform: +/- fraction of median; lognormal: sigma
+    mock_llm_tokens_per_second: float = 0.0  # streaming pace; 0 streams instantly
+    mock_llm_error_rate: float = 0.0  # fraction of calls that fail after the latency
+    mock_llm_rate_limit_rate: float = 0.0  # fraction of calls rejected at once with a 429
+    mock_llm_seed: Optional[int] = None  # fixes the latency and fault sequence
+
+    # LLM analysis cache
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_hours: int = 24 * 7  # 0 disables expiry
+    llm_cache_max_entries: int = 5000
+    llm_batch_max_concurrency: int = 4  # concurrent model calls per batch request
+    # Prompt token budgets; syllabi over the single-prompt budget are map-reduced in chunks
+    llm_syllabus_token_budget: int = 3000
+    llm_chunk_token_budget: int = 1500
+    llm_assignment_token_budget: int = 600
+    llm_ask_context_token_budget: int = 1200  # retrieved course material per question
+
+    # Cache of answers to repeated student questions
+    question_cache_enabled: bool = True
+    question_cache_ttl_hours: int = 6  # answers to "what's due this week" go stale
+    question_cache_similarity: float = 0.8  # trigram Jaccard needed for a near-duplicate hit
+    question_cache_max_candidates: int = 200  # recent entries compared per lookup
+
+    # Study plans
+    study_plan_daily_hours: float = 4.0  # most study hours the planner puts on one day
+    study_plan_llm_tips: bool = True  # ask the LLM to phrase tips for the computed plan
+
+    # Local search index over synced course content
+    search_passage_tokens: int = 200
+    search_top_k: int = 8
+
+    # Background syllabus summarization after sync
+    syllabus_presummarize: bool = True
+    syllabus_summary_priority: int = 10  # queue priority; higher runs later
+    syllabus_summary_max_concurrency: int = 1
 
     # CORS
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"])
@@ -0,0 +1,110 @@
+"""
+Per-request and per-job SQL statement auditing.
+An engine hook counts statements and their time into the audit active in the current
+context, grouped by statement shape. A shape that repeats more than the threshold within
+one request or job is the signature of an N+1 query: it is logged in "warn" mode and
+raises `NPlusOneError` in "raise" mode, which the test suite uses.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+AUDIT_MODES = ("off", "warn", "raise")
+
+_current: ContextVar[Optional["QueryAudit"]] = ContextVar("query_audit", default=None)
+_PARAM = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)"
+_PARAM_LIST = re.compile(rf"\(\s*{_PARAM}(?:\s*,\s*{_PARAM})*\s*\)")
+_REPEATED_GROUPS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in "raise" mode when a statement shape repeats past the threshold."""
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace, IN lists and multi-row VALUES collapsed."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _REPEATED_GROUPS.sub("(?)", shape)
+
+
+class QueryAudit:
+    """Statement count, DB time and repeated shapes for one request or job."""
+
+    def __init__(self, label: str, threshold: int):
+        self.label = label
+        self.threshold = threshold
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        return [(s, n) for s, n in self.shapes.most_common() if n > self.threshold]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "queries": self.count,
+            "db_ms": round(self.total_ms, 1),
+            "repeated": [{"statement": s[:200], "count": n} for s, n in self.repeated()],
+        }
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        context._query_audit_started = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    audit = _current.get()
+    started = getattr(context, "_query_audit_started", None)
+    if audit is not None and started is not None:
+        audit.record(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_query_audit(engine: Engine) -> None:
+    """Attach the counting hooks; they cost a context lookup when no audit is active."""
+    if not event.contains(engine, "before_cursor_execute", _before_execute):
+        event.listen(engine, "before_cursor_execute", _before_execute)
+        event.listen(engine, "after_cursor_execute", _after_execute)
+
+
+@contextmanager
+def audit_queries(
+    label: str, mode: Optional[str] = None, threshold: Optional[int] = None
+) -> Iterator[QueryAudit]:
+    """Count statements run in this context; check for repeats on exit."""
+    settings = get_settings()
+    mode = mode or settings.query_audit_mode
+    audit = QueryAudit(label, threshold or settings.query_audit_repeat_threshold)
+    token = _current.set(audit)
+    try:
+        yield audit
+    finally:
+        _current.reset(token)
+    repeated = audit.repeated()
+    if not repeated or mode == "off":
+        return
+    statement, count = repeated[0]
+    message = f"Possible N+1 in {label}: statement ran {count} times: {statement[:200]}"
+    if mode == "raise":
+        raise NPlusOneError(message)
+    logger.warning(message)
@@ -0,0 +1,124 @@
+"""
+Read routing between the primary database and an optional replica.
+Read-only dependencies get a replica session only once the replica has caught up with
+the most recent finished sync on the primary; until then they read the primary, so a
+dashboard refreshed right after a sync never shows the pre-sync data. The primary's
+latest sync id is cached for a few seconds and dropped whenever a sync commits in this
+process, so most requests only query the replica.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, sessionmaker
+
+from backend.config import get_settings
+from backend.db.session import ReplicaSessionLocal, SessionLocal
+from backend.models import SyncRun
+
+logger = logging.getLogger(__name__)
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Raised when code tries to write through a read-routed session."""
+
+
+def _reject_writes(session, _flush_context, _instances) -> None:
+    if session.new or session.dirty or session.deleted:
+        raise ReadOnlySessionError("Read-only session: use get_db for writes")
+
+
+def _latest_finished_sync(session: Session) -> int:
+    return (
+        session.query(func.max(SyncRun.id)).filter(SyncRun.completed_at.isnot(None)).scalar() or 0
+    )
+
+
+class ReadRouter:
+    """Hands out read-only sessions from the replica when it is current, else the primary."""
+
+    def __init__(
+        self,
+        primary: sessionmaker,
+        replica: Optional[sessionmaker] = None,
+        sync_ttl_seconds: Optional[float] = None,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.sync_ttl_seconds = (
+            get_settings().database_replica_sync_ttl_seconds
+            if sync_ttl_seconds is None
+            else sync_ttl_seconds
+        )
+        self._lock = threading.Lock()
+        # (latest finished sync id on the primary, monotonic time it was read)
+        self._primary_latest: Optional[Tuple[int, float]] = None
+        self._counters = {"replica": 0, "primary_lagging": 0, "replica_unavailable": 0}
+
+    def session(self) -> Session:
+        session = self._route()
+        event.listen(session, "before_flush", _reject_writes)
+        return session
+
+    def _route(self) -> Session:
+        if self.replica is None:
+            return self.primary()
+
+        replica = self.replica()
+        try:
+            primary_latest = self.primary_latest_sync()
+            current = _latest_finished_sync(replica) >= primary_latest
+            # End the freshness check's transaction so the request sees a current snapshot
+            replica.rollback()
+        except Exception as e:
+            logger.warning(f"Replica check failed, reading from primary: {e}")
+            replica.close()
+            self._count("replica_unavailable")
+            return self.primary()
+
+        if current:
+            self._count("replica")
+            return replica
+        replica.close()
+        self._count("primary_lagging")
+        return self.primary()
+
+    def primary_latest_sync(self) -> int:
+        """Latest finished sync id on the primary, cached for `sync_ttl_seconds`."""
+        with self._lock:
+            cached = self._primary_latest
+        if cached is not None and time.monotonic() - cached[1] < self.sync_ttl_seconds:
+            return cached[0]
+        with self.primary() as primary:
+            latest = _latest_finished_sync(primary)
+        with self._lock:
+            self._primary_latest = (latest, time.monotonic())
+        return latest
+
+    def sync_finished(self) -> None:
+        """Drop the cached sync id so the next read checks the primary again."""
+        with self._lock:
+            self._primary_latest = None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"replica_configured": self.replica is not None, "reads": dict(self._counters)}
+
+
+read_router = ReadRouter(SessionLocal, ReplicaSessionLocal)
+
+
+def get_read_db():
+    """Dependency for read-only queries; routed to the replica when it is up to date."""
+    db = read_router.session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,19 +1,215 @@
+import logging
 import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Optional
 
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 
-from backend.config import get_settings
+from backend.config import Settings, get_settings
+from backend.db.query_audit import install_query_audit
+from backend.utils.stats import percentile
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
-DATABASE_URL = settings.database_url or os.getenv("DATABASE_URL") or "sqlite:///./dev.db"
+DATABASE_URL = settings.database_url or "sqlite:///./dev.db"
+DATABASE_REPLICA_URL = settings.database_replica_url
 
-engine = create_engine(DATABASE_URL, echo=False)
+
+class PoolStats:
+    """Checkout counters and wait times of one connection pool."""
+
+    def __init__(self, history_size: int = 500):
+        self._lock = threading.Lock()
+        self._waits_ms: Deque[float] = deque(maxlen=history_size)
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._waits_ms.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms": {
+                    "p50": percentile(waits, 50),
+                    "p95": percentile(waits, 95),
+                    "max": round(waits[-1], 1) if waits else None,
+                },
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.record_timeout()
+            logger.warning(f"Database pool exhausted: {self.status()}")
+            raise
+        self.stats.record_checkout((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats  # keep counters across engine.dispose()
+        return pool
+
+
+def _pool_limits(settings: Settings) -> tuple[int, int]:
+    """Per-process pool size and overflow, splitting the connection budget when unset.
+
+    Every process holds its own pool: the API, the worker, and the worker's job processes.
+    """
+    processes = 2 + settings.worker_processes + settings.sync_max_concurrency
+    per_process = max(2, settings.db_connection_budget // processes)
+    pool_size = settings.db_pool_size or max(1, per_process // 2)
+    max_overflow = (
+        settings.db_max_overflow
+        if settings.db_max_overflow >= 0
+        else max(0, per_process - pool_size)
+    )
+    return pool_size, max_overflow
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+
+
+def create_db_engine(url: str, settings: Optional[Settings] = None) -> Engine:
+    """Engine tuned for its dialect from settings.
+
+    SQLite connections may be used from scheduler threads and get WAL journaling (for
+    file databases), `synchronous=NORMAL`, memory-mapped I/O and a busy timeout. Other
+    databases get a sized pool with pre-ping and recycling; Postgres also gets a
+    server-side statement timeout.
+    """
+    settings = settings or get_settings()
+    parsed = make_url(url)
+
+    if parsed.get_backend_name() == "sqlite":
+        memory = _is_memory_sqlite(parsed)
+        if memory:
+            # One shared connection, otherwise each thread would see its own empty database
+            pool_options: dict[str, Any] = {"poolclass": StaticPool}
+        else:
+            pool_size, max_overflow = _pool_limits(settings)
+            pool_options = {
+                "poolclass": InstrumentedQueuePool,
+                "pool_size": pool_size,
+                "max_overflow": max_overflow,
+                "pool_timeout": settings.db_pool_timeout_seconds,
+            }
+        engine = create_engine(
+            url,
+            echo=settings.db_echo,
+            connect_args={"check_same_thread": False},
+            **pool_options,
+        )
+        event.listen(engine, "connect", _sqlite_pragmas(settings, wal=not memory))
+        install_query_audit(engine)
+        return engine
+
+    connect_args: dict[str, Any] = {}
+    if parsed.get_backend_name() == "postgresql" and settings.db_statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    pool_size, max_overflow = _pool_limits(settings)
+    engine = create_engine(
+        url,
+        echo=settings.db_echo,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    install_query_audit(engine)
+    return engine
+
+
+def _sqlite_pragmas(settings: Settings, wal: bool):
+    def _on_connect(dbapi_connection, _record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if wal and settings.sqlite_wal:
+                cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={settings.sqlite_mmap_size_mb * 1024 * 1024}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.sqlite_busy_timeout_ms}")
+        finally:
+            cursor.close()
+
+    return _on_connect
+
+
+def pool_stats(engine: Engine) -> dict[str, Any]:
+    """Pool occupancy plus checkout counts and wait times."""
+    pool = engine.pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(pool.stats.summary())
+    return stats
+
+
+engine = create_db_engine(DATABASE_URL, settings)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine: Optional[Engine] = (
+    create_db_engine(DATABASE_REPLICA_URL, settings) if DATABASE_REPLICA_URL else None
+)
+ReplicaSessionLocal: Optional[sessionmaker] = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None
+    else None
+)
+
+
+def _dispose_inherited_pools() -> None:
+    engine.dispose(close=False)
+    if replica_engine is not None:
+        replica_engine.dispose(close=False)
+
+
+# Connections inherited by forked job processes belong to the parent; start fresh pools
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_inherited_pools)
+
 
 def get_db():
     """Dependency to get database session."""
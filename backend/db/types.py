@@ -0,0 +1,30 @@
+"""
+Custom column types.
+"""
+
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed; Canvas HTML typically shrinks four- to eightfold."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, level: int = 6):
+        super().__init__()
+        self.level = level
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        if value is None:
+            return None
+        return zlib.compress(value.encode("utf-8"), self.level)
+
+    def process_result_value(self, value: Optional[bytes], dialect: Any) -> Optional[str]:
+        if value is None:
+            return None
+        return zlib.decompress(value).decode("utf-8")
@@ -1,15 +1,19 @@
 import logging
 import os
+import sys
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from backend.api.routes import router
 from backend.config import get_settings
-from backend.services.scheduler_service import initialize_scheduler, scheduler_service
+from backend.db.query_audit import audit_queries
+from backend.services.llm_client import close_clients
+from backend.services.telemetry import HTTP_REQUEST_SECONDS
 
 
 @asynccontextmanager
@@ -17,22 +21,30 @@ async def lifespan(app: FastAPI):
     logger = logging.getLogger("uvicorn.error")
     logger.info("🚀 Starting Canvas AI Labs Backend...")
 
-    # Initialize background scheduler
-    try:
-        initialize_scheduler()
-        logger.info("⏰ Background scheduler initialized")
-    except Exception as exc:
-        logger.exception("Failed to initialize background scheduler: %s", exc)
+    # Background jobs run in the worker process (`python -m backend.worker`);
+    # only start the scheduler here when explicitly running single-process.
+    # Imported only then: APScheduler is not needed by the API otherwise
+    if get_settings().run_scheduler_in_api:
+        try:
+            from backend.services.scheduler_service import initialize_scheduler
+
+            initialize_scheduler()
+            logger.info("⏰ Background scheduler initialized")
+        except Exception as exc:
+            logger.exception("Failed to initialize background scheduler: %s", exc)
 
     yield
 
     # Shutdown
     logger.info("🛑 Shutting down Canvas AI Labs Backend...")
     try:
-        if scheduler_service:
-            scheduler_service.shutdown()
+        # Only imported if startup created a scheduler
+        scheduler = sys.modules.get("backend.services.scheduler_service")
+        if scheduler and scheduler.scheduler_service:
+            scheduler.scheduler_service.shutdown()
     except Exception as exc:
         logger.exception("Error during scheduler shutdown: %s", exc)
+    close_clients()
     logger.info("✅ Shutdown complete")
 
 
@@ -54,6 +66,36 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def audit_request_queries(request: Request, call_next):
+    """Count SQL statements per request, flag N+1 patterns and report counts in dev."""
+    if settings.query_audit_mode == "off" and not settings.query_audit_header:
+        return await call_next(request)
+    with audit_queries(f"{request.method} {request.url.path}") as audit:
+        response = await call_next(request)
+    if settings.query_audit_header:
+        response.headers["X-DB-Queries"] = str(audit.count)
+        response.headers["X-DB-Time-Ms"] = f"{audit.total_ms:.1f}"
+    return response
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Request latency by route template, for /internal/metrics."""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Templates, not raw paths, keep ids and unknown URLs out of the label values
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started, method=request.method, route=route, status=status
+        )
+
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "message": "Canvas AI Labs Backend is running!"}
@@ -1,7 +1,25 @@
 from .assignment import Assignment
 from .course import Course
+from .job import Job
+from .llm_analysis_cache import LLMAnalysisCache
+from .llm_question_cache import LLMQuestionCache
 from .notification_log import NotificationLog
+from .scheduler_job_run import SchedulerJobRun
+from .search_passage import SearchPassage
+from .search_posting import SearchPosting
 from .sync_run import SyncRun
 from .user import User
 
-__all__ = ["User", "Course", "Assignment", "SyncRun", "NotificationLog"]
+__all__ = [
+    "User",
+    "Course",
+    "Assignment",
+    "SyncRun",
+    "NotificationLog",
+    "Job",
+    "SchedulerJobRun",
+    "LLMAnalysisCache",
+    "SearchPassage",
+    "SearchPosting",
+    "LLMQuestionCache",
+]
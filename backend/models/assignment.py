@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from sqlalchemy.sql import func
 
 from backend.db.base import Base
+from backend.db.types import CompressedText
+from backend.utils.text import html_to_text
 
 
 class Assignment(Base):
@@ -14,7 +18,9 @@ class Assignment(Base):
     canvas_assignment_id = Column(Integer, unique=True, index=True, nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
     name = Column(String, nullable=True)
-    description = Column(Text, nullable=True)
+    # Raw Canvas HTML, compressed and loaded only on access; readers use description_text
+    description = deferred(Column("description_zlib", CompressedText, nullable=True))
+    description_text = deferred(Column(Text, nullable=True))
     due_at = Column(DateTime(timezone=True), nullable=True)
     html_url = Column(String, nullable=True)
     submission_types = Column(String, nullable=True)  # JSON string or comma-separated
@@ -25,3 +31,8 @@ class Assignment(Base):
 
     # Relationships
     course = relationship("Course", back_populates="assignments")
+
+    @validates("description")
+    def _clean_description(self, key: str, value: Optional[str]) -> Optional[str]:
+        self.description_text = html_to_text(value) if value else None
+        return value
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from sqlalchemy import Column, DateTime, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from sqlalchemy.sql import func
 
 from backend.db.base import Base
+from backend.db.types import CompressedText
+from backend.utils.text import html_to_text
 
 
 class Course(Base):
@@ -15,9 +19,19 @@ class Course(Base):
     name = Column(String, nullable=True)
     course_code = Column(String, nullable=True)
     workflow_state = Column(String, nullable=True)
-    syllabus_body = Column(Text, nullable=True)
+    # Raw Canvas HTML can reach hundreds of KB: stored compressed and loaded only on access
+    syllabus_body = deferred(Column("syllabus_body_zlib", CompressedText, nullable=True))
+    syllabus_text = deferred(Column(Text, nullable=True))  # cleaned from syllabus_body
+    syllabus_summary_status = Column(String, nullable=True)  # "pending", "ready", "failed"
+    syllabus_summary_error = Column(Text, nullable=True)
+    syllabus_summary_updated_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     assignments = relationship("Assignment", back_populates="course")
+
+    @validates("syllabus_body")
+    def _clean_syllabus(self, key: str, value: Optional[str]) -> Optional[str]:
+        self.syllabus_text = html_to_text(value) if value else None
+        return value
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String, nullable=False)  # "full_sync", "assignment_sync", ...
+    status = Column(String, nullable=False, default="queued")  # "queued", "running", ...
+    priority = Column(Integer, nullable=False, default=0)  # lower runs first
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    payload = Column(Text, nullable=True)  # JSON string of handler kwargs
+    result = Column(Text, nullable=True)  # JSON string returned by the handler
+    error_message = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String, nullable=True)  # worker that claimed the job
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # renewed while it runs
+
+    __table_args__ = (Index("ix_jobs_status_priority", "status", "priority", "id"),)
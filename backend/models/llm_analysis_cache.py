@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class LLMAnalysisCache(Base):
+    __tablename__ = "llm_analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)
+    operation = Column(String, nullable=False)  # "summarize_syllabus", "analyze_assignment", ...
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    input_hash = Column(String(64), nullable=False)  # sha256 of the cleaned input text
+    scope = Column(String, index=True, nullable=True)  # e.g. "course:123", used for invalidation
+    result = Column(Text, nullable=False)  # JSON string
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_accessed_at = Column(DateTime(timezone=True), index=True, nullable=True)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class LLMQuestionCache(Base):
+    __tablename__ = "llm_question_cache"
+    __table_args__ = (Index("ix_llm_question_cache_scope", "user_id", "canvas_course_id", "model"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    canvas_course_id = Column(Integer, index=True, nullable=True)  # None: asked across all courses
+    model = Column(String, nullable=False)
+    normalized_question = Column(String, nullable=False)
+    question = Column(Text, nullable=False)  # as first asked
+    answer = Column(Text, nullable=False)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    last_accessed_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String, Text
+
+from backend.db.base import Base
+
+
+class SchedulerJobRun(Base):
+    __tablename__ = "scheduler_job_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, nullable=False)  # APScheduler job id, e.g. "full_sync_user_3"
+    job_key = Column(String, nullable=False)  # job id without per-user/per-run suffix
+    outcome = Column(String, nullable=False)  # "success", "error", "missed", "skipped"
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    duration_ms = Column(Float, nullable=True)
+    overlapped = Column(Boolean, default=False)
+    exception = Column(Text, nullable=True)
+
+    __table_args__ = (Index("ix_scheduler_job_runs_key_finished", "job_key", "finished_at"),)
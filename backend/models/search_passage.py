@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from backend.db.base import Base
+
+
+class SearchPassage(Base):
+    __tablename__ = "search_passages"
+    __table_args__ = (Index("ix_search_passages_source", "source_type", "source_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    source_type = Column(String, nullable=False)  # "assignment" or "syllabus"
+    source_id = Column(Integer, nullable=False)  # Canvas assignment or course id
+    canvas_course_id = Column(Integer, index=True, nullable=False)
+    position = Column(Integer, nullable=False, default=0)  # chunk index within the source
+    title = Column(String, nullable=True)
+    text = Column(Text, nullable=False)
+    length = Column(Integer, nullable=False)  # number of indexed terms, for BM25 normalization
+    content_hash = Column(String(64), nullable=False)  # sha256 of the whole source document
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    postings = relationship("SearchPosting", back_populates="passage", cascade="all, delete-orphan")
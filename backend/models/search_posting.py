@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship
+
+from backend.db.base import Base
+
+
+class SearchPosting(Base):
+    __tablename__ = "search_postings"
+    __table_args__ = (Index("ix_search_postings_term", "term"),)
+
+    id = Column(Integer, primary_key=True)
+    term = Column(String, nullable=False)
+    passage_id = Column(
+        Integer, ForeignKey("search_passages.id", ondelete="CASCADE"), index=True, nullable=False
+    )
+    term_frequency = Column(Integer, nullable=False)
+
+    # Relationships
+    passage = relationship("SearchPassage", back_populates="postings")
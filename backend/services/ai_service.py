@@ -4,14 +4,19 @@ Provides intelligent insights, deadline tracking, and content summarization.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 
 from fastapi import Depends
-from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
+from backend.config import get_settings
+from backend.db.routing import get_read_db
 from backend.db.session import get_db
 from backend.models import Assignment, Course, NotificationLog
+from backend.services.read_models import AssignmentRow, load_assignments, select_assignments
+
+if TYPE_CHECKING:
+    from backend.services.assignment_snapshot import AssignmentSnapshot
 
 
 class CanvasAIService:
@@ -19,25 +24,34 @@ class CanvasAIService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.settings = get_settings()
+
+    def _snapshot(self) -> Optional["AssignmentSnapshot"]:
+        """Columnar snapshot for vectorized analytics, or None to query SQL."""
+        if not self.settings.analytics_snapshot_enabled:
+            return None
+        # Imported here so numpy is only loaded when the snapshot is enabled
+        from backend.services.assignment_snapshot import get_snapshot_store
+
+        return get_snapshot_store().get(self.db)
 
     def get_upcoming_deadlines(self, user_id: int, days_ahead: int = 7) -> List[dict[str, Any]]:
         """Get assignments due in the next N days."""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.upcoming_deadlines(datetime.now(timezone.utc), days_ahead)
+
         cutoff_date = datetime.now(timezone.utc) + timedelta(days=days_ahead)
         current_time = datetime.now(timezone.utc)
 
-        upcoming_assignments = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(
-                and_(
-                    Assignment.due_at.isnot(None),
-                    Assignment.due_at >= current_time,
-                    Assignment.due_at <= cutoff_date,
-                    Assignment.workflow_state != "deleted",
-                )
-            )
-            .order_by(Assignment.due_at)
-            .all()
+        upcoming_assignments = load_assignments(
+            self.db,
+            select_assignments(
+                Assignment.due_at.isnot(None),
+                Assignment.due_at >= current_time,
+                Assignment.due_at <= cutoff_date,
+                Assignment.workflow_state != "deleted",
+            ).order_by(Assignment.due_at),
         )
 
         deadlines: List[dict[str, Any]] = []
@@ -72,20 +86,19 @@ class CanvasAIService:
 
     def get_overdue_assignments(self, user_id: int) -> List[dict[str, Any]]:
         """Get assignments that are past due."""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.overdue_assignments(datetime.now(timezone.utc))
+
         current_time = datetime.now(timezone.utc)
 
-        overdue_assignments = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(
-                and_(
-                    Assignment.due_at.isnot(None),
-                    Assignment.due_at < current_time,
-                    Assignment.workflow_state != "deleted",
-                )
-            )
-            .order_by(Assignment.due_at.desc())
-            .all()
+        overdue_assignments = load_assignments(
+            self.db,
+            select_assignments(
+                Assignment.due_at.isnot(None),
+                Assignment.due_at < current_time,
+                Assignment.workflow_state != "deleted",
+            ).order_by(Assignment.due_at.desc()),
         )
 
         overdue: List[dict[str, Any]] = []
@@ -107,62 +120,63 @@ class CanvasAIService:
 
     def get_course_workload_analysis(self, user_id: int) -> List[dict[str, Any]]:
         """Analyze workload distribution across courses."""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.course_workload(datetime.now(timezone.utc))
+
         current_time = datetime.now(timezone.utc)
         next_month = current_time + timedelta(days=30)
 
-        # Get assignments due in the next month grouped by course
+        # Get assignments due in the next month grouped by course, in one query
         courses_data: List[dict[str, Any]] = []
-        courses = self.db.query(Course).all()
-
-        for course in courses:
-            assignments = (
-                self.db.query(Assignment)
-                .filter(
-                    and_(
-                        Assignment.course_id == course.id,
-                        Assignment.due_at.isnot(None),
-                        Assignment.due_at >= current_time,
-                        Assignment.due_at <= next_month,
-                        Assignment.workflow_state != "deleted",
-                    )
-                )
-                .all()
-            )
+        by_course: dict[int, List[AssignmentRow]] = {}
+        for row in load_assignments(
+            self.db,
+            select_assignments(
+                Assignment.due_at.isnot(None),
+                Assignment.due_at >= current_time,
+                Assignment.due_at <= next_month,
+                Assignment.workflow_state != "deleted",
+            ).order_by(Course.id, Assignment.due_at),
+        ):
+            by_course.setdefault(row.course.id, []).append(row)
+
+        for assignments in by_course.values():
+            course = assignments[0].course
 
             total_points = sum(a.points_possible or 0 for a in assignments)
             assignment_count = len(assignments)
 
-            if assignment_count > 0:
-                avg_days_until_due = (
-                    sum((a.due_at - current_time).days for a in assignments) / assignment_count
-                )
-
-                # Calculate workload intensity
-                if assignment_count >= 5 or total_points >= 500:
-                    intensity = "high"
-                elif assignment_count >= 3 or total_points >= 200:
-                    intensity = "medium"
-                else:
-                    intensity = "low"
-
-                courses_data.append(
-                    {
-                        "course_id": course.canvas_course_id,
-                        "course_name": course.name,
-                        "assignment_count": assignment_count,
-                        "total_points": total_points,
-                        "avg_days_until_due": round(avg_days_until_due, 1),
-                        "intensity": intensity,
-                        "upcoming_assignments": [
-                            {
-                                "name": a.name,
-                                "due_at": a.due_at.isoformat(),
-                                "points": a.points_possible,
-                            }
-                            for a in assignments[:3]
-                        ],
-                    }
-                )
+            avg_days_until_due = (
+                sum((a.due_at - current_time).days for a in assignments) / assignment_count
+            )
+
+            # Calculate workload intensity
+            if assignment_count >= 5 or total_points >= 500:
+                intensity = "high"
+            elif assignment_count >= 3 or total_points >= 200:
+                intensity = "medium"
+            else:
+                intensity = "low"
+
+            courses_data.append(
+                {
+                    "course_id": course.canvas_course_id,
+                    "course_name": course.name,
+                    "assignment_count": assignment_count,
+                    "total_points": total_points,
+                    "avg_days_until_due": round(avg_days_until_due, 1),
+                    "intensity": intensity,
+                    "upcoming_assignments": [
+                        {
+                            "name": a.name,
+                            "due_at": a.due_at.isoformat(),
+                            "points": a.points_possible,
+                        }
+                        for a in assignments[:3]
+                    ],
+                }
+            )
 
         return sorted(courses_data, key=lambda x: x["assignment_count"], reverse=True)
 
@@ -280,3 +294,8 @@ class CanvasAIService:
 def get_ai_service(db: Session = Depends(get_db)) -> CanvasAIService:
     """Dependency to get AI service."""
     return CanvasAIService(db)
+
+
+def get_ai_read_service(db: Session = Depends(get_read_db)) -> CanvasAIService:
+    """Dependency to get AI service for read-only insights, served from the replica if any."""
+    return CanvasAIService(db)
@@ -0,0 +1,194 @@
+"""
+Persistent cache for LLM analyses.
+Entries are keyed by (operation, model, prompt version, hash of the cleaned input text),
+expire after a TTL, are evicted least-recently-used beyond a size cap, and are
+invalidated by scope (e.g. "course:123") when a sync changes the underlying content.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import LLMAnalysisCache
+from backend.services.telemetry import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """Stable sha256 hex digest of an input text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(operation: str, model: str, prompt_version: str, input_hash: str) -> str:
+    return content_hash(f"{operation}\x1f{model}\x1f{prompt_version}\x1f{input_hash}")
+
+
+def course_scope(canvas_course_id: int) -> str:
+    return f"course:{canvas_course_id}"
+
+
+def assignment_scope(canvas_assignment_id: int) -> str:
+    return f"assignment:{canvas_assignment_id}"
+
+
+class AnalysisCache:
+    """Read-through cache of LLM analysis results stored in `llm_analysis_cache`."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+
+    def get(
+        self, operation: str, model: str, prompt_version: str, text: str
+    ) -> Optional[dict[str, Any]]:
+        """Return the cached result for this input, or None on a miss."""
+        return self.get_many(operation, model, prompt_version, [text])[0]
+
+    def get_many(
+        self, operation: str, model: str, prompt_version: str, texts: List[str]
+    ) -> List[Optional[dict[str, Any]]]:
+        """Return cached results for several inputs, in order, with None for each miss.
+
+        Reads every entry with one query and records the hits with one update.
+        """
+        if not self.settings.llm_cache_enabled or not texts:
+            return [None] * len(texts)
+
+        keys = [cache_key(operation, model, prompt_version, content_hash(text)) for text in texts]
+        entries = {
+            entry.cache_key: entry
+            for entry in self.db.query(LLMAnalysisCache).filter(
+                LLMAnalysisCache.cache_key.in_(set(keys))
+            )
+        }
+
+        now = datetime.now(timezone.utc)
+        expired = [
+            entry.id
+            for entry in entries.values()
+            if entry.expires_at is not None and _as_utc(entry.expires_at) <= now
+        ]
+        found = {
+            key: {
+                "result": json.loads(entry.result),
+                "cached_at": entry.created_at.isoformat() if entry.created_at else None,
+            }
+            for key, entry in entries.items()
+            if entry.id not in expired
+        }
+
+        results: List[Optional[dict[str, Any]]] = []
+        for key in keys:
+            record_cache_lookup("llm_analysis", hit=key in found)
+            results.append(found.get(key))
+
+        if expired:
+            self.db.query(LLMAnalysisCache).filter(LLMAnalysisCache.id.in_(expired)).delete(
+                synchronize_session=False
+            )
+        if found:
+            self.db.query(LLMAnalysisCache).filter(
+                LLMAnalysisCache.cache_key.in_(list(found))
+            ).update(
+                {
+                    LLMAnalysisCache.hit_count: func.coalesce(LLMAnalysisCache.hit_count, 0) + 1,
+                    LLMAnalysisCache.last_accessed_at: now,
+                },
+                synchronize_session=False,
+            )
+        if expired or found:
+            self.db.commit()
+        return results
+
+    def set(
+        self,
+        operation: str,
+        model: str,
+        prompt_version: str,
+        text: str,
+        result: dict[str, Any],
+        scope: Optional[str] = None,
+    ) -> None:
+        """Store a result for this input, replacing any previous entry."""
+        if not self.settings.llm_cache_enabled:
+            return
+
+        input_hash = content_hash(text)
+        key = cache_key(operation, model, prompt_version, input_hash)
+        now = datetime.now(timezone.utc)
+        ttl_hours = self.settings.llm_cache_ttl_hours
+
+        entry = self.db.query(LLMAnalysisCache).filter(LLMAnalysisCache.cache_key == key).first()
+        if entry is None:
+            entry = LLMAnalysisCache(
+                cache_key=key,
+                operation=operation,
+                model=model,
+                prompt_version=prompt_version,
+                input_hash=input_hash,
+                hit_count=0,
+            )
+            self.db.add(entry)
+        entry.scope = scope
+        entry.result = json.dumps(result, default=str)
+        entry.last_accessed_at = now
+        entry.expires_at = now + timedelta(hours=ttl_hours) if ttl_hours else None
+
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent request stored the same key first; its result is just as good
+            self.db.rollback()
+            return
+        self.evict()
+
+    def invalidate(self, scope: str) -> int:
+        """Drop every entry derived from the given scope. Does not commit."""
+        return (
+            self.db.query(LLMAnalysisCache)
+            .filter(LLMAnalysisCache.scope == scope)
+            .delete(synchronize_session=False)
+        )
+
+    def evict(self) -> int:
+        """Delete expired entries, then the least recently used beyond the size cap."""
+        now = datetime.now(timezone.utc)
+        removed = (
+            self.db.query(LLMAnalysisCache)
+            .filter(LLMAnalysisCache.expires_at.isnot(None), LLMAnalysisCache.expires_at <= now)
+            .delete(synchronize_session=False)
+        )
+
+        max_entries = self.settings.llm_cache_max_entries
+        overflow = self.db.query(LLMAnalysisCache).count() - max_entries
+        if overflow > 0:
+            stale_ids = [
+                entry_id
+                for (entry_id,) in self.db.query(LLMAnalysisCache.id)
+                .order_by(LLMAnalysisCache.last_accessed_at, LLMAnalysisCache.id)
+                .limit(overflow)
+                .all()
+            ]
+            removed += (
+                self.db.query(LLMAnalysisCache)
+                .filter(LLMAnalysisCache.id.in_(stale_ids))
+                .delete(synchronize_session=False)
+            )
+
+        self.db.commit()
+        if removed:
+            logger.info(f"Evicted {removed} LLM analysis cache entries")
+        return removed
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
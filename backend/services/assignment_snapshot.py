@@ -0,0 +1,251 @@
+"""
+In-memory columnar snapshot of assignments for the analytics endpoints.
+Dated assignments are held as NumPy arrays sorted by due date (epoch microseconds, points,
+course index and workflow-state code), so deadline windows are two `searchsorted` calls
+and per-course workload is a `bincount`. A snapshot is rebuilt with one query when the
+response cache's sync generation moves on (shared through Redis, else derived from the
+latest finished sync on the primary, so a worker's sync is seen too) or it reaches its
+maximum age. NumPy is optional; without it `CanvasAIService` keeps computing analytics
+from SQL.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Assignment, Course
+from backend.services.response_cache import get_response_cache
+
+try:
+    import numpy as np
+except ImportError:  # optional; analytics fall back to SQL
+    np = None
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DAY_US = 86_400_000_000
+WORKFLOW_STATES = ("published", "unpublished", "deleted")
+OTHER_STATE = len(WORKFLOW_STATES)
+NO_STATE = OTHER_STATE + 1
+# Matches SQL's `workflow_state != 'deleted'`, which is not true for NULL either
+HIDDEN_STATES = (WORKFLOW_STATES.index("deleted"), NO_STATE)
+URGENCY = ("high", "medium", "low")
+INTENSITY = ("high", "medium", "low")
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def to_epoch_us(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)  # SQLite drops the offset; values are UTC
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def state_code(workflow_state: Optional[str]) -> int:
+    if workflow_state is None:
+        return NO_STATE
+    try:
+        return WORKFLOW_STATES.index(workflow_state)
+    except ValueError:
+        return OTHER_STATE
+
+
+class AssignmentSnapshot:
+    """Columns of every dated assignment, sorted by due date, plus their display fields."""
+
+    def __init__(self, assignments: Sequence[Tuple], courses: Sequence[Tuple]):
+        """
+        `assignments` rows are (canvas_assignment_id, course_id, name, due_at, points_possible,
+        workflow_state, html_url, submission_types); `courses` rows are (id, canvas_course_id,
+        name) in the order workload ties are listed.
+        """
+        self.courses = [(canvas_id, name) for _, canvas_id, name in courses]
+        position = {course_id: i for i, (course_id, _, _) in enumerate(courses)}
+        rows = sorted(
+            (row for row in assignments if row[3] is not None and row[1] in position),
+            key=lambda row: to_epoch_us(row[3]),
+        )
+
+        self.due = np.array([to_epoch_us(row[3]) for row in rows], dtype=np.int64)
+        self.points = np.array(
+            [np.nan if row[4] is None else row[4] for row in rows], dtype=np.float64
+        )
+        self.course_index = np.array([position[row[1]] for row in rows], dtype=np.int32)
+        self.state = np.array([state_code(row[5]) for row in rows], dtype=np.int8)
+        # Row-aligned fields only needed to render results
+        self.canvas_ids = [row[0] for row in rows]
+        self.names = [row[2] for row in rows]
+        self.html_urls = [row[6] for row in rows]
+        self.submission_types = [row[7].split(",") if row[7] else [] for row in rows]
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db: Session) -> "AssignmentSnapshot":
+        assignments = (
+            db.query(
+                Assignment.canvas_assignment_id,
+                Assignment.course_id,
+                Assignment.name,
+                Assignment.due_at,
+                Assignment.points_possible,
+                Assignment.workflow_state,
+                Assignment.html_url,
+                Assignment.submission_types,
+            )
+            .filter(Assignment.due_at.isnot(None))
+            .all()
+        )
+        courses = (
+            db.query(Course.id, Course.canvas_course_id, Course.name).order_by(Course.id).all()
+        )
+        return cls(assignments, courses)
+
+    def __len__(self) -> int:
+        return len(self.due)
+
+    def _window(
+        self, start_us: Optional[int], end_us: int, include_end: bool = True
+    ) -> "np.ndarray":
+        """Indices of live assignments due in [start, end], in due-date order."""
+        lo = 0 if start_us is None else np.searchsorted(self.due, start_us, side="left")
+        hi = np.searchsorted(self.due, end_us, side="right" if include_end else "left")
+        return lo + np.flatnonzero(~np.isin(self.state[lo:hi], HIDDEN_STATES))
+
+    def _points(self, i: int) -> Optional[float]:
+        value = self.points[i]
+        return None if np.isnan(value) else float(value)
+
+    def upcoming_deadlines(self, now: datetime, days_ahead: int) -> List[dict[str, Any]]:
+        now_us = to_epoch_us(now)
+        idx = self._window(now_us, now_us + days_ahead * DAY_US)
+        days = (self.due[idx] - now_us) // DAY_US
+        urgency = np.where(days <= 1, 0, np.where(days <= 3, 1, 2))
+        return [
+            {
+                "assignment_id": self.canvas_ids[i],
+                "name": self.names[i],
+                "course_name": self.courses[self.course_index[i]][1],
+                "due_at": from_epoch_us(self.due[i]).isoformat(),
+                "days_until_due": int(d),
+                "urgency": URGENCY[u],
+                "points_possible": self._points(i),
+                "html_url": self.html_urls[i],
+                "submission_types": self.submission_types[i],
+            }
+            for i, d, u in zip(idx.tolist(), days.tolist(), urgency.tolist(), strict=True)
+        ]
+
+    def overdue_assignments(self, now: datetime) -> List[dict[str, Any]]:
+        now_us = to_epoch_us(now)
+        idx = self._window(None, now_us, include_end=False)[::-1]
+        days = (now_us - self.due[idx]) // DAY_US
+        return [
+            {
+                "assignment_id": self.canvas_ids[i],
+                "name": self.names[i],
+                "course_name": self.courses[self.course_index[i]][1],
+                "due_at": from_epoch_us(self.due[i]).isoformat(),
+                "days_overdue": int(d),
+                "points_possible": self._points(i),
+                "html_url": self.html_urls[i],
+            }
+            for i, d in zip(idx.tolist(), days.tolist(), strict=True)
+        ]
+
+    def course_workload(self, now: datetime, days_ahead: int = 30) -> List[dict[str, Any]]:
+        now_us = to_epoch_us(now)
+        idx = self._window(now_us, now_us + days_ahead * DAY_US)
+        course = self.course_index[idx]
+        n = len(self.courses)
+        counts = np.bincount(course, minlength=n)
+        points = np.bincount(course, weights=np.nan_to_num(self.points[idx]), minlength=n)
+        days = np.bincount(course, weights=(self.due[idx] - now_us) // DAY_US, minlength=n)
+        intensity = np.where(
+            (counts >= 5) | (points >= 500), 0, np.where((counts >= 3) | (points >= 200), 1, 2)
+        )
+
+        workload = []
+        for c in np.argsort(-counts, kind="stable").tolist():
+            if counts[c] == 0:
+                break
+            first = idx[course == c][:3].tolist()
+            workload.append(
+                {
+                    "course_id": self.courses[c][0],
+                    "course_name": self.courses[c][1],
+                    "assignment_count": int(counts[c]),
+                    "total_points": float(points[c]),
+                    "avg_days_until_due": round(float(days[c] / counts[c]), 1),
+                    "intensity": INTENSITY[intensity[c]],
+                    "upcoming_assignments": [
+                        {
+                            "name": self.names[i],
+                            "due_at": from_epoch_us(self.due[i]).isoformat(),
+                            "points": self._points(i),
+                        }
+                        for i in first
+                    ],
+                }
+            )
+        return workload
+
+
+class SnapshotStore:
+    """The process's snapshot, rebuilt when the sync generation changes or it gets too old.
+
+    Assignments are not scoped per user, so every user reads the same snapshot.
+    """
+
+    def __init__(self, max_age_seconds: float):
+        self.max_age_seconds = max_age_seconds
+        self._entry: Optional[Tuple[str, AssignmentSnapshot]] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Optional[AssignmentSnapshot]:
+        if not numpy_available():
+            return None
+        # Read the generation first so a sync that commits during the build forces a rebuild
+        generation = get_response_cache().generation()
+        with self._lock:
+            entry = self._entry
+        if (
+            entry is not None
+            and entry[0] == generation
+            and time.monotonic() - entry[1].built_at < self.max_age_seconds
+        ):
+            return entry[1]
+
+        started = time.monotonic()
+        snapshot = AssignmentSnapshot.build(db)
+        logger.debug(
+            f"Built assignment snapshot: {len(snapshot)} rows in "
+            f"{(time.monotonic() - started) * 1000:.1f}ms"
+        )
+        with self._lock:
+            self._entry = (generation, snapshot)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+@lru_cache(maxsize=1)
+def get_snapshot_store() -> SnapshotStore:
+    """Process-wide snapshot store configured from settings."""
+    if not numpy_available():
+        logger.warning("Analytics snapshot requires numpy (pip install numpy); using SQL")
+    return SnapshotStore(get_settings().analytics_snapshot_max_age_seconds)
@@ -1,9 +1,7 @@
-import os
 from typing import Any, List
 
-from dotenv import load_dotenv
-
-load_dotenv()
+from backend.config import get_settings
+from backend.services.telemetry import instrument_canvas
 
 
 def _get_canvas():
@@ -14,11 +12,12 @@ def _get_canvas():
         raise RuntimeError(
             "Canvas API client is not available. Install 'canvasapi' to use Canvas features."
         ) from exc
-    api_url = os.getenv("CANVAS_API_URL")
-    api_key = os.getenv("CANVAS_API_KEY")
+    settings = get_settings()
+    api_url = settings.canvas_api_url
+    api_key = settings.canvas_api_key
     if not api_url or not api_key:
         raise RuntimeError("Canvas API not configured. Set CANVAS_API_URL and CANVAS_API_KEY.")
-    return Canvas(api_url, api_key)
+    return instrument_canvas(Canvas(api_url, api_key))
 
 
 def _serialize_course(course: Any) -> dict[str, Any]:
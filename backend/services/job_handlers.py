@@ -0,0 +1,183 @@
+"""
+Background job handlers executed by the worker process.
+Each handler receives a database session plus the job payload and returns a JSON-able result.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from backend.models import Course, NotificationLog, User
+from backend.services.ai_service import CanvasAIService
+from backend.services.llm_backend import build_llm_service
+from backend.services.retention import RetentionService
+from backend.services.sync_service import CanvasSyncService
+
+logger = logging.getLogger(__name__)
+
+
+def _sync_run_result(sync_run) -> dict[str, Any]:
+    if sync_run.status == "failed":
+        raise RuntimeError(f"Sync run {sync_run.id} failed: {sync_run.error_message}")
+    return {
+        "sync_id": sync_run.id,
+        "status": sync_run.status,
+        "items_processed": sync_run.items_processed,
+        "items_created": sync_run.items_created,
+        "items_updated": sync_run.items_updated,
+        "error_message": sync_run.error_message,
+    }
+
+
+def full_sync_job(db: Session, user_id: int = 1) -> dict[str, Any]:
+    """Execute a full sync of user, courses, and assignments."""
+    logger.info("Starting full sync job")
+    sync_run = CanvasSyncService(db).full_sync(user_id=user_id)
+    logger.info(
+        f"Full sync completed: {sync_run.status}, processed {sync_run.items_processed} items"
+    )
+    return _sync_run_result(sync_run)
+
+
+def assignment_sync_job(db: Session, user_id: int = 1) -> dict[str, Any]:
+    """Execute assignment sync."""
+    logger.info("Starting assignment sync job")
+    sync_run = CanvasSyncService(db).sync_assignments(user_id=user_id)
+    logger.info(
+        f"Assignment sync completed: {sync_run.status}, processed {sync_run.items_processed} items"
+    )
+    return _sync_run_result(sync_run)
+
+
+def summarize_syllabus_job(db: Session, course_id: int) -> dict[str, Any]:
+    """Pre-compute a course's syllabus summary into the analysis cache."""
+    course = db.query(Course).filter(Course.canvas_course_id == course_id).first()
+    if course is None:
+        raise ValueError(f"Course {course_id} not found")
+
+    # Same service the /llm/syllabus route reads from, so the result lands in its cache
+    try:
+        analysis = build_llm_service("syllabus", db).summarize_syllabus(course_id)
+    except Exception as e:
+        db.rollback()
+        analysis = {"error": str(e)}
+
+    failed = "analysis" not in analysis
+    course.syllabus_summary_status = "failed" if failed else "ready"
+    course.syllabus_summary_error = (
+        analysis.get("error") or analysis.get("summary") if failed else None
+    )
+    course.syllabus_summary_updated_at = datetime.now(timezone.utc)
+    db.commit()
+
+    if failed:
+        raise RuntimeError(f"Syllabus summary failed: {course.syllabus_summary_error}")
+    return {"course_id": course_id, "cached": analysis.get("cached", False)}
+
+
+def deadline_notification_job(db: Session, user_id: Optional[int] = None) -> dict[str, Any]:
+    """Check for upcoming deadlines and send notifications.
+
+    Runs for a single user when `user_id` is given, otherwise for every active user.
+    """
+    logger.info("Starting deadline notification job")
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [
+            uid
+            for (uid,) in db.query(User.id).filter(User.is_active.isnot(False)).order_by(User.id)
+        ]
+
+    ai_service = CanvasAIService(db)
+    notifications_sent = 0
+    for uid in user_ids:
+        notifications_sent += _send_deadline_notifications(db, ai_service, uid)
+
+    logger.info(
+        f"Deadline notification job completed: {notifications_sent} notifications sent "
+        f"to {len(user_ids)} user(s)"
+    )
+    return {"notifications_sent": notifications_sent, "users": len(user_ids)}
+
+
+def _send_deadline_notifications(db: Session, ai_service: CanvasAIService, user_id: int) -> int:
+    """Send due-soon notifications for one user; returns how many were sent."""
+    # Get assignments due in next 24 hours
+    upcoming_24h = ai_service.get_upcoming_deadlines(user_id=user_id, days_ahead=1)
+
+    # Get assignments due in next 3 days (but not already notified for 24h)
+    upcoming_3d = ai_service.get_upcoming_deadlines(user_id=user_id, days_ahead=3)
+
+    notifications_sent = 0
+
+    # Send 24-hour notifications
+    for deadline in upcoming_24h:
+        if deadline["urgency"] == "high":
+            # Check if we already sent notification today
+            existing_notification = (
+                db.query(NotificationLog)
+                .filter(
+                    NotificationLog.user_id == user_id,
+                    NotificationLog.notification_type == "24h_deadline",
+                    NotificationLog.extra_data.contains(str(deadline["assignment_id"])),
+                    NotificationLog.sent_at >= datetime.now(timezone.utc) - timedelta(hours=12),
+                )
+                .first()
+            )
+
+            if not existing_notification:
+                ai_service.create_deadline_notification(
+                    user_id=user_id,
+                    assignment_id=deadline["assignment_id"],
+                    notification_type="24h_deadline",
+                )
+                notifications_sent += 1
+                logger.info(f"Sent 24h deadline notification for: {deadline['name']}")
+
+    # Send 3-day notifications (less urgent)
+    for deadline in upcoming_3d:
+        if deadline["urgency"] == "medium" and deadline["days_until_due"] == 3:
+            existing_notification = (
+                db.query(NotificationLog)
+                .filter(
+                    NotificationLog.user_id == user_id,
+                    NotificationLog.notification_type == "3d_deadline",
+                    NotificationLog.extra_data.contains(str(deadline["assignment_id"])),
+                    NotificationLog.sent_at >= datetime.now(timezone.utc) - timedelta(days=2),
+                )
+                .first()
+            )
+
+            if not existing_notification:
+                ai_service.create_deadline_notification(
+                    user_id=user_id,
+                    assignment_id=deadline["assignment_id"],
+                    notification_type="3d_deadline",
+                )
+                notifications_sent += 1
+                logger.info(f"Sent 3d deadline notification for: {deadline['name']}")
+
+    return notifications_sent
+
+
+def retention_job(db: Session) -> dict[str, Any]:
+    """Prune sync runs and notification logs past their retention windows."""
+    logger.info("Starting retention job")
+    result = RetentionService(db).run()
+    logger.info(
+        f"Retention job completed: {result['rows_removed']} rows removed "
+        f"in {result['duration_ms']}ms"
+    )
+    return result
+
+
+JOB_HANDLERS: dict[str, Callable[..., dict[str, Any]]] = {
+    "full_sync": full_sync_job,
+    "assignment_sync": assignment_sync_job,
+    "deadline_notifications": deadline_notification_job,
+    "summarize_syllabus": summarize_syllabus_job,
+    "retention": retention_job,
+}
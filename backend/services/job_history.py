@@ -0,0 +1,202 @@
+"""
+Scheduler job instrumentation.
+Records every APScheduler execution (start, end, duration, outcome, exception) in an
+in-memory ring buffer and, optionally, the `scheduler_job_runs` table. Successful runs of
+the queue dispatch poll are kept in memory and metrics only.
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.db.session import SessionLocal
+from backend.models import SchedulerJobRun
+from backend.services.telemetry import SCHEDULER_JOB_RUNS, SCHEDULER_JOB_SECONDS
+from backend.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENTS = (
+    EVENT_JOB_SUBMITTED
+    | EVENT_JOB_EXECUTED
+    | EVENT_JOB_ERROR
+    | EVENT_JOB_MISSED
+    | EVENT_JOB_MAX_INSTANCES
+)
+
+_RUN_SUFFIX = re.compile(r"_(user_)?\d+$")
+
+# Jobs that run every few seconds; persisting their successes would flood the table
+UNPERSISTED_SUCCESSES = frozenset({"queue_dispatch"})
+
+
+def job_key(job_id: str) -> str:
+    """Group per-user and per-run job ids, e.g. "full_sync_user_3" -> "full_sync"."""
+    return _RUN_SUFFIX.sub("", job_id)
+
+
+def summarize_runs(runs: Iterable[dict[str, Any]]) -> Dict[str, dict[str, Any]]:
+    """Aggregate run records into per-job duration percentiles, errors and overlaps."""
+    grouped: Dict[str, List[dict[str, Any]]] = defaultdict(list)
+    for run in runs:
+        grouped[run["job_key"]].append(run)
+
+    summary: Dict[str, dict[str, Any]] = {}
+    for key, key_runs in grouped.items():
+        durations = sorted(r["duration_ms"] for r in key_runs if r["duration_ms"] is not None)
+        errors = [r for r in key_runs if r["outcome"] == "error"]
+        last_error = max(errors, key=lambda r: r["finished_at"] or "") if errors else None
+        summary[key] = {
+            "runs": len(key_runs),
+            "errors": len(errors),
+            "missed": sum(1 for r in key_runs if r["outcome"] == "missed"),
+            "overlaps": sum(1 for r in key_runs if r["overlapped"]),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "max_ms": round(durations[-1], 1) if durations else None,
+            "last_error": (
+                {"at": last_error["finished_at"], "exception": last_error["exception"]}
+                if last_error
+                else None
+            ),
+        }
+    return summary
+
+
+class JobRunRecorder:
+    """APScheduler listener that keeps a bounded history of job executions."""
+
+    def __init__(self, size: int = 200, persist: bool = False):
+        self.persist = persist
+        self._runs: Deque[dict[str, Any]] = deque(maxlen=size)
+        self._in_flight: Dict[str, Deque[datetime]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def attach(self, scheduler) -> None:
+        scheduler.add_listener(self, JOB_EVENTS)
+
+    def __call__(self, event) -> None:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            if event.code == EVENT_JOB_SUBMITTED:
+                self._in_flight[event.job_id].append(now)
+                return
+
+            if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+                starts = self._in_flight.get(event.job_id)
+                started_at = starts.popleft() if starts else None
+                overlapped = bool(starts)
+                if starts is not None and not starts:
+                    del self._in_flight[event.job_id]
+                outcome = "success" if event.code == EVENT_JOB_EXECUTED else "error"
+            elif event.code == EVENT_JOB_MAX_INSTANCES:
+                # Previous run of the same job was still going when this one came due
+                started_at, overlapped, outcome = None, True, "skipped"
+            else:
+                started_at, overlapped, outcome = None, False, "missed"
+
+            exception = getattr(event, "exception", None)
+            run = {
+                "job_id": event.job_id,
+                "job_key": job_key(event.job_id),
+                "outcome": outcome,
+                "started_at": started_at.isoformat() if started_at else None,
+                "finished_at": now.isoformat(),
+                "duration_ms": ((now - started_at).total_seconds() * 1000 if started_at else None),
+                "overlapped": overlapped,
+                "exception": repr(exception) if exception else None,
+            }
+            self._runs.append(run)
+
+        SCHEDULER_JOB_RUNS.inc(job=run["job_key"], outcome=outcome)
+        if run["duration_ms"] is not None:
+            SCHEDULER_JOB_SECONDS.observe(
+                run["duration_ms"] / 1000, job=run["job_key"], outcome=outcome
+            )
+        if self.persist and not (outcome == "success" and run["job_key"] in UNPERSISTED_SUCCESSES):
+            self._save(run, started_at, now)
+
+    def _save(self, run: dict[str, Any], started_at: Optional[datetime], finished_at: datetime):
+        db = SessionLocal()
+        try:
+            db.add(
+                SchedulerJobRun(
+                    job_id=run["job_id"],
+                    job_key=run["job_key"],
+                    outcome=run["outcome"],
+                    started_at=started_at,
+                    finished_at=finished_at,
+                    duration_ms=run["duration_ms"],
+                    overlapped=run["overlapped"],
+                    exception=run["exception"],
+                )
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to persist job run for {run['job_id']}: {str(e)}")
+        finally:
+            db.close()
+
+    def runs(self) -> List[dict[str, Any]]:
+        with self._lock:
+            return list(self._runs)
+
+    def running(self) -> Dict[str, int]:
+        with self._lock:
+            return {job_id: len(starts) for job_id, starts in self._in_flight.items() if starts}
+
+    def summary(self) -> Dict[str, dict[str, Any]]:
+        return summarize_runs(self.runs())
+
+
+def load_job_runs(db: Session, since_hours: int = 24 * 7, limit_per_job: int = 500) -> List[dict]:
+    """Load persisted job runs, newest first, in the same shape as the ring buffer.
+
+    The limit applies to each job key, so a frequent job cannot crowd out a daily one.
+    """
+    ranked = (
+        db.query(
+            SchedulerJobRun.id,
+            func.row_number()
+            .over(partition_by=SchedulerJobRun.job_key, order_by=SchedulerJobRun.id.desc())
+            .label("rank"),
+        )
+        .filter(
+            SchedulerJobRun.finished_at >= datetime.now(timezone.utc) - timedelta(hours=since_hours)
+        )
+        .subquery()
+    )
+    rows = (
+        db.query(SchedulerJobRun)
+        .join(ranked, ranked.c.id == SchedulerJobRun.id)
+        .filter(ranked.c.rank <= limit_per_job)
+        .order_by(SchedulerJobRun.id.desc())
+        .all()
+    )
+    return [
+        {
+            "job_id": row.job_id,
+            "job_key": row.job_key,
+            "outcome": row.outcome,
+            "started_at": row.started_at.isoformat() if row.started_at else None,
+            "finished_at": row.finished_at.isoformat() if row.finished_at else None,
+            "duration_ms": row.duration_ms,
+            "overlapped": bool(row.overlapped),
+            "exception": row.exception,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,279 @@
+"""
+Database-backed job queue shared by the API and the background worker.
+The API process only enqueues jobs and reads their results; the worker
+(`python -m backend.worker`) claims queued jobs and runs them in a process pool.
+"""
+
+import json
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+
+from fastapi import Depends
+from sqlalchemy import func, or_, update
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.db.query_audit import audit_queries
+from backend.db.session import SessionLocal, get_db
+from backend.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id() -> str:
+    """This worker's id: the configured one, else host and process id."""
+    return get_settings().worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class JobQueue:
+    """Enqueue, claim and settle jobs stored in the `jobs` table."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Optional[dict[str, Any]] = None,
+        user_id: Optional[int] = None,
+        priority: int = 0,
+        dedupe: bool = False,
+    ) -> Job:
+        """Add a job to the queue and return it.
+
+        With `dedupe`, an identical job that is still queued is returned instead.
+        """
+        serialized = json.dumps(payload or {}, sort_keys=True)
+        if dedupe:
+            existing = (
+                self.db.query(Job)
+                .filter(
+                    Job.job_type == job_type,
+                    Job.payload == serialized,
+                    Job.status == "queued",
+                )
+                .first()
+            )
+            if existing is not None:
+                return existing
+
+        job = Job(
+            job_type=job_type,
+            status="queued",
+            priority=priority,
+            user_id=user_id,
+            payload=serialized,
+        )
+        self.db.add(job)
+        self.db.commit()
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """Get a job by id."""
+        return self.db.query(Job).filter(Job.id == job_id).first()
+
+    def claim_next(
+        self,
+        limit: int = 1,
+        type_limits: Optional[dict[str, int]] = None,
+        worker_id: Optional[str] = None,
+    ) -> List[Job]:
+        """Claim up to `limit` queued jobs, lowest priority value first.
+
+        `type_limits` caps how many jobs of a given type may be running at once;
+        queued jobs of a type at its cap are left for a later poll.
+
+        Claiming is an optimistic `UPDATE ... WHERE status = 'queued'`, so several
+        workers can poll the same table (SQLite or Postgres) without double-running.
+        Claimed jobs carry `worker_id` and a heartbeat the worker renews while they run.
+        """
+        type_limits = type_limits or {}
+        running: dict[str, int] = {}
+        if type_limits:
+            running = dict(
+                self.db.query(Job.job_type, func.count(Job.id))
+                .filter(Job.status == "running", Job.job_type.in_(list(type_limits)))
+                .group_by(Job.job_type)
+                .all()
+            )
+
+        candidates = (
+            self.db.query(Job.id, Job.job_type)
+            .filter(Job.status == "queued")
+            .order_by(Job.priority, Job.id)
+            .limit(limit + 50 if type_limits else limit)
+            .all()
+        )
+
+        claimed: List[Job] = []
+        for job_id, job_type in candidates:
+            if len(claimed) >= limit:
+                break
+            cap = type_limits.get(job_type)
+            if cap is not None and running.get(job_type, 0) >= cap:
+                continue
+
+            now = datetime.now(timezone.utc)
+            result = self.db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(
+                    status="running",
+                    started_at=now,
+                    heartbeat_at=now,
+                    worker_id=worker_id,
+                    attempts=Job.attempts + 1,
+                )
+            )
+            self.db.commit()
+            if result.rowcount == 1:
+                job = self.get(job_id)
+                if job is not None:
+                    claimed.append(job)
+                    running[job_type] = running.get(job_type, 0) + 1
+        return claimed
+
+    def complete(self, job: Job, result: Optional[dict[str, Any]] = None) -> Job:
+        """Mark a job as completed and store its result."""
+        job.status = "completed"
+        job.result = json.dumps(result or {}, default=str)
+        job.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return job
+
+    def fail(self, job: Job, error: str) -> Job:
+        """Mark a job as failed."""
+        job.status = "failed"
+        job.error_message = error
+        job.completed_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return job
+
+    def stats(self, recent: int = 10) -> dict[str, Any]:
+        """Summarize queue depth by status plus the most recent jobs."""
+        counts = dict(self.db.query(Job.status, func.count(Job.id)).group_by(Job.status).all())
+        latest = self.db.query(Job).order_by(Job.id.desc()).limit(recent).all()
+        return {"counts": counts, "recent": [serialize_job(job) for job in latest]}
+
+    def heartbeat(self, worker_id: str) -> int:
+        """Renew the lease on every job this worker is running."""
+        result = self.db.execute(
+            update(Job)
+            .where(Job.status == "running", Job.worker_id == worker_id)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def requeue_abandoned(self, lease_seconds: float, worker_id: Optional[str] = None) -> int:
+        """Put running jobs back on the queue when their worker is gone.
+
+        That is jobs whose heartbeat is older than `lease_seconds`, plus jobs claimed
+        under `worker_id` by this worker's previous run. Jobs that live workers are
+        running keep their lease and are left alone.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        abandoned = or_(
+            func.coalesce(Job.heartbeat_at, Job.started_at) < cutoff,
+            Job.started_at.is_(None),
+        )
+        if worker_id is not None:
+            abandoned = or_(abandoned, Job.worker_id == worker_id)
+        result = self.db.execute(
+            update(Job)
+            .where(Job.status == "running", abandoned)
+            .values(status="queued", started_at=None, heartbeat_at=None, worker_id=None)
+        )
+        self.db.commit()
+        return result.rowcount
+
+
+def serialize_job(job: Job) -> dict[str, Any]:
+    """Serialize a job for API responses."""
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "user_id": job.user_id,
+        "result": json.loads(job.result) if job.result else None,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+def _execute(db: Session, job: Job) -> None:
+    # Handlers pull in canvasapi and friends; keep them out of the API import path
+    from backend.services.job_handlers import JOB_HANDLERS
+
+    queue = JobQueue(db)
+    handler = JOB_HANDLERS.get(job.job_type)
+    if handler is None:
+        queue.fail(job, f"Unknown job type: {job.job_type}")
+        raise ValueError(f"Unknown job type: {job.job_type}")
+
+    payload = json.loads(job.payload) if job.payload else {}
+    try:
+        with audit_queries(f"job {job.job_type}") as audit:
+            result = handler(db, **payload)
+        logger.info(
+            f"Job {job.id} ({job.job_type}) ran {audit.count} queries in {audit.total_ms:.1f}ms"
+        )
+        queue.complete(job, result)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Job {job.id} ({job.job_type}) failed: {str(e)}")
+        queue.fail(job, str(e))
+        # Re-raise so the scheduler's run history records the failure
+        raise
+
+
+def run_queued_job(job_id: int) -> None:
+    """Run a job that was already claimed from the queue.
+
+    Module-level so it can be pickled into the worker's process pool.
+    """
+    db = SessionLocal()
+    try:
+        job = JobQueue(db).get(job_id)
+        if job is None:
+            logger.warning(f"Job {job_id} disappeared before it could run")
+            return
+        _execute(db, job)
+    finally:
+        db.close()
+
+
+def run_job(job_type: str, worker_id: Optional[str] = None, **payload: Any) -> None:
+    """Record and run a job immediately (used by the worker's cron triggers).
+
+    `worker_id` is the scheduling worker, which renews the job's heartbeat while it runs.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        job = Job(
+            job_type=job_type,
+            status="running",
+            priority=0,
+            user_id=payload.get("user_id"),
+            payload=json.dumps(payload),
+            attempts=1,
+            started_at=now,
+            heartbeat_at=now,
+            worker_id=worker_id,
+        )
+        db.add(job)
+        db.commit()
+        _execute(db, job)
+    finally:
+        db.close()
+
+
+def get_job_queue(db: Session = Depends(get_db)) -> JobQueue:
+    """Dependency to get the job queue."""
+    return JobQueue(db)
@@ -0,0 +1,73 @@
+"""
+Per-route choice between the real and mock LLM services.
+`LLM_BACKEND` sets the default ("mock" or "real"); `LLM_BACKEND_ROUTES` overrides it for
+individual routes, e.g. "ask=real,ask_stream=real".
+"""
+
+from typing import Callable, Dict
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.db.session import get_db
+from backend.services.llm_service import CanvasLLMService
+from backend.services.mock_llm_service import MockCanvasLLMService
+
+BACKENDS = ("mock", "real")
+LLM_ROUTES = (
+    "syllabus",
+    "assignment",
+    "course_assignments",
+    "study_plan",
+    "ask",
+    "ask_stream",
+)
+
+LLMService = CanvasLLMService | MockCanvasLLMService
+
+
+def parse_route_backends(value: str) -> Dict[str, str]:
+    """Parse "route=backend" pairs separated by commas."""
+    overrides: Dict[str, str] = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        route, sep, backend = pair.partition("=")
+        route, backend = route.strip(), backend.strip().lower()
+        if not sep or route not in LLM_ROUTES:
+            raise ValueError(
+                f"Invalid LLM_BACKEND_ROUTES entry {pair.strip()!r}; "
+                f"routes are {', '.join(LLM_ROUTES)}"
+            )
+        overrides[route] = backend
+    return overrides
+
+
+def llm_backend(route: str) -> str:
+    """The backend configured for `route`."""
+    settings = get_settings()
+    backend = parse_route_backends(settings.llm_backend_routes).get(
+        route, settings.llm_backend.strip().lower()
+    )
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {backend!r} for {route}; expected mock or real")
+    return backend
+
+
+def build_llm_service(route: str, db: Session) -> LLMService:
+    """The service configured for `route`; the real one raises when not configured."""
+    if llm_backend(route) == "real":
+        return CanvasLLMService(db)
+    return MockCanvasLLMService(db)
+
+
+def llm_service_for(route: str) -> Callable[..., LLMService]:
+    """Dependency that builds the service configured for `route`."""
+    if route not in LLM_ROUTES:
+        raise ValueError(f"Unknown LLM route {route!r}")
+
+    def _get_llm_service(db: Session = Depends(get_db)) -> LLMService:
+        return build_llm_service(route, db)
+
+    return _get_llm_service
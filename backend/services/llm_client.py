@@ -0,0 +1,91 @@
+"""
+Process-wide LLM client registry.
+Chat model clients are built lazily on first use, once per configuration, and share a
+single pooled HTTP client, so requests reuse warm connections instead of constructing a
+client per request. langchain is imported only when the first client or message is built.
+"""
+
+import os
+import threading
+from functools import cache
+from typing import Any, Dict, Optional, Tuple
+
+from backend.config import get_settings
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_http_client: Optional[Any] = None
+
+
+def _get_http_client():
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        settings = get_settings()
+        _http_client = httpx.Client(
+            timeout=settings.llm_request_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=settings.llm_http_max_connections,
+                max_keepalive_connections=settings.llm_http_max_connections,
+            ),
+        )
+    return _http_client
+
+
+def get_chat_model(model: str, temperature: float = 0.1):
+    """Return the shared chat model client for this configuration, creating it once."""
+    settings = get_settings()
+    openai_api_key = settings.openai_api_key or os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is required")
+
+    key = (model, temperature, settings.openai_base_url, openai_api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            try:
+                from langchain_openai import ChatOpenAI  # type: ignore
+            except Exception as exc:  # ImportError or others
+                raise ImportError(
+                    "langchain-openai is required for LLM endpoints. "
+                    "Install it to enable these routes."
+                ) from exc
+
+            client = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                openai_api_key=openai_api_key,
+                # Point at any OpenAI-compatible server (e.g. a local stand-in)
+                base_url=settings.openai_base_url,
+                http_client=_get_http_client(),
+            )
+            _clients[key] = client
+    return client
+
+
+@cache
+def _message_types() -> Tuple[Any, Any]:
+    from langchain_core.messages import HumanMessage, SystemMessage  # type: ignore
+
+    return SystemMessage, HumanMessage
+
+
+def chat_messages(system_prompt: str, human_prompt: str) -> list:
+    """Build a system + human message pair for a chat model call."""
+    system_message, human_message = _message_types()
+    return [system_message(content=system_prompt), human_message(content=human_prompt)]
+
+
+def close_clients() -> None:
+    """Drop cached clients and close the shared connection pool."""
+    global _http_client
+    with _lock:
+        _clients.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
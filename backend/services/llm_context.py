@@ -0,0 +1,97 @@
+"""
+Token-budget-aware context building for LLM prompts.
+Estimates tokens and splits long text on structural boundaries (headings,
+paragraphs, sentences) into chunks that fit a token budget.
+"""
+
+import re
+from typing import Callable, List, Optional, Tuple
+
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+_token_counter: Optional[Callable[[str], int]] = None
+
+
+def _get_token_counter() -> Callable[[str], int]:
+    """Use tiktoken when installed; otherwise fall back to a chars/4 heuristic."""
+    global _token_counter
+    if _token_counter is None:
+        try:
+            import tiktoken  # type: ignore
+
+            encoding = tiktoken.get_encoding("cl100k_base")
+            _token_counter = lambda text: len(encoding.encode(text))  # noqa: E731
+        except Exception:
+            _token_counter = lambda text: (len(text) + 3) // 4  # noqa: E731
+    return _token_counter
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimated number of model tokens in `text`."""
+    if not text:
+        return 0
+    return _get_token_counter()(text)
+
+
+def truncate_to_budget(text: str, max_tokens: int) -> str:
+    """Cut `text` to roughly `max_tokens`, preferring a sentence or word boundary."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # Estimate the cut from the observed chars-per-token ratio, then back off to a boundary
+    cut = int(len(text) * max_tokens / estimate_tokens(text))
+    head = text[:cut]
+    boundary = max(head.rfind(". "), head.rfind("\n"))
+    if boundary > cut // 2:
+        return head[: boundary + 1].rstrip()
+    return head.rsplit(" ", 1)[0].rstrip()
+
+
+def _split_units(text: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """Break text into units no larger than the budget: paragraphs, then sentences.
+
+    Each unit is paired with the separator that joins it to the previous one, so
+    sentences of one paragraph stay on one line when packed back together.
+    """
+    units: List[Tuple[str, str]] = []
+    for paragraph in _BLANK_LINES.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if estimate_tokens(paragraph) <= max_tokens:
+            units.append((paragraph, "\n\n"))
+            continue
+        separator = "\n\n"
+        for sentence in _SENTENCE_END.split(paragraph):
+            while estimate_tokens(sentence) > max_tokens:
+                piece = truncate_to_budget(sentence, max_tokens) or sentence[: max_tokens * 4]
+                units.append((piece, separator))
+                separator = " "
+                sentence = sentence[len(piece) :].lstrip()
+            if sentence:
+                units.append((sentence, separator))
+                separator = " "
+    return units
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """Split text on structural boundaries into chunks of at most `max_tokens`.
+
+    Adjacent paragraphs are packed together so chunks are as full as the budget allows.
+    """
+    chunks: List[str] = []
+    current = ""
+    current_tokens = 0
+    for unit, separator in _split_units(text, max_tokens):
+        unit_tokens = estimate_tokens(unit)
+        if current and current_tokens + estimate_tokens(separator) + unit_tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = "", 0
+        if current:
+            current += separator
+            current_tokens += estimate_tokens(separator)
+        current += unit
+        current_tokens += unit_tokens
+    if current:
+        chunks.append(current)
+    return chunks
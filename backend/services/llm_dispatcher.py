@@ -0,0 +1,243 @@
+"""
+Central dispatcher for outbound LLM calls.
+Bounds concurrent calls per process, paces them with a requests-per-minute token bucket,
+and coalesces identical in-flight prompts so concurrent callers share one response.
+Queue depth, wait times and outcomes are kept as metrics.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from backend.config import get_settings
+from backend.services.telemetry import observe_llm_call
+from backend.utils.stats import percentile
+
+
+class LLMQueueTimeout(TimeoutError):
+    """Raised when a call waits longer than the queue timeout for a slot."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` tokens a minute."""
+
+    def __init__(self, per_minute: float, capacity: int):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Take one token, sleeping until one is available or `deadline` passes."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def prompt_key(llm: Any, messages: Sequence[Any]) -> str:
+    """Identity of a call: the client instance plus every message's role and content."""
+    payload = json.dumps(
+        [[type(m).__name__, getattr(m, "content", str(m))] for m in messages], default=str
+    )
+    return hashlib.sha256(f"{id(llm)}\x1f{payload}".encode()).hexdigest()
+
+
+class LLMDispatcher:
+    """Admission control for LLM calls shared by every request in the process."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: int = 0,
+        queue_timeout: Optional[float] = None,
+        history_size: int = 500,
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._bucket = (
+            TokenBucket(requests_per_minute, capacity=max_concurrency)
+            if requests_per_minute
+            else None
+        )
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._waits_ms: Deque[float] = deque(maxlen=history_size)
+        self._counters = {
+            "requests": 0,
+            "coalesced": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+        }
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._running = 0
+
+    def invoke(self, llm: Any, messages: Sequence[Any]) -> Any:
+        """Call `llm.invoke(messages)`, sharing the result with identical concurrent calls."""
+        key = prompt_key(llm, messages)
+        with self._lock:
+            self._counters["requests"] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            with self._slot(), observe_llm_call(llm, "invoke") as call:
+                result = llm.invoke(messages)
+                call.add_usage(result)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def batch(
+        self,
+        llm: Any,
+        inputs: Sequence[Sequence[Any]],
+        max_concurrency: int,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Invoke every input through the dispatcher, returning results in input order."""
+        results: List[Any] = [None] * len(inputs)
+        for index, result in self.batch_as_completed(llm, inputs, max_concurrency, True):
+            if isinstance(result, Exception) and not return_exceptions:
+                raise result
+            results[index] = result
+        return results
+
+    def batch_as_completed(
+        self,
+        llm: Any,
+        inputs: Sequence[Sequence[Any]],
+        max_concurrency: int,
+        return_exceptions: bool = False,
+    ) -> Iterator[Tuple[int, Any]]:
+        """Yield `(index, result)` pairs as calls finish."""
+        if not inputs:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(inputs)))) as pool:
+            futures = {
+                pool.submit(self.invoke, llm, messages): index
+                for index, messages in enumerate(inputs)
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as exc:
+                    if not return_exceptions:
+                        raise
+                    yield futures[future], exc
+
+    def stream(self, llm: Any, messages: Sequence[Any]) -> Iterator[Any]:
+        """Stream chunks from `llm.stream(messages)`, holding a slot until the stream ends."""
+        with self._lock:
+            self._counters["requests"] += 1
+        with self._slot(), observe_llm_call(llm, "stream") as call:
+            for chunk in llm.stream(messages):
+                call.add_usage(chunk)
+                yield chunk
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        """Hold one concurrency slot (and one rate token) for the duration of a call."""
+        self._acquire()
+        failed = True
+        try:
+            yield
+            failed = False
+        except GeneratorExit:
+            # Streaming consumer went away; not a provider failure
+            failed = False
+            raise
+        finally:
+            self._release(failed)
+
+    def _acquire(self) -> None:
+        started = time.monotonic()
+        deadline = started + self.queue_timeout if self.queue_timeout else None
+        with self._lock:
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+        try:
+            acquired = self._slots.acquire(timeout=self.queue_timeout)
+            if acquired and self._bucket is not None and not self._bucket.acquire(deadline):
+                self._slots.release()
+                acquired = False
+        finally:
+            with self._lock:
+                self._queue_depth -= 1
+
+        with self._lock:
+            if not acquired:
+                self._counters["rejected"] += 1
+            else:
+                self._running += 1
+                self._waits_ms.append((time.monotonic() - started) * 1000)
+        if not acquired:
+            raise LLMQueueTimeout(f"No LLM capacity within {self.queue_timeout}s; try again later")
+
+    def _release(self, failed: bool) -> None:
+        with self._lock:
+            self._running -= 1
+            self._counters["failed" if failed else "completed"] += 1
+        self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.requests_per_minute or None,
+                "running": self._running,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight_prompts": len(self._in_flight),
+                **self._counters,
+                "wait_ms": {
+                    "p50": percentile(waits, 50),
+                    "p95": percentile(waits, 95),
+                    "max": round(waits[-1], 1) if waits else None,
+                },
+            }
+
+
+@lru_cache(maxsize=1)
+def get_llm_dispatcher() -> LLMDispatcher:
+    """Process-wide dispatcher configured from settings."""
+    settings = get_settings()
+    return LLMDispatcher(
+        max_concurrency=settings.llm_max_concurrency,
+        requests_per_minute=settings.llm_requests_per_minute,
+        queue_timeout=settings.llm_queue_timeout_seconds or None,
+    )
@@ -0,0 +1,230 @@
+"""
+Incremental JSON extraction for LLM responses.
+A single-pass scanner finds the first complete JSON object (or array, when asked for) in
+model output, ignoring prose and code fences around it, can repair a truncated value into its longest valid prefix
+while chunks are still arriving, and conforms results to a per-operation schema.
+"""
+
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_OPENERS = {dict: "{", list: "["}
+
+
+class JSONStreamParser:
+    """Find the first JSON value of the expected type in model output fed chunk by chunk.
+
+    Only the expected type's opening bracket starts a candidate, so a citation like "[1]"
+    in prose before an object is not mistaken for the answer. Each character is scanned once; only a candidate that turns out not to be JSON
+    (e.g. "{like this}" in prose) is rescanned from just after its opening bracket.
+    """
+
+    def __init__(self, expect: type = dict):
+        self._opener = _OPENERS[expect]
+        self._chunks: List[str] = []
+        self._length = 0
+        self._start: Optional[int] = None  # offset of the candidate's opening bracket
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        # (offset, closers) at the last comma: everything before it is complete
+        self._safe_point: Optional[Tuple[int, str]] = None
+        self._value: Any = None
+        self._done = False
+
+    @property
+    def done(self) -> bool:
+        """True once a complete top-level value has been parsed."""
+        return self._done
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once a complete value has been found."""
+        if self._done or not chunk:
+            return self._done
+        offset = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        self._scan(chunk, offset)
+        return self._done
+
+    def _text(self) -> str:
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _scan(self, text: str, offset: int) -> None:
+        index = 0
+        while index < len(text) and not self._done:
+            char = text[index]
+            position = offset + index
+            index += 1
+
+            if self._start is None:
+                if char == self._opener:
+                    self._start = position
+                    self._stack = [_CLOSERS[char]]
+            elif self._in_string:
+                self._scan_string(char)
+            elif not self._scan_container(char, position):
+                # Not JSON after all: rescan from just after this candidate's opening bracket
+                text, offset, index = self._text(), 0, self._start + 1
+                self._reset()
+
+    def _scan_string(self, char: str) -> None:
+        if self._escaped:
+            self._escaped = False
+        elif char == "\\":
+            self._escaped = True
+        elif char == '"':
+            self._in_string = False
+
+    def _scan_container(self, char: str, position: int) -> bool:
+        """Track one character outside strings; False once the candidate cannot be JSON."""
+        if char == '"':
+            self._in_string = True
+        elif char in _CLOSERS:
+            self._stack.append(_CLOSERS[char])
+        elif char == ",":
+            self._safe_point = (position, "".join(reversed(self._stack)))
+        elif char in "}]":
+            return self._close(char, position)
+        return True
+
+    def _close(self, char: str, position: int) -> bool:
+        if char != self._stack[-1]:
+            return False
+        self._stack.pop()
+        if self._stack:
+            return True
+        try:
+            self._value = json.loads(self._text()[self._start : position + 1])
+        except ValueError:
+            return False
+        self._done = True
+        return True
+
+    def _reset(self) -> None:
+        self._start = None
+        self._stack = []
+        self._in_string = False
+        self._escaped = False
+        self._safe_point = None
+
+    def value(self) -> Any:
+        """The complete value if found, otherwise the longest valid prefix, else None."""
+        if self._done:
+            return self._value
+        return self.partial()
+
+    def partial(self) -> Any:
+        """Repair the unfinished candidate by closing its open string and containers.
+
+        Strings and numbers at the cut are kept as far as they got; anything that cannot
+        be closed (a key without a value, a half-written literal) is dropped back to the
+        last complete element.
+        """
+        if self._start is None:
+            return None
+        text = self._text()[self._start :]
+        closers = "".join(reversed(self._stack))
+
+        repaired = (text[:-1] if self._escaped else text) + ('"' if self._in_string else "")
+        for attempt in (repaired, repaired.rstrip().rstrip(",:")):
+            try:
+                return json.loads(attempt + closers)
+            except ValueError:
+                pass
+
+        if self._safe_point is not None:
+            position, safe_closers = self._safe_point
+            try:
+                return json.loads(self._text()[self._start : position] + safe_closers)
+            except ValueError:
+                pass
+        try:
+            return json.loads(text[0] + _CLOSERS[text[0]])
+        except ValueError:
+            return None
+
+
+def extract_json(text: str, expect: type = dict) -> Tuple[Any, bool]:
+    """Return `(value, complete)` for the first JSON object in `text` (or array, with
+    `expect=list`).
+
+    `complete` is False when the value was repaired from truncated output, and the value
+    is None when no JSON could be recovered.
+    """
+    parser = JSONStreamParser(expect)
+    parser.feed(text or "")
+    return parser.value(), parser.done
+
+
+class Field(NamedTuple):
+    kind: Any  # a type, tuple of types, or a tuple of allowed string values
+    default: Any = None
+    item: Optional[type] = None  # element type for lists
+
+
+SYLLABUS_SCHEMA: Dict[str, Field] = {
+    "summary": Field(str, ""),
+    "key_points": Field(list, [], str),
+    "grading_policy": Field(dict, None),
+    "important_dates": Field(list, [], dict),
+    "requirements": Field(list, [], str),
+    "resources": Field(list, [], str),
+}
+
+ASSIGNMENT_SCHEMA: Dict[str, Field] = {
+    "assignment_type": Field(("essay", "project", "quiz", "homework", "exam", "other"), "other"),
+    "complexity": Field(("low", "medium", "high"), "medium"),
+    "estimated_hours": Field((int, float), None),
+    "key_concepts": Field(list, [], str),
+    "suggested_approach": Field(str, ""),
+    "potential_challenges": Field(list, [], str),
+    "preparation_tips": Field(list, [], str),
+}
+
+
+def conform(data: Any, schema: Dict[str, Field]) -> dict[str, Any]:
+    """Keep the schema's fields, coercing or defaulting values of the wrong shape."""
+    data = data if isinstance(data, dict) else {}
+    result: dict[str, Any] = {}
+    for name, field in schema.items():
+        value = data.get(name)
+        result[name] = _coerce(value, field)
+    return result
+
+
+def _coerce(value: Any, field: Field) -> Any:
+    default = list(field.default) if isinstance(field.default, list) else field.default
+    if value is None:
+        return default
+
+    kind = field.kind
+    if isinstance(kind, tuple) and kind and all(isinstance(k, str) for k in kind):
+        value = str(value).strip().lower()
+        return value if value in kind else default
+    if kind == (int, float):
+        if isinstance(value, bool):
+            return default
+        if isinstance(value, (int, float)):
+            return value
+        try:
+            return float(str(value).strip().split()[0])
+        except (ValueError, IndexError):
+            return default
+    if kind is list:
+        if not isinstance(value, list):
+            return default
+        return [v for v in value if field.item is None or isinstance(v, field.item)]
+    if kind is str:
+        return value if isinstance(value, str) else str(value)
+    return value if isinstance(value, kind) else default
+
+
+def conform_string_list(data: Any) -> List[str]:
+    """Strings from a JSON array, or an empty list."""
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, str) and item.strip()]
@@ -4,10 +4,9 @@ Provides syllabus summarization, assignment analysis, and intelligent insights.
 """
 
 import json
-import os
-import re
-from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+import time
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, Optional
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
@@ -15,38 +14,60 @@ from sqlalchemy.orm import Session
 from backend.config import get_settings
 from backend.db.session import get_db
 from backend.models import Assignment, Course
+from backend.services.analysis_cache import AnalysisCache, assignment_scope, course_scope
+from backend.services.llm_client import chat_messages, get_chat_model
+from backend.services.llm_context import (
+    estimate_tokens,
+    split_into_chunks,
+    truncate_to_budget,
+)
+from backend.services.llm_dispatcher import get_llm_dispatcher
+from backend.services.llm_json import (
+    ASSIGNMENT_SCHEMA,
+    SYLLABUS_SCHEMA,
+    conform,
+    conform_string_list,
+    extract_json,
+)
+from backend.services.question_cache import QuestionCache
+from backend.services.read_models import (
+    AssignmentRow,
+    load_assignment,
+    load_assignments,
+    select_assignments,
+)
+from backend.services.search_index import SearchIndex
+from backend.services.study_planner import plan_study_schedule, upcoming_assignments
+
+# Bump when a prompt changes so cached analyses from the old prompt are not reused
+SYLLABUS_PROMPT_VERSION = "syllabus-v2"
+SYLLABUS_CHUNK_PROMPT_VERSION = "syllabus-chunk-v1"
+ASSIGNMENT_PROMPT_VERSION = "assignment-v1"
+
+# Map-reduce rounds before the remaining notes are truncated to the budget
+MAX_REDUCE_ROUNDS = 3
 
 
 class CanvasLLMService:
     """LLM service for intelligent Canvas content analysis."""
 
+    model_name = "gpt-4o-mini"
+
     def __init__(self, db: Session):
         self.db = db
         self.settings = get_settings()
+        self.cache = AnalysisCache(db)
+        self.question_cache = QuestionCache(db)
 
-        # Initialize OpenAI client lazily and handle optional dependency
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-
-        try:
-            from langchain_openai import ChatOpenAI  # type: ignore
-
-            self.llm = ChatOpenAI(
-                model="gpt-4o-mini",
-                temperature=0.1,
-                openai_api_key=openai_api_key,
-            )
-        except Exception as exc:  # ImportError or others
-            raise ImportError(
-                "langchain-openai is required for LLM endpoints. Install it to enable these routes."
-            ) from exc
+        # Shared per-process client; raises ValueError/ImportError when not configured
+        self.llm = get_chat_model(self.model_name)
+        self.dispatcher = get_llm_dispatcher()
 
     def summarize_syllabus(self, course_id: int) -> dict[str, Any]:
         """Analyze and summarize a course syllabus."""
         course = self.db.query(Course).filter(Course.canvas_course_id == course_id).first()
 
-        if not course or not course.syllabus_body:
+        if not course or not course.syllabus_text:
             return {
                 "course_id": course_id,
                 "course_name": course.name if course else "Unknown",
@@ -57,8 +78,21 @@ class CanvasLLMService:
                 "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
             }
 
-        # Clean HTML and prepare text
-        syllabus_text = self._clean_html(course.syllabus_body)
+        # Plain text cleaned from the HTML at sync time
+        syllabus_text = course.syllabus_text
+
+        cache_input = f"{course.name}\n{syllabus_text}"
+        cached = self.cache.get(
+            "summarize_syllabus", self.model_name, SYLLABUS_PROMPT_VERSION, cache_input
+        )
+        if cached:
+            return {
+                "course_id": course_id,
+                "course_name": course.name,
+                "analysis": cached["result"],
+                "analysis_timestamp": cached["cached_at"],
+                "cached": True,
+            }
 
         # Create analysis prompt
         system_prompt = """You are an expert academic advisor analyzing course syllabi.
@@ -82,37 +116,41 @@ class CanvasLLMService:
             "resources": ["resource1", "resource2", ...]
         }"""
 
-        human_prompt = f"""Analyze this course syllabus for {course.name}:
+        try:
+            syllabus_context = self._syllabus_context(course_id, course.name, syllabus_text)
+            human_prompt = f"""Analyze this course syllabus for {course.name}:
 
-        {syllabus_text[:4000]}  # Limit to avoid token limits
+        {syllabus_context}
 
         Provide a structured analysis in JSON format."""
 
-        try:
-            # Import at call time to avoid hard dependency at import time
-            from langchain.schema import HumanMessage, SystemMessage  # type: ignore
+            response = self.dispatcher.invoke(self.llm, chat_messages(system_prompt, human_prompt))
 
-            response = self.llm.invoke(
-                [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=human_prompt),
-                ]
-            )
-
-            # Parse JSON response
+            # Extract JSON from response (in case there's extra text or it was cut off)
             analysis_text = response.content
-            # Extract JSON from response (in case there's extra text)
-            json_match = re.search(r"\{.*\}", analysis_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
+            parsed, complete = extract_json(analysis_text)
+            if isinstance(parsed, dict):
+                analysis = conform(parsed, SYLLABUS_SCHEMA)
             else:
-                analysis = {"summary": analysis_text, "key_points": [], "grading_policy": None}
+                analysis = conform({"summary": analysis_text}, SYLLABUS_SCHEMA)
+
+            # A truncated or non-JSON response is still returned, but not cached
+            if complete and isinstance(parsed, dict):
+                self.cache.set(
+                    "summarize_syllabus",
+                    self.model_name,
+                    SYLLABUS_PROMPT_VERSION,
+                    cache_input,
+                    analysis,
+                    scope=course_scope(course_id),
+                )
 
             return {
                 "course_id": course_id,
                 "course_name": course.name,
                 "analysis": analysis,
                 "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
+                "cached": False,
             }
 
         except Exception as e:
@@ -125,21 +163,200 @@ class CanvasLLMService:
                 "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
             }
 
+    def _syllabus_context(self, course_id: int, course_name: str, syllabus_text: str) -> str:
+        """Fit the syllabus into the prompt budget.
+
+        Short syllabi are sent whole. Longer ones are split on section boundaries, each
+        chunk is condensed to notes in parallel (map), and the notes replace the text for
+        the final analysis (reduce), repeating while the notes are still over budget.
+        """
+        budget = self.settings.llm_syllabus_token_budget
+        text = syllabus_text
+        for _ in range(MAX_REDUCE_ROUNDS):
+            if estimate_tokens(text) <= budget:
+                return text
+            chunks = split_into_chunks(text, self.settings.llm_chunk_token_budget)
+            notes = self._summarize_chunks(course_id, course_name, chunks)
+            text = "\n\n".join(
+                f"Section {i} of {len(notes)}:\n{note}" for i, note in enumerate(notes, 1)
+            )
+        return truncate_to_budget(text, budget)
+
+    def _summarize_chunks(self, course_id: int, course_name: str, chunks: List[str]) -> List[str]:
+        """Condense syllabus chunks to notes, reusing cached notes for unchanged chunks."""
+        system_prompt = """You are extracting facts from one section of a course syllabus.
+        List, as short bullet points, everything in this section about learning objectives,
+        grading weights and policies, late and attendance policies, dates and deadlines,
+        requirements, and required materials. Keep exact numbers and dates. If the section
+        contains none of these, reply with "No relevant details"."""
+
+        hits = self.cache.get_many(
+            "summarize_syllabus_chunk",
+            self.model_name,
+            SYLLABUS_CHUNK_PROMPT_VERSION,
+            [f"{course_name}\n{chunk}" for chunk in chunks],
+        )
+        notes: List[Optional[str]] = [None] * len(chunks)
+        pending: List[int] = []
+        for index, cached in enumerate(hits):
+            if cached:
+                notes[index] = cached["result"]["notes"]
+            else:
+                pending.append(index)
+
+        if pending:
+            responses = self.dispatcher.batch(
+                self.llm,
+                [
+                    chat_messages(
+                        system_prompt, f"Syllabus section from {course_name}:\n\n{chunks[index]}"
+                    )
+                    for index in pending
+                ],
+                max_concurrency=self.settings.llm_batch_max_concurrency,
+            )
+            for index, response in zip(pending, responses, strict=True):
+                notes[index] = response.content.strip()
+                self.cache.set(
+                    "summarize_syllabus_chunk",
+                    self.model_name,
+                    SYLLABUS_CHUNK_PROMPT_VERSION,
+                    f"{course_name}\n{chunks[index]}",
+                    {"notes": notes[index]},
+                    scope=course_scope(course_id),
+                )
+
+        return [note for note in notes if note]
+
     def analyze_assignment(self, assignment_id: int) -> dict[str, Any]:
         """Analyze assignment content and provide insights."""
-        assignment = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(Assignment.canvas_assignment_id == assignment_id)
-            .first()
+        assignment = load_assignment(
+            self.db, Assignment.canvas_assignment_id == assignment_id, with_text=True
         )
 
         if not assignment:
             return {"assignment_id": assignment_id, "error": "Assignment not found"}
 
         # Prepare assignment context
-        description = self._clean_html(assignment.description or "")
-        context = f"""
+        context = self._assignment_context(assignment)
+
+        cached = self.cache.get(
+            "analyze_assignment", self.model_name, ASSIGNMENT_PROMPT_VERSION, context
+        )
+        if cached:
+            return self._assignment_result(
+                assignment, cached["result"], cached["cached_at"], cached=True
+            )
+
+        try:
+            response = self.dispatcher.invoke(self.llm, self._assignment_messages(context))
+            analysis = self._store_assignment_analysis(assignment, context, response.content)
+            return self._assignment_result(
+                assignment, analysis, datetime.now(timezone.utc).isoformat(), cached=False
+            )
+
+        except Exception as e:
+            return {
+                "assignment_id": assignment_id,
+                "assignment_name": assignment.name,
+                "error": f"Analysis failed: {str(e)}",
+            }
+
+    def analyze_course_assignments(
+        self, course_id: int, max_concurrency: Optional[int] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Analyze every assignment in a course, yielding results as they complete.
+
+        Cached analyses are yielded first; the rest go through the client's batch API
+        with bounded concurrency. The last item is a summary of the run.
+        """
+        course = self.db.query(Course).filter(Course.canvas_course_id == course_id).first()
+        if not course:
+            return iter([{"course_id": course_id, "error": "Course not found"}])
+
+        assignments = load_assignments(
+            self.db,
+            select_assignments(Assignment.course_id == course.id, with_text=True).order_by(
+                Assignment.due_at
+            ),
+        )
+
+        contexts = [self._assignment_context(assignment) for assignment in assignments]
+        hits = self.cache.get_many(
+            "analyze_assignment", self.model_name, ASSIGNMENT_PROMPT_VERSION, contexts
+        )
+
+        cached_results: List[dict[str, Any]] = []
+        pending: List[tuple[AssignmentRow, str]] = []
+        for assignment, context, cached in zip(assignments, contexts, hits, strict=True):
+            if cached:
+                cached_results.append(
+                    self._assignment_result(
+                        assignment, cached["result"], cached["cached_at"], cached=True
+                    )
+                )
+            else:
+                pending.append((assignment, context))
+
+        return self._stream_assignment_batch(
+            course_id,
+            cached_results,
+            pending,
+            max_concurrency or self.settings.llm_batch_max_concurrency,
+        )
+
+    def _stream_assignment_batch(
+        self,
+        course_id: int,
+        cached_results: List[dict[str, Any]],
+        pending: List[tuple[AssignmentRow, str]],
+        max_concurrency: int,
+    ) -> Iterator[dict[str, Any]]:
+        yield from cached_results
+
+        failed = 0
+        if pending:
+            outputs = self.dispatcher.batch_as_completed(
+                self.llm,
+                [self._assignment_messages(context) for _, context in pending],
+                max_concurrency=max_concurrency,
+                return_exceptions=True,
+            )
+            for index, response in outputs:
+                assignment, context = pending[index]
+                try:
+                    if isinstance(response, Exception):
+                        raise response
+                    analysis = self._store_assignment_analysis(
+                        assignment, context, response.content
+                    )
+                except Exception as e:
+                    failed += 1
+                    yield {
+                        "assignment_id": assignment.canvas_assignment_id,
+                        "assignment_name": assignment.name,
+                        "error": f"Analysis failed: {str(e)}",
+                    }
+                    continue
+                yield self._assignment_result(
+                    assignment, analysis, datetime.now(timezone.utc).isoformat(), cached=False
+                )
+
+        yield {
+            "course_id": course_id,
+            "done": True,
+            "total": len(cached_results) + len(pending),
+            "cached": len(cached_results),
+            "analyzed": len(pending) - failed,
+            "failed": failed,
+        }
+
+    def _assignment_context(self, assignment: AssignmentRow) -> str:
+        description = truncate_to_budget(
+            assignment.description_text or "",
+            self.settings.llm_assignment_token_budget,
+        )
+        return f"""
         Course: {assignment.course.name}
         Assignment: {assignment.name}
         Due Date: {assignment.due_at.isoformat() if assignment.due_at else 'Not specified'}
@@ -147,9 +364,10 @@ class CanvasLLMService:
         Submission Types: {assignment.submission_types or 'Not specified'}
 
         Description:
-        {description[:2000]}
+        {description}
         """
 
+    def _assignment_messages(self, context: str) -> list:
         system_prompt = """You are an expert academic tutor analyzing assignment details.
             Provide helpful insights including:
             1. Assignment type and complexity
@@ -169,172 +387,170 @@ class CanvasLLMService:
                 "preparation_tips": ["tip1", "tip2", ...]
             }"""
 
-        try:
-            from langchain.schema import HumanMessage, SystemMessage  # type: ignore
-
-            response = self.llm.invoke(
-                [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=f"Analyze this assignment:\n\n{context}"),
-                ]
+        return chat_messages(system_prompt, f"Analyze this assignment:\n\n{context}")
+
+    def _store_assignment_analysis(
+        self, assignment: AssignmentRow, context: str, analysis_text: str
+    ) -> dict[str, Any]:
+        """Parse a model response and cache the resulting analysis if it was complete."""
+        parsed, complete = extract_json(analysis_text)
+        analysis = conform(parsed, ASSIGNMENT_SCHEMA)
+
+        if complete and isinstance(parsed, dict):
+            self.cache.set(
+                "analyze_assignment",
+                self.model_name,
+                ASSIGNMENT_PROMPT_VERSION,
+                context,
+                analysis,
+                scope=assignment_scope(assignment.canvas_assignment_id),
             )
-
-            analysis_text = response.content
-            json_match = re.search(r"\{.*\}", analysis_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                analysis = {"assignment_type": "other", "complexity": "medium"}
-
-            return {
-                "assignment_id": assignment_id,
-                "assignment_name": assignment.name,
-                "course_name": assignment.course.name,
-                "analysis": analysis,
-                "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-
-        except Exception as e:
-            return {
-                "assignment_id": assignment_id,
-                "assignment_name": assignment.name,
-                "error": f"Analysis failed: {str(e)}",
-            }
+        return analysis
+
+    def _assignment_result(
+        self, assignment: AssignmentRow, analysis: dict[str, Any], timestamp: str, cached: bool
+    ) -> dict[str, Any]:
+        return {
+            "assignment_id": assignment.canvas_assignment_id,
+            "assignment_name": assignment.name,
+            "course_name": assignment.course.name,
+            "analysis": analysis,
+            "analysis_timestamp": timestamp,
+            "cached": cached,
+        }
 
     def generate_study_plan(self, user_id: int, days_ahead: int = 14) -> dict[str, Any]:
-        """Generate an AI-powered personalized study plan."""
-        # Get upcoming assignments
-        upcoming_assignments = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(
-                Assignment.due_at.isnot(None),
-                Assignment.due_at >= datetime.now(timezone.utc),
-                Assignment.due_at <= datetime.now(timezone.utc) + timedelta(days=days_ahead),
-            )
-            .order_by(Assignment.due_at)
-            .all()
-        )
+        """Generate a personalized study plan.
 
-        if not upcoming_assignments:
+        The schedule comes from the local solver; the model only phrases the tips.
+        """
+        upcoming = upcoming_assignments(self.db, days_ahead)
+
+        if not upcoming:
             return {
                 "message": "No upcoming assignments in the specified timeframe",
                 "study_plan": [],
             }
 
-        # Prepare assignment data for LLM
-        assignments_data = []
-        for assignment in upcoming_assignments[:10]:  # Limit to top 10
-            days_until = (assignment.due_at - datetime.now(timezone.utc)).days
-            assignments_data.append(
-                {
-                    "name": assignment.name,
-                    "course": assignment.course.name,
-                    "due_in_days": days_until,
-                    "points": assignment.points_possible or 0,
-                    "submission_types": assignment.submission_types or "",
-                }
-            )
-
-        system_prompt = """You are an expert academic advisor creating personalized study plans.
-        Based on the upcoming assignments, create a day-by-day study plan that:
-        1. Prioritizes assignments by urgency and importance
-        2. Breaks down large tasks into manageable chunks
-        3. Balances workload across different courses
-        4. Includes buffer time for unexpected issues
-        5. Suggests optimal study strategies
-
-        Return a structured study plan in JSON format:
-        {
-            "study_strategy": "balanced|intensive|sprint",
-            "total_estimated_hours": number,
-            "daily_plan": [
-                {
-                    "day": 1,
-                    "date": "YYYY-MM-DD",
-                    "tasks": [
-                        {
-                "generated_at": datetime.now(timezone.utc).isoformat(),
-                            "course": "course name",
-                            "task": "specific task to do",
-                            "estimated_hours": number,
-                            "priority": "high|medium|low"
-                        }
-                    ],
-                    "total_hours": number
-                }
-            ],
-            "tips": ["tip1", "tip2", ...]
-        }"""
-
-        human_prompt = f"""Create a {days_ahead}-day study plan for these upcoming assignments:
-
-        {json.dumps(assignments_data, indent=2)}
+        study_plan = plan_study_schedule(upcoming, days_ahead, self.settings.study_plan_daily_hours)
+        if self.settings.study_plan_llm_tips:
+            study_plan["tips"] = self._study_plan_tips(study_plan)
+
+        return {
+            "user_id": user_id,
+            "timeframe_days": days_ahead,
+            "assignments_count": len(upcoming),
+            "study_plan": study_plan,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def _study_plan_tips(self, study_plan: dict[str, Any]) -> List[str]:
+        """Ask the model for tips tailored to a computed plan, keeping the defaults on failure."""
+        busiest = max(study_plan["daily_plan"], key=lambda d: d["total_hours"], default=None)
+        summary = {
+            "strategy": study_plan["study_strategy"],
+            "total_hours": study_plan["total_estimated_hours"],
+            "days_with_work": len(study_plan["daily_plan"]),
+            "busiest_day": (
+                {"date": busiest["date"], "hours": busiest["total_hours"]} if busiest else None
+            ),
+            "at_risk": [item["assignment"] for item in study_plan["unscheduled"]],
+        }
+
+        system_prompt = """You are an expert academic advisor. A student's study schedule has
+        already been computed. Write 3-5 short, specific tips for following it.
+        Return only a JSON array of strings."""
 
-        Today's date: {datetime.now().strftime('%Y-%m-%d')}
+        try:
+            response = self.dispatcher.invoke(
+                self.llm, chat_messages(system_prompt, json.dumps(summary, indent=2))
+            )
+            tips, complete = extract_json(response.content, expect=list)
+            tips = conform_string_list(tips)
+            if complete and tips:
+                return tips
+        except Exception:
+            pass
+        return study_plan["tips"]
 
-        Consider the student's workload and create a realistic, achievable plan."""
+    def ask_question(
+        self, user_id: int, question: str, context_course_id: Optional[int] = None
+    ) -> dict[str, Any]:  # Updated typing for Python 3.9
+        """Answer student questions using Canvas data as context."""
+        cached = self.question_cache.get(user_id, context_course_id, self.model_name, question)
+        if cached:
+            return {
+                "question": question,
+                "answer": cached["answer"],
+                "context_course_id": context_course_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "cached": True,
+            }
 
         try:
-            from langchain.schema import HumanMessage, SystemMessage  # type: ignore
-
-            response = self.llm.invoke(
-                [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=human_prompt),
-                ]
+            response = self.dispatcher.invoke(
+                self.llm, self._ask_messages(user_id, question, context_course_id)
+            )
+            self.question_cache.set(
+                user_id, context_course_id, self.model_name, question, response.content
             )
-
-            analysis_text = response.content
-            json_match = re.search(r"\{.*\}", analysis_text, re.DOTALL)
-            if json_match:
-                study_plan = json.loads(json_match.group())
-            else:
-                study_plan = {"study_strategy": "balanced", "daily_plan": []}
 
             return {
-                "user_id": user_id,
-                "timeframe_days": days_ahead,
-                "assignments_count": len(upcoming_assignments),
-                "study_plan": study_plan,
-                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "question": question,
+                "answer": response.content,
+                "context_course_id": context_course_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "cached": False,
             }
 
         except Exception as e:
-            return {"user_id": user_id, "error": f"Study plan generation failed: {str(e)}"}
+            return {"question": question, "error": f"Failed to generate response: {str(e)}"}
 
-    def ask_question(
+    def stream_answer(
         self, user_id: int, question: str, context_course_id: Optional[int] = None
-    ) -> dict[str, Any]:  # Updated typing for Python 3.9
-        """Answer student questions using Canvas data as context."""
+    ) -> Iterator[dict[str, Any]]:
+        """Stream an answer as token events, ending with a `done` event carrying timings."""
+        started = time.perf_counter()
+        cached = self.question_cache.get(user_id, context_course_id, self.model_name, question)
+        if cached:
+            return timed_token_stream(
+                [cached["answer"]], question, context_course_id, started, cached=True
+            )
+
+        messages = self._ask_messages(user_id, question, context_course_id)
+        return self.question_cache.store_from_stream(
+            timed_token_stream(
+                (chunk.content for chunk in self.dispatcher.stream(self.llm, messages)),
+                question,
+                context_course_id,
+                started,
+            ),
+            user_id,
+            context_course_id,
+            self.model_name,
+            question,
+        )
+
+    def _ask_messages(
+        self, user_id: int, question: str, context_course_id: Optional[int] = None
+    ) -> list:
         context_data = ""
 
         if context_course_id:
-            # Get course context
             course = (
                 self.db.query(Course).filter(Course.canvas_course_id == context_course_id).first()
             )
-
             if course:
-                assignments = (
-                    self.db.query(Assignment)
-                    .filter(Assignment.course_id == course.id)
-                    .order_by(Assignment.due_at.desc())
-                    .limit(5)
-                    .all()
-                )
+                context_data = f"Course Context: {course.name}\n"
 
-                context_data = f"""
-                Course Context: {course.name}
-                Recent Assignments:
-                """
-                for assignment in assignments:
-                    due_str = (
-                        assignment.due_at.strftime("%Y-%m-%d")
-                        if assignment.due_at
-                        else "No due date"
-                    )
-                    context_data += f"- {assignment.name} (Due: {due_str}, Points: {assignment.points_possible or 'N/A'})\n"
+        # Most relevant passages across all courses, favouring the one asked about
+        passages = SearchIndex(self.db).build_context(
+            question,
+            token_budget=self.settings.llm_ask_context_token_budget,
+            boost_course_id=context_course_id,
+        )
+        if passages:
+            context_data += f"Relevant course material:\n{passages}\n"
 
         system_prompt = """You are a helpful academic assistant with access to the student's Canvas course data.
         Answer questions about coursework, deadlines, study strategies, and academic planning.
@@ -348,41 +564,51 @@ class CanvasLLMService:
 
         Please provide a helpful response based on the available context."""
 
-        try:
-            from langchain.schema import HumanMessage, SystemMessage  # type: ignore
-
-            response = self.llm.invoke(
-                [
-                    SystemMessage(content=system_prompt),
-                    HumanMessage(content=human_prompt),
-                ]
-            )
-
-            return {
-                "question": question,
-                "answer": response.content,
-                "context_course_id": context_course_id,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-
-        except Exception as e:
-            return {"question": question, "error": f"Failed to generate response: {str(e)}"}
-
-    def _clean_html(self, html_content: str) -> str:
-        """Clean HTML content and extract text."""
-        if not html_content:
-            return ""
-
-        # Remove HTML tags
-        import re
-
-        clean_text = re.sub(r"<[^>]+>", "", html_content)
-
-        # Clean up whitespace
-        clean_text = re.sub(r"\s+", " ", clean_text)
-        clean_text = clean_text.strip()
-
-        return clean_text
+        return chat_messages(system_prompt, human_prompt)
+
+
+def timed_token_stream(
+    tokens: Iterable[str],
+    question: str,
+    context_course_id: Optional[int],
+    started: float,
+    cached: bool = False,
+) -> Iterator[dict[str, Any]]:
+    """Wrap a token iterator as stream events, timing first token and total generation.
+
+    `started` is a `time.perf_counter()` reading taken when the request began. Shared
+    with the mock service so both emit the same event shapes.
+    """
+    first_token_ms: Optional[float] = None
+    parts: List[str] = []
+    try:
+        for token in tokens:
+            if not token:
+                continue
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            parts.append(token)
+            yield {"event": "token", "data": {"content": token}}
+    except Exception as e:
+        yield {"event": "error", "data": {"error": f"Failed to generate response: {str(e)}"}}
+        return
+
+    yield {
+        "event": "done",
+        "data": {
+            "question": question,
+            "answer": "".join(parts),
+            "context_course_id": context_course_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "cached": cached,
+            "timing": {
+                "time_to_first_token_ms": (
+                    round(first_token_ms, 1) if first_token_ms is not None else None
+                ),
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+            },
+        },
+    }
 
 
 def get_llm_service(db: Session = Depends(get_db)) -> CanvasLLMService:
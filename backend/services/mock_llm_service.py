@@ -1,23 +1,176 @@
 """
 Mock LLM service for testing without OpenAI API key.
-Provides simulated intelligent responses for demonstration.
+Provides simulated intelligent responses for demonstration. Calls go through the shared
+LLM dispatcher to a mock chat model whose latency, streaming pace and failures are
+configurable, so load tests see the same queuing and caching behaviour as the real service.
 """
 
-from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Iterator, List, Optional, Sequence
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from backend.config import get_settings
 from backend.db.session import get_db
 from backend.models import Assignment, Course
+from backend.services.analysis_cache import AnalysisCache, assignment_scope, course_scope
+from backend.services.llm_dispatcher import get_llm_dispatcher
+from backend.services.llm_service import (
+    ASSIGNMENT_PROMPT_VERSION,
+    SYLLABUS_PROMPT_VERSION,
+    timed_token_stream,
+)
+from backend.services.question_cache import QuestionCache
+from backend.services.read_models import (
+    AssignmentRow,
+    load_assignment,
+    load_assignments,
+    select_assignments,
+)
+from backend.services.study_planner import (
+    DEFAULT_TIPS,
+    plan_study_schedule,
+    upcoming_assignments,
+)
+
+_WORD_WITH_SPACE = re.compile(r"\S+\s*")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+class MockLLMError(RuntimeError):
+    """Simulated provider failure."""
+
+    status_code = 500
+
+
+class MockRateLimitError(MockLLMError):
+    """Simulated provider rate limit (HTTP 429)."""
+
+    status_code = 429
+
+
+class MockMessage:
+    """Response or stream chunk with the chat model's `content` attribute."""
+
+    __slots__ = ("content",)
+
+    def __init__(self, content: Any):
+        self.content = content
+
+
+class MockChatModel:
+    """Stand-in for the chat model that replies with a scripted response.
+
+    The last message is the reply to "generate". Each call waits a sampled latency,
+    streams at `tokens_per_second`, and fails at the configured rates. All draws come
+    from one seeded generator, so a given call order sees the same latencies and faults.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        distribution: str = "fixed",
+        spread: float = 0.5,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {distribution!r}; "
+                f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.spread = spread
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._random = random.Random(seed)  # noqa: S311 - simulated latency, not security
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Latency of one call in seconds."""
+        with self._lock:
+            return self._sample_latency()
+
+    def _sample_latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.distribution == "uniform":
+            factor = self._random.uniform(1 - self.spread, 1 + self.spread)
+        elif self.distribution == "lognormal":
+            # exp(N(0, sigma)) keeps `latency_ms` as the median
+            factor = math.exp(self._random.gauss(0, self.spread))
+        else:
+            factor = 1.0
+        return max(0.0, self.latency_ms * factor) / 1000
+
+    def _start_call(self) -> None:
+        """Wait out the call's latency, raising any injected fault."""
+        with self._lock:
+            fault = self._random.random()
+            latency = self._sample_latency()
+        if fault < self.rate_limit_rate:
+            raise MockRateLimitError("Rate limit exceeded (simulated 429)")
+        time.sleep(latency)
+        if fault < self.rate_limit_rate + self.error_rate:
+            raise MockLLMError("Simulated LLM failure")
+
+    def invoke(self, messages: Sequence[Any]) -> MockMessage:
+        self._start_call()
+        return MockMessage(messages[-1])
+
+    def stream(self, messages: Sequence[Any]) -> Iterator[MockMessage]:
+        self._start_call()
+        words = _WORD_WITH_SPACE.findall(messages[-1])
+        for i in range(0, len(words), 3):
+            chunk = words[i : i + 3]
+            if self.tokens_per_second > 0:
+                time.sleep(len(chunk) / self.tokens_per_second)
+            yield MockMessage("".join(chunk))
+
+
+@lru_cache(maxsize=1)
+def get_mock_chat_model() -> MockChatModel:
+    """Process-wide mock model configured from settings, so the seeded sequence is shared."""
+    settings = get_settings()
+    return MockChatModel(
+        latency_ms=settings.mock_llm_latency_ms,
+        distribution=settings.mock_llm_latency_distribution,
+        spread=settings.mock_llm_latency_spread,
+        tokens_per_second=settings.mock_llm_tokens_per_second,
+        error_rate=settings.mock_llm_error_rate,
+        rate_limit_rate=settings.mock_llm_rate_limit_rate,
+        seed=settings.mock_llm_seed,
+    )
 
 
 class MockCanvasLLMService:
     """Mock LLM service for testing without API keys."""
 
-    def __init__(self, db: Session):
+    model_name = "mock"
+
+    def __init__(self, db: Session, llm: Optional[MockChatModel] = None):
         self.db = db
+        self.settings = get_settings()
+        self.cache = AnalysisCache(db)
+        self.question_cache = QuestionCache(db)
+        self.llm = llm or get_mock_chat_model()
+        self.dispatcher = get_llm_dispatcher()
+
+    def _generate(self, operation: str, reply: Any) -> Any:
+        """Run one simulated model call that produces `reply`."""
+        return self.dispatcher.invoke(self.llm, [operation, reply]).content
 
     def summarize_syllabus(self, course_id: int) -> dict[str, Any]:
         """Mock syllabus analysis."""
@@ -26,6 +179,19 @@ class MockCanvasLLMService:
         if not course:
             return {"course_id": course_id, "error": "Course not found"}
 
+        cache_input = f"{course.name}\n{course.syllabus_text or ''}"
+        cached = self.cache.get(
+            "summarize_syllabus", self.model_name, SYLLABUS_PROMPT_VERSION, cache_input
+        )
+        if cached:
+            return {
+                "course_id": course_id,
+                "course_name": course.name,
+                "analysis": cached["result"],
+                "analysis_timestamp": cached["cached_at"],
+                "cached": True,
+            }
+
         # Generate mock analysis based on course name
         mock_analysis = {
             "summary": f"This course, {course.name}, appears to be a comprehensive academic program designed to provide students with foundational knowledge and practical skills. The course emphasizes both theoretical understanding and hands-on application.",
@@ -63,27 +229,166 @@ class MockCanvasLLMService:
             ],
         }
 
+        try:
+            mock_analysis = self._generate(f"summarize_syllabus:{cache_input}", mock_analysis)
+        except Exception as e:
+            return {
+                "course_id": course_id,
+                "course_name": course.name,
+                "summary": f"Analysis failed: {str(e)}",
+                "key_points": [],
+                "grading_policy": None,
+                "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+
+        self.cache.set(
+            "summarize_syllabus",
+            self.model_name,
+            SYLLABUS_PROMPT_VERSION,
+            cache_input,
+            mock_analysis,
+            scope=course_scope(course_id),
+        )
+
         return {
             "course_id": course_id,
             "course_name": course.name,
             "analysis": mock_analysis,
             "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
+            "cached": False,
         }
 
     def analyze_assignment(self, assignment_id: int) -> dict[str, Any]:
         """Mock assignment analysis."""
-        assignment = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(Assignment.canvas_assignment_id == assignment_id)
-            .first()
+        assignment = load_assignment(
+            self.db, Assignment.canvas_assignment_id == assignment_id, with_text=True
         )
 
         if not assignment:
             return {"assignment_id": assignment_id, "error": "Assignment not found"}
 
+        cache_input = self._assignment_cache_input(assignment)
+        cached = self.cache.get(
+            "analyze_assignment", self.model_name, ASSIGNMENT_PROMPT_VERSION, cache_input
+        )
+        if cached:
+            return self._assignment_result(
+                assignment, cached["result"], cached["cached_at"], cached=True
+            )
+
+        try:
+            mock_analysis = self._generate(
+                f"analyze_assignment:{cache_input}",
+                self._mock_assignment_analysis(assignment.name),
+            )
+        except Exception as e:
+            return {
+                "assignment_id": assignment_id,
+                "assignment_name": assignment.name,
+                "error": f"Analysis failed: {str(e)}",
+            }
+        self._store_assignment_analysis(assignment, cache_input, mock_analysis)
+        return self._assignment_result(
+            assignment, mock_analysis, datetime.now(timezone.utc).isoformat(), cached=False
+        )
+
+    def analyze_course_assignments(
+        self, course_id: int, max_concurrency: Optional[int] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Mock batch analysis of a course's assignments, yielding results as they complete."""
+        course = self.db.query(Course).filter(Course.canvas_course_id == course_id).first()
+        if not course:
+            return iter([{"course_id": course_id, "error": "Course not found"}])
+
+        assignments = load_assignments(
+            self.db,
+            select_assignments(Assignment.course_id == course.id, with_text=True).order_by(
+                Assignment.due_at
+            ),
+        )
+
+        cache_inputs = [self._assignment_cache_input(assignment) for assignment in assignments]
+        hits = self.cache.get_many(
+            "analyze_assignment", self.model_name, ASSIGNMENT_PROMPT_VERSION, cache_inputs
+        )
+
+        cached_results: List[dict[str, Any]] = []
+        pending: List[tuple[AssignmentRow, str]] = []
+        for assignment, cache_input, cached in zip(assignments, cache_inputs, hits, strict=True):
+            if cached:
+                cached_results.append(
+                    self._assignment_result(
+                        assignment, cached["result"], cached["cached_at"], cached=True
+                    )
+                )
+            else:
+                pending.append((assignment, cache_input))
+
+        return self._stream_assignment_batch(
+            course_id,
+            cached_results,
+            pending,
+            max_concurrency or self.settings.llm_batch_max_concurrency,
+        )
+
+    def _stream_assignment_batch(
+        self,
+        course_id: int,
+        cached_results: List[dict[str, Any]],
+        pending: List[tuple[AssignmentRow, str]],
+        max_concurrency: int,
+    ) -> Iterator[dict[str, Any]]:
+        yield from cached_results
+
+        failed = 0
+        if pending:
+            # Same path as the real service: the dispatcher's bounded batch, results in
+            # completion order. Only plain values cross threads.
+            outputs = self.dispatcher.batch_as_completed(
+                self.llm,
+                [
+                    [
+                        f"analyze_assignment:{cache_input}",
+                        self._mock_assignment_analysis(assignment.name),
+                    ]
+                    for assignment, cache_input in pending
+                ],
+                max_concurrency=max_concurrency,
+                return_exceptions=True,
+            )
+            for index, response in outputs:
+                assignment, cache_input = pending[index]
+                if isinstance(response, Exception):
+                    failed += 1
+                    yield {
+                        "assignment_id": assignment.canvas_assignment_id,
+                        "assignment_name": assignment.name,
+                        "error": f"Analysis failed: {str(response)}",
+                    }
+                    continue
+                self._store_assignment_analysis(assignment, cache_input, response.content)
+                yield self._assignment_result(
+                    assignment,
+                    response.content,
+                    datetime.now(timezone.utc).isoformat(),
+                    cached=False,
+                )
+
+        yield {
+            "course_id": course_id,
+            "done": True,
+            "total": len(cached_results) + len(pending),
+            "cached": len(cached_results),
+            "analyzed": len(pending) - failed,
+            "failed": failed,
+        }
+
+    def _assignment_cache_input(self, assignment: AssignmentRow) -> str:
+        return f"{assignment.name}\n{assignment.description_text or ''}"
+
+    def _mock_assignment_analysis(self, name: str) -> dict[str, Any]:
         # Determine assignment type based on name
-        name_lower = assignment.name.lower()
+        name_lower = (name or "").lower()
         if "quiz" in name_lower:
             assignment_type = "quiz"
             complexity = "low"
@@ -115,7 +420,7 @@ class MockCanvasLLMService:
                 "Research and information synthesis",
                 "Clear communication and presentation",
             ],
-            "suggested_approach": f"Start by reviewing the {assignment.name} requirements carefully. Break the work into smaller, manageable tasks. Begin with research and outlining, then proceed with the main work. Allow time for review and revision before submission.",
+            "suggested_approach": f"Start by reviewing the {name} requirements carefully. Break the work into smaller, manageable tasks. Begin with research and outlining, then proceed with the main work. Allow time for review and revision before submission.",
             "potential_challenges": [
                 "Time management and deadline pressure",
                 "Understanding complex requirements",
@@ -131,96 +436,55 @@ class MockCanvasLLMService:
             ],
         }
 
+        return mock_analysis
+
+    def _store_assignment_analysis(
+        self, assignment: AssignmentRow, cache_input: str, analysis: dict[str, Any]
+    ) -> None:
+        self.cache.set(
+            "analyze_assignment",
+            self.model_name,
+            ASSIGNMENT_PROMPT_VERSION,
+            cache_input,
+            analysis,
+            scope=assignment_scope(assignment.canvas_assignment_id),
+        )
+
+    def _assignment_result(
+        self, assignment: AssignmentRow, analysis: dict[str, Any], timestamp: str, cached: bool
+    ) -> dict[str, Any]:
         return {
-            "assignment_id": assignment_id,
+            "assignment_id": assignment.canvas_assignment_id,
             "assignment_name": assignment.name,
             "course_name": assignment.course.name,
-            "analysis": mock_analysis,
-            "analysis_timestamp": datetime.now(timezone.utc).isoformat(),
+            "analysis": analysis,
+            "analysis_timestamp": timestamp,
+            "cached": cached,
         }
 
     def generate_study_plan(self, user_id: int, days_ahead: int = 14) -> dict[str, Any]:
-        """Mock study plan generation."""
-        # Get upcoming assignments
-        upcoming_assignments = (
-            self.db.query(Assignment)
-            .join(Course)
-            .filter(
-                Assignment.due_at.isnot(None),
-                Assignment.due_at >= datetime.now(timezone.utc),
-                Assignment.due_at <= datetime.now(timezone.utc) + timedelta(days=days_ahead),
-            )
-            .order_by(Assignment.due_at)
-            .limit(10)
-            .all()
-        )
+        """Study plan from the local solver, with the default tips."""
+        upcoming = upcoming_assignments(self.db, days_ahead)
 
-        if not upcoming_assignments:
+        if not upcoming:
             return {
                 "message": "No upcoming assignments in the specified timeframe",
                 "study_plan": [],
             }
 
-        # Generate mock study plan
-        daily_plan = []
-        current_date = datetime.now().date()
-
-        for day in range(min(7, days_ahead)):  # Generate plan for up to 7 days
-            plan_date = current_date + timedelta(days=day)
-
-            # Assign 1-2 tasks per day
-            tasks = []
-            for _i, assignment in enumerate(upcoming_assignments[:2]):
-                task_name = f"Work on {assignment.name}"
-                if "quiz" in assignment.name.lower():
-                    task_name = f"Study for {assignment.name}"
-                elif "exam" in assignment.name.lower():
-                    task_name = f"Review materials for {assignment.name}"
-
-                priority = (
-                    "high"
-                    if (assignment.due_at - datetime.now(timezone.utc)).days <= 2
-                    else "medium"
-                )
-
-                tasks.append(
-                    {
-                        "assignment": assignment.name,
-                        "course": assignment.course.name,
-                        "task": task_name,
-                        "estimated_hours": 2 + day,  # Vary hours
-                        "priority": priority,
-                    }
-                )
-
-            daily_plan.append(
-                {
-                    "day": day + 1,
-                    "date": plan_date.strftime("%Y-%m-%d"),
-                    "tasks": tasks,
-                    "total_hours": sum(task["estimated_hours"] for task in tasks),
-                }
-            )
-
-        mock_study_plan = {
-            "study_strategy": "balanced",
-            "total_estimated_hours": sum(day["total_hours"] for day in daily_plan),
-            "daily_plan": daily_plan,
-            "tips": [
-                "Start each study session with a clear goal",
-                "Take regular breaks to maintain focus",
-                "Review previous material before starting new topics",
-                "Use active learning techniques like summarizing and teaching",
-                "Maintain a consistent study schedule",
-                "Create a distraction-free study environment",
-            ],
-        }
+        study_plan = plan_study_schedule(upcoming, days_ahead, self.settings.study_plan_daily_hours)
+        if self.settings.study_plan_llm_tips:
+            # Simulate the tips call; like the real service, keep the defaults on failure
+            try:
+                study_plan["tips"] = self._generate("study_plan_tips", list(DEFAULT_TIPS))
+            except Exception:
+                pass
 
         return {
             "user_id": user_id,
             "timeframe_days": days_ahead,
-            "assignments_count": len(upcoming_assignments),
-            "study_plan": mock_study_plan,
+            "assignments_count": len(upcoming),
+            "study_plan": study_plan,
             "generated_at": datetime.now(timezone.utc).isoformat(),
         }
 
@@ -228,6 +492,51 @@ class MockCanvasLLMService:
         self, user_id: int, question: str, context_course_id: Optional[int] = None
     ) -> dict[str, Any]:
         """Mock Q&A responses."""
+        cached = self.question_cache.get(user_id, context_course_id, self.model_name, question)
+        if cached:
+            answer = cached["answer"]
+        else:
+            try:
+                answer = self._generate(
+                    f"ask:{context_course_id}:{question}", self._mock_answer(question)
+                )
+            except Exception as e:
+                return {"question": question, "error": f"Failed to generate response: {str(e)}"}
+            self.question_cache.set(user_id, context_course_id, self.model_name, question, answer)
+        return {
+            "question": question,
+            "answer": answer,
+            "context_course_id": context_course_id,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "cached": cached is not None,
+        }
+
+    def stream_answer(
+        self, user_id: int, question: str, context_course_id: Optional[int] = None
+    ) -> Iterator[dict[str, Any]]:
+        """Mock token stream: the canned answer in three-word chunks at the configured pace."""
+        started = time.perf_counter()
+        cached = self.question_cache.get(user_id, context_course_id, self.model_name, question)
+        if cached:
+            return timed_token_stream(
+                [cached["answer"]], question, context_course_id, started, cached=True
+            )
+
+        messages = [f"ask:{context_course_id}:{question}", self._mock_answer(question)]
+        return self.question_cache.store_from_stream(
+            timed_token_stream(
+                (chunk.content for chunk in self.dispatcher.stream(self.llm, messages)),
+                question,
+                context_course_id,
+                started,
+            ),
+            user_id,
+            context_course_id,
+            self.model_name,
+            question,
+        )
+
+    def _mock_answer(self, question: str) -> str:
         # Generate contextual responses based on question keywords
         question_lower = question.lower()
 
@@ -246,12 +555,7 @@ class MockCanvasLLMService:
         else:
             answer = f"That's a great question about '{question}'. Based on your current course load and upcoming assignments, I'd recommend staying organized with your coursework and maintaining regular study habits. If you need specific help with any assignment or course material, feel free to ask more detailed questions."
 
-        return {
-            "question": question,
-            "answer": answer,
-            "context_course_id": context_course_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
+        return answer
 
 
 def get_mock_llm_service(db: Session = Depends(get_db)) -> MockCanvasLLMService:
@@ -0,0 +1,176 @@
+"""
+Cache of answers to repeated student questions.
+Questions are normalized (case, punctuation, contractions) and matched exactly or as
+near-duplicates by character-trigram Jaccard similarity. Entries are scoped per user,
+course and model, expire after a TTL, and are invalidated when a sync changes the
+course's content.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, FrozenSet, Iterable, Iterator, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import LLMQuestionCache
+from backend.services.telemetry import record_cache_lookup
+
+_CONTRACTIONS = [
+    (re.compile(r"\bwhat's\b"), "what is"),
+    (re.compile(r"\bwhen's\b"), "when is"),
+    (re.compile(r"\bwhere's\b"), "where is"),
+    (re.compile(r"\bhow's\b"), "how is"),
+    (re.compile(r"\bwho's\b"), "who is"),
+    (re.compile(r"\bit's\b"), "it is"),
+    (re.compile(r"n't\b"), " not"),
+    (re.compile(r"'re\b"), " are"),
+    (re.compile(r"'m\b"), " am"),
+]
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, expand common contractions and strip punctuation."""
+    text = question.lower().replace("’", "'")
+    for pattern, replacement in _CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the character trigrams of two normalized questions."""
+    if a == b:
+        return 1.0
+    grams_a, grams_b = _trigrams(a), _trigrams(b)
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+class QuestionCache:
+    """Exact and near-duplicate lookup of previous answers in `llm_question_cache`."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+
+    def get(
+        self, user_id: int, course_id: Optional[int], model: str, question: str
+    ) -> Optional[dict[str, Any]]:
+        """Return the cached answer for this or a near-identical question, or None."""
+        if not self.settings.question_cache_enabled:
+            return None
+
+        normalized = normalize_question(question)
+        now = datetime.now(timezone.utc)
+        candidates = (
+            self.db.query(LLMQuestionCache)
+            .filter(
+                LLMQuestionCache.user_id == user_id,
+                (
+                    LLMQuestionCache.canvas_course_id.is_(None)
+                    if course_id is None
+                    else LLMQuestionCache.canvas_course_id == course_id
+                ),
+                LLMQuestionCache.model == model,
+                or_(LLMQuestionCache.expires_at.is_(None), LLMQuestionCache.expires_at > now),
+            )
+            .order_by(LLMQuestionCache.last_accessed_at.desc())
+            .limit(self.settings.question_cache_max_candidates)
+            .all()
+        )
+
+        # "week 3" and "week 4" are near-identical strings but different questions
+        numbers = _NUMBER.findall(normalized)
+        best, best_score = None, self.settings.question_cache_similarity
+        for entry in candidates:
+            if _NUMBER.findall(entry.normalized_question) != numbers:
+                continue
+            score = similarity(normalized, entry.normalized_question)
+            if score >= best_score:
+                best, best_score = entry, score
+                if score == 1.0:
+                    break
+        record_cache_lookup("llm_question", hit=best is not None)
+        if best is None:
+            return None
+
+        best.hit_count = (best.hit_count or 0) + 1
+        best.last_accessed_at = now
+        self.db.commit()
+        return {
+            "answer": best.answer,
+            "matched_question": best.question,
+            "similarity": round(best_score, 3),
+            "cached_at": best.created_at.isoformat() if best.created_at else None,
+        }
+
+    def set(
+        self, user_id: int, course_id: Optional[int], model: str, question: str, answer: str
+    ) -> None:
+        """Store an answer for this question."""
+        if not self.settings.question_cache_enabled or not answer:
+            return
+
+        now = datetime.now(timezone.utc)
+        ttl_hours = self.settings.question_cache_ttl_hours
+        self.db.query(LLMQuestionCache).filter(
+            LLMQuestionCache.user_id == user_id, LLMQuestionCache.expires_at <= now
+        ).delete(synchronize_session=False)
+        self.db.add(
+            LLMQuestionCache(
+                user_id=user_id,
+                canvas_course_id=course_id,
+                model=model,
+                normalized_question=normalize_question(question),
+                question=question,
+                answer=answer,
+                hit_count=0,
+                last_accessed_at=now,
+                expires_at=now + timedelta(hours=ttl_hours) if ttl_hours else None,
+            )
+        )
+        self.db.commit()
+
+    def store_from_stream(
+        self,
+        events: Iterable[dict[str, Any]],
+        user_id: int,
+        course_id: Optional[int],
+        model: str,
+        question: str,
+    ) -> Iterator[dict[str, Any]]:
+        """Pass stream events through, caching the answer once the `done` event arrives."""
+        for event in events:
+            if event["event"] == "done":
+                try:
+                    self.set(user_id, course_id, model, question, event["data"]["answer"])
+                except Exception:
+                    self.db.rollback()
+            yield event
+
+    def invalidate_course(self, canvas_course_id: int, user_id: int) -> int:
+        """Drop answers that may depend on a course's content. Does not commit.
+
+        Questions asked without a course context draw on all of the asker's courses, so
+        the syncing user's course-less answers go too; other users' are left alone.
+        """
+        return (
+            self.db.query(LLMQuestionCache)
+            .filter(
+                or_(
+                    LLMQuestionCache.canvas_course_id == canvas_course_id,
+                    and_(
+                        LLMQuestionCache.canvas_course_id.is_(None),
+                        LLMQuestionCache.user_id == user_id,
+                    ),
+                )
+            )
+            .delete(synchronize_session=False)
+        )
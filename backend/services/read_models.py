@@ -0,0 +1,79 @@
+"""
+Lean read models for hot read paths.
+Assignments and their course are selected as plain columns and wrapped in named tuples,
+skipping the identity map, change tracking and attribute instrumentation of ORM entities.
+Attribute names match the ORM models (including `assignment.course.name`), so code that
+only reads works with either.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from backend.models import Assignment, Course
+
+
+class CourseRow(NamedTuple):
+    id: int
+    canvas_course_id: int
+    name: Optional[str]
+
+
+class AssignmentRow(NamedTuple):
+    id: int
+    canvas_assignment_id: int
+    name: Optional[str]
+    due_at: Optional[datetime]  # always timezone-aware
+    points_possible: Optional[float]
+    workflow_state: Optional[str]
+    html_url: Optional[str]
+    submission_types: Optional[str]
+    course: CourseRow
+    description_text: Optional[str] = None  # loaded only by `select_assignments(with_text=True)`
+
+
+_ASSIGNMENT_COLUMNS = (
+    Assignment.id,
+    Assignment.canvas_assignment_id,
+    Assignment.name,
+    Assignment.due_at,
+    Assignment.points_possible,
+    Assignment.workflow_state,
+    Assignment.html_url,
+    Assignment.submission_types,
+)
+_COURSE_COLUMNS = (Course.id, Course.canvas_course_id, Course.name)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite returns naive datetimes for timezone-aware columns; stored values are UTC
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def select_assignments(*criteria, with_text: bool = False) -> Select:
+    """Columns for `AssignmentRow`, joined to the course; add ordering as needed."""
+    columns = _ASSIGNMENT_COLUMNS + _COURSE_COLUMNS
+    if with_text:
+        columns += (Assignment.description_text,)
+    return select(*columns).join(Course, Assignment.course_id == Course.id).where(*criteria)
+
+
+def load_assignments(db: Session, statement: Select) -> List[AssignmentRow]:
+    """Run a `select_assignments` statement; rows of the same course share one `CourseRow`."""
+    courses: Dict[int, CourseRow] = {}
+    rows = []
+    for row in db.execute(statement):
+        course = courses.get(row[8])
+        if course is None:
+            course = courses[row[8]] = CourseRow(row[8], row[9], row[10])
+        rows.append(AssignmentRow(*row[:3], _utc(row[3]), *row[4:8], course, *row[11:]))
+    return rows
+
+
+def load_assignment(db: Session, *criteria, with_text: bool = False) -> Optional[AssignmentRow]:
+    rows = load_assignments(db, select_assignments(*criteria, with_text=with_text).limit(1))
+    return rows[0] if rows else None
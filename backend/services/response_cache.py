@@ -0,0 +1,236 @@
+"""
+Response cache for dashboard reads.
+An in-process LRU tier sits in front of an optional Redis tier (`REDIS_URL`). Keys carry
+the user and a sync generation that every sync commit bumps, so a finished sync makes all
+earlier entries unreachable instead of serving them stale. With Redis the generation is
+shared by the API and worker processes; without it, the generation includes the latest
+finished sync id on the primary, read with a short TTL, so the API sees a worker's sync
+within seconds.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.config import get_settings
+from backend.db.routing import read_router
+from backend.services.telemetry import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU map whose entries expire after `ttl_seconds`."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """The cached value, or `MISSING` when absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisTier:
+    """JSON values and the sync generation in Redis; errors degrade to cache misses."""
+
+    GENERATION_KEY = "generation"
+    RETRY_AFTER_SECONDS = 30.0  # stay off a failing Redis instead of timing out every request
+
+    def __init__(self, client: Any, prefix: str = "canvas:cache:"):
+        self.client = client
+        self.prefix = prefix
+        self._retry_at = 0.0
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisTier":
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("Redis cache requires the redis package: pip install redis") from e
+        return cls(redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25))
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _call(self, operation: str, *args, **kwargs) -> Any:
+        if not self.available:
+            return None
+        try:
+            return getattr(self.client, operation)(*args, **kwargs)
+        except Exception as e:
+            logger.warning(f"Redis {operation} failed, using the in-process cache: {str(e)}")
+            self._retry_at = time.monotonic() + self.RETRY_AFTER_SECONDS
+            return None
+
+    def get(self, key: str) -> Any:
+        raw = self._call("get", self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._call("set", self.prefix + key, json.dumps(value), ex=max(1, int(ttl_seconds)))
+
+    def generation(self) -> Optional[int]:
+        raw = self._call("get", self.prefix + self.GENERATION_KEY)
+        if raw is None:
+            return 0 if self.available else None
+        return int(raw)
+
+    def bump_generation(self) -> Optional[int]:
+        value = self._call("incr", self.prefix + self.GENERATION_KEY)
+        return None if value is None else int(value)
+
+
+class ResponseCache:
+    """Two-tier cache of JSON-able results, keyed by namespace, user, generation and params."""
+
+    def __init__(
+        self,
+        local: LRUCache,
+        remote: Optional[RedisTier] = None,
+        enabled: bool = True,
+        sync_generation: Optional[Callable[[], int]] = None,
+    ):
+        self.local = local
+        self.remote = remote
+        self.enabled = enabled
+        # Without Redis: the latest finished sync id, visible to every process
+        self.sync_generation = sync_generation
+        self._local_generation = 0
+        self._lock = threading.Lock()
+        self._counters = {"local_hits": 0, "remote_hits": 0, "misses": 0, "bumps": 0}
+
+    def generation(self) -> str:
+        if self.remote is not None:
+            remote = self.remote.generation()
+            if remote is not None:
+                return f"r{remote}"
+        # Local counts are only meaningful in this process, so keep them apart from Redis's
+        local = f"l{self._local_generation}"
+        if self.sync_generation is not None:
+            try:
+                return f"s{self.sync_generation()}.{local}"
+            except Exception as e:
+                logger.warning(f"Could not read the sync generation, using the local one: {e}")
+        return local
+
+    def bump_generation(self) -> None:
+        """Make every cached entry unreachable; called after each sync commit."""
+        with self._lock:
+            self._local_generation += 1
+            self._counters["bumps"] += 1
+        if self.remote is not None:
+            self.remote.bump_generation()
+
+    def key(self, namespace: str, user_id: Optional[int], params: dict[str, Any]) -> str:
+        digest = hashlib.sha256(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{namespace}:u{user_id}:g{self.generation()}:{digest[:16]}"
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        user_id: Optional[int],
+        params: dict[str, Any],
+        compute: Callable[[], Any],
+    ) -> Any:
+        """Return the cached result or compute, encode and store it in both tiers."""
+        if not self.enabled:
+            return compute()
+
+        key = self.key(namespace, user_id, params)
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._count("local_hits")
+            record_cache_lookup("response", hit=True)
+            return value
+        if self.remote is not None:
+            value = self.remote.get(key)
+            if value is not MISSING:
+                self._count("remote_hits")
+                record_cache_lookup("response", hit=True)
+                self.local.set(key, value)
+                return value
+
+        self._count("misses")
+        record_cache_lookup("response", hit=False)
+        # Encode once so a hit from either tier returns exactly what a miss returned
+        value = jsonable_encoder(compute())
+        self.local.set(key, value)
+        if self.remote is not None:
+            self.remote.set(key, value, self.local.ttl_seconds)
+        return value
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "enabled": self.enabled,
+            "redis": None if self.remote is None else self.remote.available,
+            "generation": self.generation(),
+            "local_entries": len(self.local),
+            **counters,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from settings."""
+    settings = get_settings()
+    remote = None
+    if settings.redis_url:
+        try:
+            remote = RedisTier.from_url(settings.redis_url)
+        except ImportError as e:
+            logger.warning(f"{str(e)}; using the in-process cache only")
+    return ResponseCache(
+        LRUCache(settings.response_cache_max_entries, settings.response_cache_ttl_seconds),
+        remote,
+        enabled=settings.response_cache_enabled,
+        sync_generation=read_router.primary_latest_sync,
+    )
+
+
+def bump_sync_generation() -> None:
+    """Invalidate cached dashboard responses after synced data changes."""
+    get_response_cache().bump_generation()
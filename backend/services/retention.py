@@ -0,0 +1,224 @@
+"""
+Retention for history tables that grow with every sync, notification and scheduler run.
+Rows older than each table's window are deleted in batches, each batch archived first as
+gzipped JSON lines when an archive directory is configured. On Postgres, a table that is
+partitioned by month on its timestamp column has upcoming partitions created and whole
+expired partitions dropped instead of deleting row by row.
+"""
+
+import gzip
+import itertools
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend.config import Settings, get_settings
+from backend.models import NotificationLog, SchedulerJobRun, SyncRun
+
+logger = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = 2
+_PARTITION_UPPER_BOUND = re.compile(r"TO \('([^']+)'\)")
+
+
+class RetentionPolicy(NamedTuple):
+    model: Any
+    timestamp: str  # column the window is measured on
+    days_setting: str
+    min_days: int  # floor on the window, for queries that look back this far
+
+
+POLICIES = (
+    RetentionPolicy(SyncRun, "started_at", "retention_sync_runs_days", 1),
+    # Deadline notification dedup looks back up to two days
+    RetentionPolicy(NotificationLog, "sent_at", "retention_notification_logs_days", 3),
+    # /scheduler/status summarizes the last seven days of runs
+    RetentionPolicy(SchedulerJobRun, "finished_at", "retention_scheduler_job_runs_days", 7),
+)
+
+
+def partition_upper_bound(bound: str) -> Optional[datetime]:
+    """Exclusive upper bound of a range partition from `pg_get_expr(relpartbound)`."""
+    match = _PARTITION_UPPER_BOUND.search(bound or "")
+    if not match:
+        return None  # DEFAULT partition or not a range bound
+    try:
+        upper = datetime.fromisoformat(match.group(1))
+    except ValueError:
+        return None
+    return upper if upper.tzinfo else upper.replace(tzinfo=timezone.utc)
+
+
+def month_starts(now: datetime, months_ahead: int) -> List[datetime]:
+    """Month boundaries from the start of this month to the end of `months_ahead` months on."""
+    start = datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+    months = [start]
+    for _ in range(months_ahead + 1):
+        start = (start + timedelta(days=32)).replace(day=1)
+        months.append(start)
+    return months
+
+
+class RetentionService:
+    """Removes rows past each table's retention window."""
+
+    def __init__(
+        self, db: Session, settings: Optional[Settings] = None, now: Optional[datetime] = None
+    ):
+        self.db = db
+        self.settings = settings or get_settings()
+        self.now = now or datetime.now(timezone.utc)
+        self.archive_dir = (
+            Path(self.settings.retention_archive_dir)
+            if self.settings.retention_archive_dir
+            else None
+        )
+
+    def run(self) -> dict[str, Any]:
+        """Apply every policy within the time budget; returns rows removed and timings."""
+        started = time.monotonic()
+        deadline = started + self.settings.retention_max_seconds
+        tables = {}
+        for policy in POLICIES:
+            tables[policy.model.__tablename__] = self.prune(policy, deadline)
+        return {
+            "tables": tables,
+            "rows_removed": sum(result.get("deleted", 0) for result in tables.values()),
+            "duration_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+
+    def prune(self, policy: RetentionPolicy, deadline: float) -> dict[str, Any]:
+        table = policy.model.__tablename__
+        days = getattr(self.settings, policy.days_setting)
+        if days <= 0:
+            return {"skipped": True}
+
+        started = time.monotonic()
+        cutoff = self.now - timedelta(days=max(days, policy.min_days))
+        result: dict[str, Any] = {
+            "cutoff": cutoff.isoformat(),
+            "deleted": 0,
+            "archived": 0,
+            "batches": 0,
+            "partitions_dropped": [],
+            "complete": True,
+        }
+
+        partitioned = self._is_partitioned(table)
+        if partitioned:
+            self._ensure_partitions(table)
+        # Partitions are dropped whole unless their rows must be archived first
+        if not partitioned or self.archive_dir is not None:
+            self._delete_batches(policy, cutoff, deadline, result)
+        if partitioned and result["complete"]:
+            result["partitions_dropped"] = self._drop_expired_partitions(table, cutoff)
+
+        result["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        logger.info(
+            f"Retention for {table}: removed {result['deleted']} rows older than "
+            f"{cutoff.date()} in {result['duration_ms']}ms"
+        )
+        return result
+
+    def _delete_batches(
+        self, policy: RetentionPolicy, cutoff: datetime, deadline: float, result: dict[str, Any]
+    ) -> None:
+        model = policy.model
+        column = getattr(model, policy.timestamp)
+        archive_path = self._archive_path(model.__tablename__)
+        while True:
+            if time.monotonic() >= deadline:
+                result["complete"] = False  # picked up by the next run
+                return
+            query = (self.db.query(model) if archive_path else self.db.query(model.id)).filter(
+                column < cutoff
+            )
+            rows = query.order_by(column, model.id).limit(self.settings.retention_batch_size).all()
+            if not rows:
+                return
+
+            if archive_path:
+                self._archive(archive_path, model, rows)
+                result["archived"] += len(rows)
+            ids = [row.id for row in rows]
+            self.db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            self.db.commit()
+            result["deleted"] += len(ids)
+            result["batches"] += 1
+
+    def _archive_path(self, table: str) -> Optional[Path]:
+        if self.archive_dir is None:
+            return None
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        return self.archive_dir / f"{table}-{self.now:%Y%m%dT%H%M%S}.jsonl.gz"
+
+    def _archive(self, path: Path, model: Any, rows: list) -> None:
+        """Append rows before they are deleted; a crash in between only duplicates a batch."""
+        columns = [column.name for column in model.__table__.columns]
+        with gzip.open(path, "at", encoding="utf-8") as archive:
+            for row in rows:
+                record = {name: getattr(row, name) for name in columns}
+                archive.write(json.dumps(record, default=_json_default) + "\n")
+
+    def _is_partitioned(self, table: str) -> bool:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        found = self.db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table"
+            ),
+            {"table": table},
+        ).first()
+        return found is not None
+
+    def _ensure_partitions(self, table: str) -> None:
+        """Create monthly partitions through `PARTITION_MONTHS_AHEAD` months from now."""
+        months = month_starts(self.now, PARTITION_MONTHS_AHEAD)
+        try:
+            for start, end in itertools.pairwise(months):
+                self.db.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS "{table}_p{start:%Y_%m}" '
+                        f'PARTITION OF "{table}" '
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                    )
+                )
+            self.db.commit()
+        except Exception as e:
+            # e.g. an overlapping partition created by hand; pruning can still proceed
+            self.db.rollback()
+            logger.warning(f"Could not create partitions for {table}: {str(e)}")
+
+    def _drop_expired_partitions(self, table: str, cutoff: datetime) -> List[str]:
+        partitions = self.db.execute(
+            text(
+                "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid) "
+                "FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :table"
+            ),
+            {"table": table},
+        ).all()
+        dropped = []
+        for name, bound in partitions:
+            upper = partition_upper_bound(bound)
+            if upper is not None and upper <= cutoff:
+                self.db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                dropped.append(name)
+        self.db.commit()
+        return dropped
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
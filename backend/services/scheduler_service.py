@@ -1,49 +1,85 @@
 """
 Scheduling service for automated Canvas data syncing and notifications.
 Uses APScheduler for background tasks and proactive notifications.
+
+The scheduler is owned by the worker process (`python -m backend.worker`); sync and
+notification jobs run in a process pool so they never compete with API requests.
 """
 
+import hashlib
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Any, List, Optional
 
+from apscheduler.executors.pool import ProcessPoolExecutor, ThreadPoolExecutor
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
+from backend.config import get_settings
 from backend.db.session import SessionLocal
-from backend.models import NotificationLog
-from backend.services.ai_service import CanvasAIService
-from backend.services.sync_service import CanvasSyncService
+from backend.models import User
+from backend.services.job_history import JobRunRecorder, job_key
+from backend.services.job_queue import JobQueue, default_worker_id, run_job, run_queued_job
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def sync_offset_seconds(user_id: int, window_seconds: int) -> int:
+    """Deterministic offset of a user's sync within the sync window.
+
+    Hash-based rather than random so each user keeps the same slot across restarts
+    and workers, while a population of users spreads evenly over the window.
+    """
+    if window_seconds <= 0:
+        return 0
+    digest = hashlib.sha256(f"canvas-sync:{user_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % window_seconds
+
+
 class CanvasSchedulerService:
     """Background scheduler for automated Canvas tasks."""
 
-    def __init__(self):
-        self.scheduler = BackgroundScheduler()
+    def __init__(self, max_processes: Optional[int] = None):
+        self.settings = get_settings()
+        self.scheduler = BackgroundScheduler(
+            executors={
+                "default": ThreadPoolExecutor(10),
+                "processpool": ProcessPoolExecutor(max_processes or self.settings.worker_processes),
+                "sync": ProcessPoolExecutor(self.settings.sync_max_concurrency),
+            },
+            job_defaults={"coalesce": True},
+        )
+        self.history = JobRunRecorder(
+            size=self.settings.scheduler_history_size,
+            persist=self.settings.scheduler_history_persist,
+        )
+        self.history.attach(self.scheduler)
+        self.worker_id = default_worker_id()
         self.scheduler.start()
         logger.info("Canvas Scheduler Service started")
 
     def schedule_daily_sync(self):
-        """Schedule daily full sync at 6 AM."""
+        """Schedule the daily per-user full sync window, starting at 6 AM by default."""
+        hour = self.settings.sync_window_start_hour
         self.scheduler.add_job(
-            func=self._daily_sync_job,
-            trigger=CronTrigger(hour=6, minute=0),
+            func=self._plan_user_syncs,
+            args=["full_sync"],
+            trigger=CronTrigger(hour=hour, minute=0),
             id="daily_sync",
             name="Daily Canvas Sync",
             replace_existing=True,
         )
-        logger.info("Scheduled daily sync at 6:00 AM")
+        logger.info(
+            f"Scheduled daily sync at {hour}:00 spread over {self.settings.sync_window_minutes} minutes"
+        )
 
     def schedule_deadline_notifications(self):
         """Schedule deadline notifications to run every hour."""
         self.scheduler.add_job(
-            func=self._deadline_notification_job,
+            func=run_job,
+            args=["deadline_notifications", self.worker_id],
+            executor="processpool",
             trigger=IntervalTrigger(hours=1),
             id="deadline_notifications",
             name="Deadline Notifications",
@@ -52,9 +88,10 @@ class CanvasSchedulerService:
         logger.info("Scheduled hourly deadline notifications")
 
     def schedule_assignment_sync(self):
-        """Schedule assignment sync every 4 hours."""
+        """Schedule per-user assignment sync every 4 hours."""
         self.scheduler.add_job(
-            func=self._assignment_sync_job,
+            func=self._plan_user_syncs,
+            args=["assignment_sync"],
             trigger=IntervalTrigger(hours=4),
             id="assignment_sync",
             name="Assignment Sync",
@@ -62,111 +99,106 @@ class CanvasSchedulerService:
         )
         logger.info("Scheduled assignment sync every 4 hours")
 
-    def _daily_sync_job(self):
-        """Execute daily full sync."""
-        logger.info("Starting daily sync job")
+    def schedule_retention(self):
+        """Schedule daily pruning of sync runs and notification logs, 3:30 AM by default."""
+        hour = self.settings.retention_hour
+        self.scheduler.add_job(
+            func=run_job,
+            args=["retention", self.worker_id],
+            executor="processpool",
+            trigger=CronTrigger(hour=hour, minute=30),
+            id="retention",
+            name="History Retention",
+            replace_existing=True,
+        )
+        logger.info(f"Scheduled daily retention at {hour}:30")
+
+    def _plan_user_syncs(self, job_type: str):
+        """Fan a sync out to every active user, each at its own offset in the window.
+
+        Per-user runs go to the `sync` executor, whose pool size caps how many user
+        syncs hit Canvas at once.
+        """
         db = SessionLocal()
         try:
-            sync_service = CanvasSyncService(db)
-            sync_run = sync_service.full_sync(user_id=1)
-            logger.info(
-                f"Daily sync completed: {sync_run.status}, processed {sync_run.items_processed} items"
-            )
-        except Exception as e:
-            logger.error(f"Daily sync failed: {str(e)}")
+            user_ids = [
+                user_id
+                for (user_id,) in db.query(User.id)
+                .filter(User.is_active.isnot(False))
+                .order_by(User.id)
+                .all()
+            ]
         finally:
             db.close()
 
-    def _assignment_sync_job(self):
-        """Execute assignment sync."""
-        logger.info("Starting assignment sync job")
-        db = SessionLocal()
-        try:
-            sync_service = CanvasSyncService(db)
-            sync_run = sync_service.sync_assignments(user_id=1)
-            logger.info(
-                f"Assignment sync completed: {sync_run.status}, processed {sync_run.items_processed} items"
+        if not user_ids:
+            logger.info(f"No active users; skipping {job_type}")
+            return
+
+        window_seconds = self.settings.sync_window_minutes * 60
+        window_start = datetime.now(timezone.utc)
+        for user_id in user_ids:
+            run_date = window_start + timedelta(
+                seconds=sync_offset_seconds(user_id, window_seconds)
             )
-        except Exception as e:
-            logger.error(f"Assignment sync failed: {str(e)}")
-        finally:
-            db.close()
+            self.scheduler.add_job(
+                func=run_job,
+                args=[job_type, self.worker_id],
+                kwargs={"user_id": user_id},
+                executor="sync",
+                trigger="date",
+                run_date=run_date,
+                id=f"{job_type}_user_{user_id}",
+                name=f"{job_type} for user {user_id}",
+                misfire_grace_time=window_seconds or None,
+                replace_existing=True,
+            )
+        logger.info(
+            f"Planned {job_type} for {len(user_ids)} user(s) over {window_seconds // 60} minutes"
+        )
 
-    def _deadline_notification_job(self):
-        """Check for upcoming deadlines and send notifications."""
-        logger.info("Starting deadline notification job")
+    def schedule_queue_dispatch(self, interval_seconds: Optional[int] = None):
+        """Poll the job queue and hand queued jobs to the process pool."""
+        self.scheduler.add_job(
+            func=self._dispatch_queued_jobs,
+            trigger=IntervalTrigger(
+                seconds=interval_seconds or self.settings.worker_poll_interval_seconds
+            ),
+            id="queue_dispatch",
+            name="Job Queue Dispatch",
+            replace_existing=True,
+        )
+        logger.info("Scheduled job queue dispatch")
+
+    def _dispatch_queued_jobs(self):
+        """Renew leases on running jobs, then claim queued jobs for the process pool."""
         db = SessionLocal()
         try:
-            ai_service = CanvasAIService(db)
-
-            # Get assignments due in next 24 hours
-            upcoming_24h = ai_service.get_upcoming_deadlines(user_id=1, days_ahead=1)
-
-            # Get assignments due in next 3 days (but not already notified for 24h)
-            upcoming_3d = ai_service.get_upcoming_deadlines(user_id=1, days_ahead=3)
-
-            notifications_sent = 0
-
-            # Send 24-hour notifications
-            for deadline in upcoming_24h:
-                if deadline["urgency"] == "high":
-                    # Check if we already sent notification today
-                    existing_notification = (
-                        db.query(NotificationLog)
-                        .filter(
-                            NotificationLog.user_id == 1,
-                            NotificationLog.notification_type == "24h_deadline",
-                            NotificationLog.extra_data.contains(str(deadline["assignment_id"])),
-                            NotificationLog.sent_at
-                            >= datetime.now(timezone.utc) - timedelta(hours=12),
-                        )
-                        .first()
-                    )
-
-                    if not existing_notification:
-                        ai_service.create_deadline_notification(
-                            user_id=1,
-                            assignment_id=deadline["assignment_id"],
-                            notification_type="24h_deadline",
-                        )
-                        notifications_sent += 1
-                        logger.info(f"Sent 24h deadline notification for: {deadline['name']}")
-
-            # Send 3-day notifications (less urgent)
-            for deadline in upcoming_3d:
-                if deadline["urgency"] == "medium" and deadline["days_until_due"] == 3:
-                    existing_notification = (
-                        db.query(NotificationLog)
-                        .filter(
-                            NotificationLog.user_id == 1,
-                            NotificationLog.notification_type == "3d_deadline",
-                            NotificationLog.extra_data.contains(str(deadline["assignment_id"])),
-                            NotificationLog.sent_at
-                            >= datetime.now(timezone.utc) - timedelta(days=2),
-                        )
-                        .first()
-                    )
-
-                    if not existing_notification:
-                        ai_service.create_deadline_notification(
-                            user_id=1,
-                            assignment_id=deadline["assignment_id"],
-                            notification_type="3d_deadline",
-                        )
-                        notifications_sent += 1
-                        logger.info(f"Sent 3d deadline notification for: {deadline['name']}")
-
-            logger.info(
-                f"Deadline notification job completed: {notifications_sent} notifications sent"
+            queue = JobQueue(db)
+            queue.heartbeat(self.worker_id)
+            claimed = queue.claim_next(
+                limit=self.settings.worker_processes,
+                type_limits={"summarize_syllabus": self.settings.syllabus_summary_max_concurrency},
+                worker_id=self.worker_id,
             )
-
+            for job in claimed:
+                self.scheduler.add_job(
+                    func=run_queued_job,
+                    args=[job.id],
+                    executor="processpool",
+                    id=f"queued_{job.job_type}_{job.id}",
+                    name=f"Queued {job.job_type}",
+                )
+                logger.info(f"Dispatched queued job {job.id} ({job.job_type})")
         except Exception as e:
-            logger.error(f"Deadline notification job failed: {str(e)}")
+            logger.error(f"Job queue dispatch failed: {str(e)}")
         finally:
             db.close()
 
     def get_job_status(self) -> List[dict[str, Any]]:
-        """Get status of all scheduled jobs."""
+        """Get status of all scheduled jobs, with run history stats per job."""
+        history = self.history.summary()
+        running = self.history.running()
         jobs = []
         for job in self.scheduler.get_jobs():
             jobs.append(
@@ -175,24 +207,12 @@ class CanvasSchedulerService:
                     "name": job.name,
                     "next_run": job.next_run_time.isoformat() if job.next_run_time else None,
                     "trigger": str(job.trigger),
+                    "running": running.get(job.id, 0),
+                    "history": history.get(job_key(job.id)),
                 }
             )
         return jobs
 
-    def trigger_sync_now(self) -> dict[str, str]:
-        """Manually trigger a sync job."""
-        try:
-            self.scheduler.add_job(
-                func=self._daily_sync_job,
-                trigger="date",
-                run_date=datetime.now() + timedelta(seconds=2),
-                id="manual_sync",
-                name="Manual Sync",
-            )
-            return {"status": "success", "message": "Manual sync triggered"}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
-
     def shutdown(self):
         """Shutdown the scheduler."""
         if self.scheduler.running:
@@ -214,6 +234,8 @@ def get_scheduler_service() -> CanvasSchedulerService:
         scheduler_service.schedule_daily_sync()
         scheduler_service.schedule_deadline_notifications()
         scheduler_service.schedule_assignment_sync()
+        scheduler_service.schedule_queue_dispatch()
+        scheduler_service.schedule_retention()
     return scheduler_service
 
 
@@ -0,0 +1,209 @@
+"""
+Local lexical search over synced course content.
+Assignments and syllabi are split into passages and stored with an inverted index
+(term -> passage, term frequency) in the database, and queries are ranked with BM25.
+Sync re-indexes a document only when its content hash changes.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.models import Assignment, Course, SearchPassage, SearchPosting
+from backend.services.analysis_cache import content_hash
+from backend.services.llm_context import estimate_tokens, split_into_chunks
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """a about all am an and any are as at be been but by can could did do does for from
+    had has have how i if in into is it its me my no not of on or our so than that the
+    their them then there these they this to was we were what when where which who why
+    will with would you your""".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Score multiplier for passages from the course a question is asked about
+COURSE_BOOST = 1.5
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word terms with stopwords and single letters removed."""
+    return [
+        word
+        for word in _WORD.findall(text.lower())
+        if word not in STOPWORDS and (len(word) > 1 or word.isdigit())
+    ]
+
+
+class SearchIndex:
+    """BM25 index over assignment and syllabus passages, stored in the database."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+        self._hashes: Dict[str, Dict[int, str]] = {}
+
+    def index_syllabus(self, course: Course) -> bool:
+        return self.index_document(
+            "syllabus",
+            course.canvas_course_id,
+            course.canvas_course_id,
+            f"{course.name} - Syllabus",
+            course.syllabus_text or "",
+        )
+
+    def index_assignment(self, assignment: Assignment, course: Course) -> bool:
+        due = assignment.due_at.strftime("%Y-%m-%d") if assignment.due_at else "no due date"
+        points = assignment.points_possible if assignment.points_possible is not None else "N/A"
+        return self.index_document(
+            "assignment",
+            assignment.canvas_assignment_id,
+            course.canvas_course_id,
+            f"{course.name} - {assignment.name} (Due: {due}, Points: {points})",
+            assignment.description_text or "",
+        )
+
+    def index_document(
+        self, source_type: str, source_id: int, canvas_course_id: int, title: str, text: str
+    ) -> bool:
+        """(Re)index one document if its content changed. Does not commit.
+
+        Returns True when the index was updated.
+        """
+        digest = content_hash(f"{title}\n{text}")
+        hashes = self._indexed_hashes(source_type)
+        if hashes.get(source_id) == digest:
+            return False
+
+        self.remove_document(source_type, source_id)
+        chunks = split_into_chunks(text, self.settings.search_passage_tokens) or [""]
+        for position, chunk in enumerate(chunks):
+            terms = Counter(tokenize(f"{title} {chunk}"))
+            if not terms:
+                continue
+            self.db.add(
+                SearchPassage(
+                    source_type=source_type,
+                    source_id=source_id,
+                    canvas_course_id=canvas_course_id,
+                    position=position,
+                    title=title,
+                    text=chunk,
+                    length=sum(terms.values()),
+                    content_hash=digest,
+                    postings=[
+                        SearchPosting(term=term, term_frequency=count)
+                        for term, count in terms.items()
+                    ],
+                )
+            )
+        hashes[source_id] = digest
+        return True
+
+    def remove_document(self, source_type: str, source_id: int) -> None:
+        """Drop a document's passages and postings. Does not commit."""
+        passage_ids = self.db.query(SearchPassage.id).filter(
+            SearchPassage.source_type == source_type, SearchPassage.source_id == source_id
+        )
+        self.db.query(SearchPosting).filter(SearchPosting.passage_id.in_(passage_ids)).delete(
+            synchronize_session=False
+        )
+        self.db.query(SearchPassage).filter(
+            SearchPassage.source_type == source_type, SearchPassage.source_id == source_id
+        ).delete(synchronize_session=False)
+        self._indexed_hashes(source_type).pop(source_id, None)
+
+    def _indexed_hashes(self, source_type: str) -> Dict[int, str]:
+        # Loaded once per source type so a sync checks every document with one query
+        if source_type not in self._hashes:
+            self._hashes[source_type] = dict(
+                self.db.query(SearchPassage.source_id, SearchPassage.content_hash)
+                .filter(SearchPassage.source_type == source_type)
+                .distinct()
+                .all()
+            )
+        return self._hashes[source_type]
+
+    def search(
+        self, query: str, limit: Optional[int] = None, boost_course_id: Optional[int] = None
+    ) -> List[dict[str, Any]]:
+        """Return the top passages for a query, best first."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        total, avg_length = self.db.query(
+            func.count(SearchPassage.id), func.avg(SearchPassage.length)
+        ).one()
+        if not total:
+            return []
+
+        rows = (
+            self.db.query(
+                SearchPosting.term,
+                SearchPosting.passage_id,
+                SearchPosting.term_frequency,
+                SearchPassage.length,
+                SearchPassage.canvas_course_id,
+            )
+            .join(SearchPassage, SearchPassage.id == SearchPosting.passage_id)
+            .filter(SearchPosting.term.in_(terms))
+            .all()
+        )
+        document_frequency = Counter(row.term for row in rows)
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term, passage_id, tf, length, canvas_course_id in rows:
+            df = document_frequency[term]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            norm = tf + K1 * (1 - B + B * length / float(avg_length))
+            score = idf * tf * (K1 + 1) / norm
+            if boost_course_id is not None and canvas_course_id == boost_course_id:
+                score *= COURSE_BOOST
+            scores[passage_id] += score
+
+        top = heapq.nlargest(
+            limit or self.settings.search_top_k, scores.items(), key=lambda item: item[1]
+        )
+        passages = {
+            passage.id: passage
+            for passage in self.db.query(SearchPassage).filter(
+                SearchPassage.id.in_([passage_id for passage_id, _ in top])
+            )
+        }
+        return [
+            {
+                "source_type": passages[passage_id].source_type,
+                "source_id": passages[passage_id].source_id,
+                "course_id": passages[passage_id].canvas_course_id,
+                "title": passages[passage_id].title,
+                "text": passages[passage_id].text,
+                "score": round(score, 4),
+            }
+            for passage_id, score in top
+        ]
+
+    def build_context(
+        self, query: str, token_budget: int, boost_course_id: Optional[int] = None
+    ) -> str:
+        """Format the best passages for a prompt, stopping at the token budget."""
+        blocks: List[str] = []
+        used = 0
+        for result in self.search(query, boost_course_id=boost_course_id):
+            block = f"[{result['title']}]\n{result['text']}".strip()
+            tokens = estimate_tokens(block)
+            if used + tokens > token_budget:
+                continue
+            blocks.append(block)
+            used += tokens
+        return "\n\n".join(blocks)
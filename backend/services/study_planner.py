@@ -0,0 +1,219 @@
+"""
+Deterministic study plan solver.
+Estimates the hours each upcoming assignment needs, ranks assignments by points and
+urgency, and packs the work into the days before each due date under a daily hour cap.
+Runs in O(n log n) for n assignments, so building a plan needs no LLM call.
+"""
+
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, List, Optional, Protocol
+
+from sqlalchemy.orm import Session
+
+from backend.models import Assignment
+from backend.services.read_models import AssignmentRow, load_assignments, select_assignments
+
+DEFAULT_TIPS = [
+    "Start each study session with a clear goal",
+    "Take regular breaks to maintain focus",
+    "Review previous material before starting new topics",
+    "Use active learning techniques like summarizing and teaching",
+    "Maintain a consistent study schedule",
+    "Create a distraction-free study environment",
+]
+
+# Base hours by assignment kind, matched against the assignment name in this order
+_KIND_HOURS = (
+    ("project", 8.0),
+    ("exam", 6.0),
+    ("midterm", 6.0),
+    ("final", 6.0),
+    ("essay", 5.0),
+    ("paper", 5.0),
+    ("lab", 3.0),
+    ("quiz", 1.5),
+)
+DEFAULT_HOURS = 2.0
+_EPSILON = 1e-9
+
+
+class _NamedCourse(Protocol):
+    @property
+    def name(self) -> Optional[str]: ...
+
+
+class PlannableAssignment(Protocol):
+    """What the planner reads; `AssignmentRow` tuples and `Assignment` entities both fit."""
+
+    @property
+    def canvas_assignment_id(self) -> int: ...
+
+    @property
+    def name(self) -> Optional[str]: ...
+
+    @property
+    def due_at(self) -> Optional[datetime]: ...
+
+    @property
+    def points_possible(self) -> Optional[float]: ...
+
+    @property
+    def course(self) -> _NamedCourse: ...
+
+
+def estimate_hours(name: Optional[str], points: Optional[float]) -> float:
+    """Heuristic effort estimate, scaled by points and rounded to the half hour."""
+    name_lower = (name or "").lower()
+    hours = next((h for kind, h in _KIND_HOURS if kind in name_lower), DEFAULT_HOURS)
+    if points:
+        hours *= min(2.0, max(0.5, points / 50))
+    return max(0.5, round(hours * 2) / 2)
+
+
+def _task_label(name: str) -> str:
+    name_lower = name.lower()
+    if "quiz" in name_lower:
+        return f"Study for {name}"
+    if "exam" in name_lower:
+        return f"Review materials for {name}"
+    return f"Work on {name}"
+
+
+def upcoming_assignments(
+    db: Session, days_ahead: int, now: Optional[datetime] = None
+) -> List[AssignmentRow]:
+    """Assignments due between now and `days_ahead` days from now, with their course."""
+    now = now or datetime.now(timezone.utc)
+    return load_assignments(
+        db,
+        select_assignments(
+            Assignment.due_at.isnot(None),
+            Assignment.due_at >= now,
+            Assignment.due_at <= now + timedelta(days=days_ahead),
+        ).order_by(Assignment.due_at),
+    )
+
+
+def plan_study_schedule(
+    assignments: Iterable[PlannableAssignment],
+    days_ahead: int,
+    daily_hours: float,
+    now: Optional[datetime] = None,
+) -> dict[str, Any]:
+    """Build a day-by-day plan that finishes each assignment the day before it is due.
+
+    When there is more work than hours before a deadline, the lowest-priority work is
+    cut first and reported under `unscheduled`.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.date()
+    days_ahead = max(1, days_ahead)
+    assignments = list(assignments)
+    max_points = max((a.points_possible or 0 for a in assignments), default=0) or 1
+
+    tasks: List[dict[str, Any]] = []
+    for assignment in assignments:
+        due_at = assignment.due_at
+        if due_at.tzinfo is None:
+            due_at = due_at.replace(tzinfo=timezone.utc)
+        due_day = (due_at.date() - today).days
+        if due_day < 0:
+            continue
+        points_score = (
+            assignment.points_possible / max_points if assignment.points_possible else 0.5
+        )
+        hours = estimate_hours(assignment.name, assignment.points_possible)
+        tasks.append(
+            {
+                "assignment": assignment,
+                "due_at": due_at,
+                "due_day": due_day,
+                # Finish the day before; work due today can only go today
+                "last_day": min(days_ahead - 1, max(0, due_day - 1)),
+                "priority": 0.5 * points_score + 0.5 / (1 + due_day),
+                "hours": hours,
+                "planned": hours,
+            }
+        )
+
+    # Earliest deadline first, higher priority first on the same day
+    tasks.sort(key=lambda t: (t["last_day"], -t["priority"], t["assignment"].canvas_assignment_id))
+
+    # Keep every deadline prefix within capacity by trimming the lowest-priority work
+    kept: List[tuple] = []
+    scheduled = 0.0
+    for order, task in enumerate(tasks):
+        heapq.heappush(kept, (task["priority"], order, task))
+        scheduled += task["hours"]
+        capacity = (task["last_day"] + 1) * daily_hours
+        while scheduled > capacity + _EPSILON:
+            lowest = kept[0][2]
+            cut = min(lowest["planned"], scheduled - capacity)
+            lowest["planned"] -= cut
+            scheduled -= cut
+            if lowest["planned"] <= _EPSILON:
+                heapq.heappop(kept)
+
+    # Lay the kept hours out earliest-deadline-first, filling each day up to the cap
+    remaining = [daily_hours] * days_ahead
+    days: List[List[dict[str, Any]]] = [[] for _ in range(days_ahead)]
+    day = 0
+    for task in tasks:
+        left = task["planned"]
+        while left > _EPSILON and day < days_ahead:
+            if remaining[day] <= _EPSILON:
+                day += 1
+                continue
+            hours = min(left, remaining[day])
+            days[day].append(_plan_task(task, hours))
+            remaining[day] -= hours
+            left -= hours
+
+    daily_plan = [
+        {
+            "day": index + 1,
+            "date": (today + timedelta(days=index)).strftime("%Y-%m-%d"),
+            "tasks": day_tasks,
+            "total_hours": round(sum(t["estimated_hours"] for t in day_tasks), 1),
+        }
+        for index, day_tasks in enumerate(days)
+        if day_tasks
+    ]
+    unscheduled = [
+        {
+            "assignment": task["assignment"].name,
+            "assignment_id": task["assignment"].canvas_assignment_id,
+            "due_at": task["due_at"].isoformat(),
+            "hours_short": round(task["hours"] - task["planned"], 1),
+        }
+        for task in tasks
+        if task["hours"] - task["planned"] > 0.05
+    ]
+
+    horizon = (max((t["last_day"] for t in tasks), default=0) + 1) * daily_hours
+    load = scheduled / horizon if horizon else 0
+    return {
+        "study_strategy": "balanced" if load < 0.6 else "intensive" if load < 0.9 else "sprint",
+        "total_estimated_hours": round(scheduled, 1),
+        "daily_hour_cap": daily_hours,
+        "daily_plan": daily_plan,
+        "unscheduled": unscheduled,
+        "tips": list(DEFAULT_TIPS),
+    }
+
+
+def _plan_task(task: dict[str, Any], hours: float) -> dict[str, Any]:
+    assignment = task["assignment"]
+    return {
+        "assignment": assignment.name,
+        "assignment_id": assignment.canvas_assignment_id,
+        "course": assignment.course.name if assignment.course else None,
+        "task": _task_label(assignment.name or ""),
+        "estimated_hours": round(hours, 1),
+        "priority": (
+            "high"
+            if task["priority"] >= 0.7 or task["due_day"] <= 2
+            else "medium" if task["priority"] >= 0.4 else "low"
+        ),
+    }
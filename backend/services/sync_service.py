@@ -7,13 +7,32 @@ import logging
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from canvasapi import Canvas
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 
 from backend.config import get_settings
+from backend.db.routing import read_router
 from backend.db.session import get_db
 from backend.models import Assignment, Course, SyncRun, User
+from backend.services.analysis_cache import AnalysisCache, assignment_scope, course_scope
+from backend.services.job_queue import JobQueue
+from backend.services.question_cache import QuestionCache
+from backend.services.response_cache import bump_sync_generation
+from backend.services.search_index import SearchIndex
+from backend.services.telemetry import instrument_canvas
+
+
+def _parse_due_at(canvas_assignment) -> Optional[datetime]:
+    """Parse a Canvas due date, logging and returning None when it is malformed."""
+    if not getattr(canvas_assignment, "due_at", None):
+        return None
+    try:
+        return datetime.fromisoformat(canvas_assignment.due_at.replace("Z", "+00:00"))
+    except Exception as parse_err:
+        logging.getLogger(__name__).warning(
+            f"Failed to parse due_at for assignment {getattr(canvas_assignment, 'id', 'unknown')}: {parse_err}"
+        )
+        return None
 
 
 class CanvasSyncService:
@@ -27,7 +46,21 @@ class CanvasSyncService:
             raise ValueError(
                 "Canvas API not configured. Please set CANVAS_API_URL and CANVAS_API_KEY."
             )
-        self.canvas = Canvas(self.settings.canvas_api_url, self.settings.canvas_api_key)
+        # Imported here so the API starts without paying for canvasapi until a sync runs
+        from canvasapi import Canvas
+
+        self.canvas = instrument_canvas(
+            Canvas(self.settings.canvas_api_url, self.settings.canvas_api_key)
+        )
+        self.analysis_cache = AnalysisCache(db)
+        self.search_index = SearchIndex(db)
+        self.question_cache = QuestionCache(db)
+
+    def _commit(self) -> None:
+        """Commit synced changes and invalidate caches built from the old data."""
+        self.db.commit()
+        bump_sync_generation()
+        read_router.sync_finished()
 
     def sync_user_data(self, user_id: Optional[int] = None) -> SyncRun:
         """Sync user data from Canvas."""
@@ -35,7 +68,7 @@ class CanvasSyncService:
             user_id=user_id or 1, sync_type="user", status="running"  # Default user for now
         )
         self.db.add(sync_run)
-        self.db.commit()
+        self.db.commit()  # nothing synced yet; caches stay valid
 
         try:
             canvas_user = self.canvas.get_current_user()
@@ -65,27 +98,36 @@ class CanvasSyncService:
             sync_run.error_message = str(e)
             sync_run.completed_at = datetime.now(timezone.utc)
 
-        self.db.commit()
+        self._commit()
         return sync_run
 
     def sync_courses(self, user_id: Optional[int] = None) -> SyncRun:
         """Sync courses from Canvas."""
         sync_run = SyncRun(user_id=user_id or 1, sync_type="courses", status="running")
         self.db.add(sync_run)
-        self.db.commit()
+        self.db.commit()  # nothing synced yet; caches stay valid
+
+        # Courses whose syllabus is new or changed and needs a fresh summary
+        syllabus_changed: List[Course] = []
 
         try:
             # Fetch only courses the current user is actively enrolled in and are available
             user = self.canvas.get_current_user()
-            canvas_courses = user.get_courses(enrollment_state=["active"], state=["available"])
+            canvas_courses = list(
+                user.get_courses(enrollment_state=["active"], state=["available"])
+            )
+            # One query for every known course, with the deferred syllabus columns the
+            # change check and the search index read, instead of lazy loads per course
+            existing = {
+                course.canvas_course_id: course
+                for course in self.db.query(Course)
+                .filter(Course.canvas_course_id.in_([c.id for c in canvas_courses]))
+                .options(undefer(Course.syllabus_body), undefer(Course.syllabus_text))
+            }
 
             for canvas_course in canvas_courses:
                 # Create or update course
-                course = (
-                    self.db.query(Course)
-                    .filter(Course.canvas_course_id == canvas_course.id)
-                    .first()
-                )
+                course = existing.get(canvas_course.id)
 
                 if not course:
                     course = Course(
@@ -96,6 +138,8 @@ class CanvasSyncService:
                         syllabus_body=getattr(canvas_course, "syllabus_body", None),
                     )
                     self.db.add(course)
+                    if course.syllabus_body:
+                        syllabus_changed.append(course)
                     sync_run.items_created += 1
                 else:
                     course.name = getattr(canvas_course, "name", course.name)
@@ -103,11 +147,18 @@ class CanvasSyncService:
                     course.workflow_state = getattr(
                         canvas_course, "workflow_state", course.workflow_state
                     )
-                    course.syllabus_body = getattr(
-                        canvas_course, "syllabus_body", course.syllabus_body
-                    )
+                    syllabus_body = getattr(canvas_course, "syllabus_body", course.syllabus_body)
+                    # Assign only on change so unchanged HTML is not recompressed and rewritten
+                    if syllabus_body != course.syllabus_body:
+                        self.analysis_cache.invalidate(course_scope(canvas_course.id))
+                        if syllabus_body:
+                            syllabus_changed.append(course)
+                        course.syllabus_body = syllabus_body
                     sync_run.items_updated += 1
 
+                # No-op unless the syllabus or course name changed since it was indexed
+                if self.search_index.index_syllabus(course):
+                    self.question_cache.invalidate_course(canvas_course.id, sync_run.user_id)
                 sync_run.items_processed += 1
 
             sync_run.status = "completed"
@@ -118,16 +169,36 @@ class CanvasSyncService:
             sync_run.error_message = str(e)
             sync_run.completed_at = datetime.now(timezone.utc)
 
-        self.db.commit()
+        self._commit()
+
+        if syllabus_changed and self.settings.syllabus_presummarize:
+            self._enqueue_syllabus_summaries(syllabus_changed, user_id)
+
         return sync_run
 
+    def _enqueue_syllabus_summaries(self, courses: List[Course], user_id: Optional[int]):
+        """Queue low-priority background summaries so the syllabus endpoint is a DB read."""
+        job_queue = JobQueue(self.db)
+        for course in courses:
+            course.syllabus_summary_status = "pending"
+            course.syllabus_summary_error = None
+            course.syllabus_summary_updated_at = datetime.now(timezone.utc)
+            job_queue.enqueue(
+                "summarize_syllabus",
+                {"course_id": course.canvas_course_id},
+                user_id=user_id,
+                priority=self.settings.syllabus_summary_priority,
+                dedupe=True,
+            )
+        self._commit()
+
     def sync_assignments(
         self, course_ids: Optional[List[int]] = None, user_id: Optional[int] = None
     ) -> SyncRun:
         """Sync assignments from Canvas."""
         sync_run = SyncRun(user_id=user_id or 1, sync_type="assignments", status="running")
         self.db.add(sync_run)
-        self.db.commit()
+        self.db.commit()  # nothing synced yet; caches stay valid
 
         try:
             if course_ids:
@@ -136,79 +207,20 @@ class CanvasSyncService:
                 # Use current user's active, available courses to avoid stale data
                 user = self.canvas.get_current_user()
                 canvas_courses = user.get_courses(enrollment_state=["active"], state=["available"])
+            canvas_courses = list(canvas_courses)
+            courses = {
+                course.canvas_course_id: course
+                for course in self.db.query(Course).filter(
+                    Course.canvas_course_id.in_([c.id for c in canvas_courses])
+                )
+            }
 
             for canvas_course in canvas_courses:
+                course = courses.get(canvas_course.id)
+                if not course:
+                    continue  # Skip if course not in our DB
                 try:
-                    # Ensure course exists in our database
-                    course = (
-                        self.db.query(Course)
-                        .filter(Course.canvas_course_id == canvas_course.id)
-                        .first()
-                    )
-
-                    if not course:
-                        continue  # Skip if course not in our DB
-
-                    assignments = canvas_course.get_assignments()
-
-                    for canvas_assignment in assignments:
-                        # Create or update assignment
-                        assignment = (
-                            self.db.query(Assignment)
-                            .filter(Assignment.canvas_assignment_id == canvas_assignment.id)
-                            .first()
-                        )
-
-                        # Parse due_at safely
-                        due_at = None
-                        if hasattr(canvas_assignment, "due_at") and canvas_assignment.due_at:
-                            try:
-                                due_at = datetime.fromisoformat(
-                                    canvas_assignment.due_at.replace("Z", "+00:00")
-                                )
-                            except Exception as parse_err:
-                                logging.getLogger(__name__).warning(
-                                    f"Failed to parse due_at for assignment {getattr(canvas_assignment, 'id', 'unknown')}: {parse_err}"
-                                )
-
-                        if not assignment:
-                            assignment = Assignment(
-                                canvas_assignment_id=canvas_assignment.id,
-                                course_id=course.id,
-                                name=getattr(canvas_assignment, "name", None),
-                                description=getattr(canvas_assignment, "description", None),
-                                due_at=due_at,
-                                html_url=getattr(canvas_assignment, "html_url", None),
-                                submission_types=",".join(
-                                    getattr(canvas_assignment, "submission_types", [])
-                                ),
-                                points_possible=getattr(canvas_assignment, "points_possible", None),
-                                workflow_state=getattr(canvas_assignment, "workflow_state", None),
-                            )
-                            self.db.add(assignment)
-                            sync_run.items_created += 1
-                        else:
-                            assignment.name = getattr(canvas_assignment, "name", assignment.name)
-                            assignment.description = getattr(
-                                canvas_assignment, "description", assignment.description
-                            )
-                            assignment.due_at = due_at or assignment.due_at
-                            assignment.html_url = getattr(
-                                canvas_assignment, "html_url", assignment.html_url
-                            )
-                            assignment.submission_types = ",".join(
-                                getattr(canvas_assignment, "submission_types", [])
-                            )
-                            assignment.points_possible = getattr(
-                                canvas_assignment, "points_possible", assignment.points_possible
-                            )
-                            assignment.workflow_state = getattr(
-                                canvas_assignment, "workflow_state", assignment.workflow_state
-                            )
-                            sync_run.items_updated += 1
-
-                        sync_run.items_processed += 1
-
+                    self._sync_course_assignments(canvas_course, course, sync_run)
                 except Exception as course_err:
                     # Skip courses we don't have access to, but log the error for visibility
                     logging.getLogger(__name__).warning(
@@ -224,14 +236,74 @@ class CanvasSyncService:
             sync_run.error_message = str(e)
             sync_run.completed_at = datetime.now(timezone.utc)
 
-        self.db.commit()
+        self._commit()
         return sync_run
 
+    def _sync_course_assignments(self, canvas_course, course: Course, sync_run: SyncRun) -> None:
+        """Create or update one course's assignments and re-index the changed ones."""
+        canvas_assignments = list(canvas_course.get_assignments())
+        # One query for the known assignments, with the deferred description columns the
+        # change check and the search index read, instead of lazy loads per assignment
+        existing = {
+            assignment.canvas_assignment_id: assignment
+            for assignment in self.db.query(Assignment)
+            .filter(Assignment.canvas_assignment_id.in_([a.id for a in canvas_assignments]))
+            .options(undefer(Assignment.description), undefer(Assignment.description_text))
+        }
+        content_changed = False
+
+        for canvas_assignment in canvas_assignments:
+            assignment = existing.get(canvas_assignment.id)
+            due_at = _parse_due_at(canvas_assignment)
+
+            if not assignment:
+                assignment = Assignment(
+                    canvas_assignment_id=canvas_assignment.id,
+                    course_id=course.id,
+                    name=getattr(canvas_assignment, "name", None),
+                    description=getattr(canvas_assignment, "description", None),
+                    due_at=due_at,
+                    html_url=getattr(canvas_assignment, "html_url", None),
+                    submission_types=",".join(getattr(canvas_assignment, "submission_types", [])),
+                    points_possible=getattr(canvas_assignment, "points_possible", None),
+                    workflow_state=getattr(canvas_assignment, "workflow_state", None),
+                )
+                self.db.add(assignment)
+                sync_run.items_created += 1
+            else:
+                self._update_assignment(assignment, canvas_assignment, due_at)
+                sync_run.items_updated += 1
+
+            if self.search_index.index_assignment(assignment, course):
+                content_changed = True
+            sync_run.items_processed += 1
+
+        if content_changed:
+            self.question_cache.invalidate_course(canvas_course.id, sync_run.user_id)
+
+    def _update_assignment(
+        self, assignment: Assignment, canvas_assignment, due_at: Optional[datetime]
+    ) -> None:
+        assignment.name = getattr(canvas_assignment, "name", assignment.name)
+        description = getattr(canvas_assignment, "description", assignment.description)
+        if description != assignment.description:
+            self.analysis_cache.invalidate(assignment_scope(canvas_assignment.id))
+            assignment.description = description
+        assignment.due_at = due_at or assignment.due_at
+        assignment.html_url = getattr(canvas_assignment, "html_url", assignment.html_url)
+        assignment.submission_types = ",".join(getattr(canvas_assignment, "submission_types", []))
+        assignment.points_possible = getattr(
+            canvas_assignment, "points_possible", assignment.points_possible
+        )
+        assignment.workflow_state = getattr(
+            canvas_assignment, "workflow_state", assignment.workflow_state
+        )
+
     def full_sync(self, user_id: Optional[int] = None) -> SyncRun:
         """Perform a full sync of user, courses, and assignments."""
         sync_run = SyncRun(user_id=user_id or 1, sync_type="full", status="running")
         self.db.add(sync_run)
-        self.db.commit()
+        self.db.commit()  # nothing synced yet; caches stay valid
 
         try:
             # Sync user first
@@ -278,7 +350,7 @@ class CanvasSyncService:
             sync_run.error_message = str(e)
             sync_run.completed_at = datetime.now(timezone.utc)
 
-        self.db.commit()
+        self._commit()
         return sync_run
 
 
@@ -0,0 +1,389 @@
+"""
+Operational metrics in the Prometheus text exposition format, without a client library.
+Counters and histograms live in this process's memory and are updated where the work
+happens: HTTP requests, Canvas API calls, LLM calls, cache lookups and scheduler runs.
+State that other objects already track (connection pools, the LLM dispatcher, the
+response cache) is read by collectors at scrape time. Each process exposes only its own
+numbers; `/internal/metrics` serves the API's.
+"""
+
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; request and Canvas latencies, then slower LLM calls and scheduler jobs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0, 600.0)
+
+Labels = Tuple[str, ...]
+
+
+class MetricFamily(NamedTuple):
+    name: str
+    kind: str  # counter, gauge or histogram
+    help: str
+    samples: List[Tuple[str, Dict[str, Any], float]]  # (name suffix, labels, value)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def render_families(families: Sequence[MetricFamily]) -> str:
+    """Prometheus text format for these families."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for suffix, labels, value in family.samples:
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            label_text = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{family.name}{suffix}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Labels:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Labels) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key, strict=True))
+
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = sorted(self._values.items())
+        return MetricFamily(
+            self.name, self.kind, self.help, [("", self._labels(k), v) for k, v in values]
+        )
+
+
+class Histogram(_Metric):
+    """Observations per label set in fixed upper-bound buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[Dict[str, Any]]:
+        """Observe the duration of the block; labels may be updated inside it."""
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            values = sorted(
+                (k, (list(counts), total[0])) for k, (counts, total) in self._values.items()
+            )
+        samples = []
+        for key, (counts, total) in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts, strict=True):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return MetricFamily(self.name, self.kind, self.help, samples)
+
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[MetricFamily]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[MetricFamily]]) -> None:
+        self._collectors.append(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            # A broken collector costs its own series, never the whole scrape
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector.__name__} failed: {str(e)}")
+        return families
+
+    def render(self) -> str:
+        return render_families(self.collect())
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "API request latency until the response starts, by route template.",
+    ("method", "route", "status"),
+)
+CANVAS_REQUEST_SECONDS = REGISTRY.histogram(
+    "canvas_api_request_duration_seconds",
+    "Canvas API call latency; status is the HTTP status, or 'error' when the call raised.",
+    ("method", "endpoint", "status"),
+)
+CANVAS_PAGES = REGISTRY.counter(
+    "canvas_api_pages_total",
+    "Pages of paginated Canvas API responses fetched.",
+    ("endpoint",),
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds",
+    "LLM provider call latency, excluding time queued in the dispatcher.",
+    ("model", "mode", "outcome"),
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total",
+    "LLM tokens reported by the provider.",
+    ("model", "direction"),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cache_lookups_total",
+    "Cache lookups by cache and result; the hit ratio is hits over all lookups.",
+    ("cache", "result"),
+)
+SCHEDULER_JOB_SECONDS = REGISTRY.histogram(
+    "scheduler_job_duration_seconds",
+    "Duration of scheduler job runs that finished in this process.",
+    ("job", "outcome"),
+    buckets=SLOW_BUCKETS,
+)
+SCHEDULER_JOB_RUNS = REGISTRY.counter(
+    "scheduler_job_runs_total",
+    "Scheduler job runs by outcome, including missed and skipped runs.",
+    ("job", "outcome"),
+)
+
+_NUMERIC_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def canvas_endpoint(endpoint: Optional[str]) -> str:
+    """Endpoint label without the query string or ids, e.g. "courses/:id/assignments"."""
+    if not endpoint:
+        return "unknown"
+    path = "/" + endpoint.split("?", 1)[0].strip("/")
+    return _NUMERIC_SEGMENT.sub("/:id", path).lstrip("/")
+
+
+def instrument_canvas(canvas: Any) -> Any:
+    """Time every API call of a canvasapi `Canvas` and the objects it hands out."""
+    # All objects from one Canvas share its private Requester, which makes every HTTP call
+    requester = canvas._Canvas__requester
+    if getattr(requester, "_telemetry_installed", False):
+        return canvas
+    request = requester.request
+
+    def timed_request(method, endpoint=None, *args, **kwargs):
+        label = canvas_endpoint(endpoint or kwargs.get("_url"))
+        with CANVAS_REQUEST_SECONDS.time(method=method, endpoint=label, status="error") as labels:
+            response = request(method, endpoint, *args, **kwargs)
+            labels["status"] = response.status_code
+        # Canvas sends a Link header on every page of a paginated collection
+        if response.headers.get("Link"):
+            CANVAS_PAGES.inc(endpoint=label)
+        return response
+
+    requester.request = timed_request
+    requester._telemetry_installed = True
+    return canvas
+
+
+def _token_usage(message: Any) -> Tuple[int, int]:
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("input_tokens") or 0, usage.get("output_tokens") or 0
+
+
+class _LLMCall:
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def add_usage(self, message: Any) -> None:
+        """Count tokens from a response or stream chunk's `usage_metadata`."""
+        input_tokens, output_tokens = _token_usage(message)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+
+@contextmanager
+def observe_llm_call(llm: Any, mode: str) -> Iterator[_LLMCall]:
+    """Record latency, outcome and token usage of one provider call."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    call = _LLMCall()
+    with LLM_REQUEST_SECONDS.time(model=model, mode=mode, outcome="error") as labels:
+        try:
+            yield call
+        except GeneratorExit:
+            # Streaming consumer went away; not a provider failure
+            labels["outcome"] = "cancelled"
+            raise
+        labels["outcome"] = "ok"
+    if call.input_tokens:
+        LLM_TOKENS.inc(call.input_tokens, model=model, direction="input")
+    if call.output_tokens:
+        LLM_TOKENS.inc(call.output_tokens, model=model, direction="output")
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _gauge(name: str, help: str, samples: List[Tuple[Dict[str, Any], Any]]) -> MetricFamily:
+    return MetricFamily(
+        name, "gauge", help, [("", labels, value) for labels, value in samples if value is not None]
+    )
+
+
+def _counter(name: str, help: str, samples: List[Tuple[Dict[str, Any], Any]]) -> MetricFamily:
+    return MetricFamily(name, "counter", help, [("", labels, value) for labels, value in samples])
+
+
+def _pool_families() -> List[MetricFamily]:
+    # Imported here: the session module builds engines at import time
+    from backend.db.session import engine, pool_stats, replica_engine
+
+    pools = [("primary", pool_stats(engine))]
+    if replica_engine is not None:
+        pools.append(("replica", pool_stats(replica_engine)))
+
+    def samples(field: str) -> List[Tuple[Dict[str, Any], Any]]:
+        return [({"database": db}, stats.get(field)) for db, stats in pools if field in stats]
+
+    return [
+        _gauge("db_pool_size", "Connections the pool keeps open.", samples("size")),
+        _gauge("db_pool_checked_out", "Connections currently in use.", samples("checked_out")),
+        _gauge("db_pool_overflow", "Connections open beyond the pool size.", samples("overflow")),
+        _counter("db_pool_checkouts_total", "Connection checkouts.", samples("checkouts")),
+        _counter(
+            "db_pool_timeouts_total", "Checkouts that timed out waiting.", samples("timeouts")
+        ),
+    ]
+
+
+def _llm_dispatcher_families() -> List[MetricFamily]:
+    from backend.services.llm_dispatcher import get_llm_dispatcher
+
+    stats = get_llm_dispatcher().stats()
+    outcomes = ("completed", "failed", "rejected", "coalesced")
+    return [
+        _gauge("llm_dispatcher_running", "LLM calls holding a slot.", [({}, stats["running"])]),
+        _gauge(
+            "llm_dispatcher_queue_depth",
+            "LLM calls waiting for a slot.",
+            [({}, stats["queue_depth"])],
+        ),
+        _counter(
+            "llm_dispatcher_calls_total",
+            "LLM calls by how the dispatcher settled them.",
+            [({"outcome": outcome}, stats[outcome]) for outcome in outcomes],
+        ),
+    ]
+
+
+def _response_cache_families() -> List[MetricFamily]:
+    from backend.services.response_cache import get_response_cache
+
+    stats = get_response_cache().stats()
+    return [
+        _gauge(
+            "response_cache_entries",
+            "Entries in the local response cache.",
+            [({}, stats["local_entries"])],
+        ),
+        _counter(
+            "response_cache_generation_bumps_total",
+            "Invalidations of cached responses by syncs.",
+            [({}, stats["bumps"])],
+        ),
+    ]
+
+
+REGISTRY.add_collector(_pool_families)
+REGISTRY.add_collector(_llm_dispatcher_families)
+REGISTRY.add_collector(_response_cache_families)
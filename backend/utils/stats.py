@@ -0,0 +1,14 @@
+"""
+Small statistics helpers for in-process metrics.
+"""
+
+import math
+from typing import List, Optional
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return round(sorted_values[rank], 1)
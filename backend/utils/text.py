@@ -0,0 +1,25 @@
+"""
+Plain-text helpers shared by the models, migrations and services.
+"""
+
+import html
+import re
+
+_BLOCK_TAGS = re.compile(
+    r"<\s*(?:br|/p|/div|/li|/tr|/h[1-6]|h[1-6][^>]*|/ul|/ol|/table|hr)\s*/?\s*>", re.I
+)
+_LIST_ITEM = re.compile(r"<\s*li[^>]*>", re.I)
+_TAGS = re.compile(r"<[^>]+>")
+_INLINE_SPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def html_to_text(html_content: str) -> str:
+    """Convert Canvas HTML to plain text, keeping block structure as line breaks."""
+    if not html_content:
+        return ""
+    text = _LIST_ITEM.sub("\n- ", html_content)
+    text = _BLOCK_TAGS.sub("\n\n", text)
+    text = html.unescape(_TAGS.sub("", text))
+    lines = [_INLINE_SPACE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
@@ -0,0 +1,64 @@
+"""
+Background worker entrypoint.
+
+Run with `python -m backend.worker`. The worker owns the APScheduler instance, runs
+sync and notification jobs in a process pool, and drains jobs the API enqueued in
+the `jobs` table. The API process never runs these jobs itself.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+
+from backend.config import get_settings
+from backend.db.session import SessionLocal
+from backend.services.job_queue import JobQueue, default_worker_id
+from backend.services.scheduler_service import CanvasSchedulerService
+
+logger = logging.getLogger("backend.worker")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Canvas AI Labs background worker")
+    parser.add_argument("--processes", type=int, default=None, help="process pool size")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    # Jobs whose worker died (or this worker's previous run) go back on the queue;
+    # jobs other live workers are running keep their heartbeat and are left alone
+    db = SessionLocal()
+    try:
+        requeued = JobQueue(db).requeue_abandoned(
+            get_settings().job_lease_seconds, worker_id=default_worker_id()
+        )
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted job(s)")
+    finally:
+        db.close()
+
+    service = CanvasSchedulerService(max_processes=args.processes)
+    service.schedule_daily_sync()
+    service.schedule_deadline_notifications()
+    service.schedule_assignment_sync()
+    service.schedule_queue_dispatch()
+    service.schedule_retention()
+    logger.info("Worker started")
+
+    stop = threading.Event()
+
+    def _handle_signal(signum, _frame):
+        logger.info(f"Received signal {signum}, shutting down")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _handle_signal)
+    signal.signal(signal.SIGTERM, _handle_signal)
+
+    stop.wait()
+    service.shutdown()
+    logger.info("Worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Shared fixtures for backend unit tests.
+Unit tests run against an in-memory SQLite database; no server or Canvas access needed.
+"""
+
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import backend.models  # noqa: F401  (register all tables on Base.metadata)
+from backend.config import get_settings
+from backend.db.base import Base
+from backend.db.query_audit import install_query_audit
+from backend.services.response_cache import get_response_cache
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: timing or memory comparison; run with RUN_BENCHMARKS=1"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Wall-clock and memory assertions are noisy on shared runners; opt in to run them
+    if os.getenv("RUN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; set RUN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def db_engine():
+    """Fresh in-memory SQLite engine with all tables created."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    install_query_audit(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """Database session bound to the in-memory engine."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture(autouse=True)
+def fail_on_n_plus_one(monkeypatch):
+    """Requests and jobs run by tests fail on N+1 query patterns instead of only warning."""
+    monkeypatch.setattr(get_settings(), "query_audit_mode", "raise")
+
+
+@pytest.fixture(autouse=True)
+def response_cache_without_database_generation(monkeypatch):
+    """Unit tests have no primary database; the shared cache counts syncs in-process."""
+    monkeypatch.setattr(get_response_cache(), "sync_generation", None)
@@ -0,0 +1,123 @@
+"""
+Unit tests for the persistent LLM analysis cache
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.config import get_settings
+from backend.db.query_audit import audit_queries
+from backend.models import Assignment, Course, LLMAnalysisCache
+from backend.services.analysis_cache import AnalysisCache, course_scope
+from backend.services.mock_llm_service import MockCanvasLLMService
+from backend.services.telemetry import CACHE_LOOKUPS
+
+
+class TestAnalysisCache:
+    """Test hit/miss, TTL, LRU eviction and scope invalidation"""
+
+    def test_miss_then_hit(self, db_session):
+        cache = AnalysisCache(db_session)
+        assert cache.get("summarize_syllabus", "mock", "v1", "text") is None
+
+        cache.set("summarize_syllabus", "mock", "v1", "text", {"summary": "ok"})
+        hit = cache.get("summarize_syllabus", "mock", "v1", "text")
+        assert hit["result"] == {"summary": "ok"}
+
+    def test_key_includes_model_prompt_version_and_text(self, db_session):
+        cache = AnalysisCache(db_session)
+        cache.set("summarize_syllabus", "mock", "v1", "text", {"summary": "ok"})
+        assert cache.get("summarize_syllabus", "gpt-4o-mini", "v1", "text") is None
+        assert cache.get("summarize_syllabus", "mock", "v2", "text") is None
+        assert cache.get("summarize_syllabus", "mock", "v1", "changed text") is None
+        assert cache.get("analyze_assignment", "mock", "v1", "text") is None
+
+    def test_expired_entries_miss(self, db_session):
+        cache = AnalysisCache(db_session)
+        cache.set("summarize_syllabus", "mock", "v1", "text", {"summary": "ok"})
+        entry = db_session.query(LLMAnalysisCache).one()
+        entry.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        db_session.commit()
+
+        assert cache.get("summarize_syllabus", "mock", "v1", "text") is None
+        assert db_session.query(LLMAnalysisCache).count() == 0
+
+    def test_get_many_reads_in_one_query(self, db_session):
+        cache = AnalysisCache(db_session)
+        for text in ("a", "b", "c"):
+            cache.set("op", "mock", "v1", text, {"text": text})
+        db_session.query(LLMAnalysisCache).filter(
+            LLMAnalysisCache.result == '{"text": "c"}'
+        ).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+        db_session.commit()
+        hits = CACHE_LOOKUPS.value(cache="llm_analysis", result="hit")
+        misses = CACHE_LOOKUPS.value(cache="llm_analysis", result="miss")
+
+        with audit_queries("get_many", mode="raise", threshold=1) as audit:
+            results = cache.get_many("op", "mock", "v1", ["b", "missing", "a", "c"])
+
+        assert [r and r["result"]["text"] for r in results] == ["b", None, "a", None]
+        # Select, delete expired, record hits, commit
+        assert audit.count <= 4
+        assert CACHE_LOOKUPS.value(cache="llm_analysis", result="hit") == hits + 2
+        assert CACHE_LOOKUPS.value(cache="llm_analysis", result="miss") == misses + 2
+        assert sorted(
+            (entry.result, entry.hit_count) for entry in db_session.query(LLMAnalysisCache)
+        ) == [('{"text": "a"}', 1), ('{"text": "b"}', 1)]
+
+    def test_lru_eviction(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "llm_cache_max_entries", 2)
+        cache = AnalysisCache(db_session)
+        cache.set("op", "mock", "v1", "a", {"n": 1})
+        cache.set("op", "mock", "v1", "b", {"n": 2})
+        # Touch "a" so "b" becomes the least recently used entry
+        db_session.query(LLMAnalysisCache).filter(LLMAnalysisCache.result == '{"n": 2}').update(
+            {"last_accessed_at": datetime.now(timezone.utc) - timedelta(hours=1)}
+        )
+        db_session.commit()
+        cache.set("op", "mock", "v1", "c", {"n": 3})
+
+        assert cache.get("op", "mock", "v1", "b") is None
+        assert cache.get("op", "mock", "v1", "a") is not None
+        assert cache.get("op", "mock", "v1", "c") is not None
+
+    def test_invalidate_scope(self, db_session):
+        cache = AnalysisCache(db_session)
+        cache.set("op", "mock", "v1", "a", {"n": 1}, scope=course_scope(1))
+        cache.set("op", "mock", "v1", "b", {"n": 2}, scope=course_scope(2))
+        assert cache.invalidate(course_scope(1)) == 1
+        db_session.commit()
+        assert cache.get("op", "mock", "v1", "a") is None
+        assert cache.get("op", "mock", "v1", "b") is not None
+
+
+class TestMockServiceCaching:
+    """The mock LLM service goes through the same cache as the real one"""
+
+    @pytest.fixture
+    def seeded(self, db_session):
+        course = Course(canvas_course_id=10, name="Biology", syllabus_body="<p>Syllabus</p>")
+        db_session.add(course)
+        db_session.flush()
+        db_session.add(Assignment(canvas_assignment_id=20, course_id=course.id, name="Project 1"))
+        db_session.commit()
+        return db_session
+
+    def test_syllabus_second_call_is_cached(self, seeded):
+        service = MockCanvasLLMService(seeded)
+        first = service.summarize_syllabus(10)
+        second = service.summarize_syllabus(10)
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["analysis"] == first["analysis"]
+
+    def test_assignment_cache_follows_content(self, seeded):
+        service = MockCanvasLLMService(seeded)
+        assert service.analyze_assignment(20)["cached"] is False
+        assert service.analyze_assignment(20)["cached"] is True
+
+        assignment = seeded.query(Assignment).one()
+        assignment.description = "New instructions"
+        seeded.commit()
+        assert service.analyze_assignment(20)["cached"] is False
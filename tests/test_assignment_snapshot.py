@@ -0,0 +1,177 @@
+"""
+Tests for the columnar assignment snapshot behind the analytics endpoints
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.config import get_settings
+from backend.models import Assignment, Course
+from backend.services.ai_service import CanvasAIService
+from backend.services.assignment_snapshot import AssignmentSnapshot, get_snapshot_store
+from backend.services.response_cache import bump_sync_generation, get_response_cache
+
+pytest.importorskip("numpy")
+
+NOW = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def _seed(db_session, now):
+    db_session.add_all(
+        [
+            Course(id=1, canvas_course_id=101, name="Chemistry"),
+            Course(id=2, canvas_course_id=102, name="History"),
+            Course(id=3, canvas_course_id=103, name="Empty"),
+        ]
+    )
+    due = [
+        # (canvas id, course, days from now, points, state)
+        (1, 1, 0.5, 10, "published"),
+        (2, 1, 2.5, 300, "published"),
+        (3, 2, 5.5, None, "published"),
+        (4, 2, -1.5, 20, "published"),
+        (5, 1, 1.5, 50, "deleted"),
+        (6, 2, -10.5, 5, None),
+        (7, 2, 20.5, 40, "unpublished"),
+        (8, 1, 45.0, 100, "published"),
+    ]
+    for canvas_id, course_id, days, points, state in due:
+        db_session.add(
+            Assignment(
+                canvas_assignment_id=canvas_id,
+                course_id=course_id,
+                name=f"Assignment {canvas_id}",
+                due_at=now + timedelta(days=days),
+                points_possible=points,
+                workflow_state=state,
+                submission_types="online_upload,online_text_entry" if canvas_id == 1 else None,
+            )
+        )
+    db_session.add(Assignment(canvas_assignment_id=9, course_id=1, name="Undated"))
+    db_session.commit()
+
+
+class TestAssignmentSnapshot:
+    """Test windows, urgency, overdue order and per-course workload"""
+
+    def test_upcoming_deadlines(self, db_session):
+        _seed(db_session, NOW)
+        deadlines = AssignmentSnapshot.build(db_session).upcoming_deadlines(NOW, 7)
+
+        assert [(d["assignment_id"], d["days_until_due"], d["urgency"]) for d in deadlines] == [
+            (1, 0, "high"),
+            (2, 2, "medium"),
+            (3, 5, "low"),
+        ]
+        assert deadlines[0] == {
+            "assignment_id": 1,
+            "name": "Assignment 1",
+            "course_name": "Chemistry",
+            "due_at": "2026-10-19T21:00:00+00:00",
+            "days_until_due": 0,
+            "urgency": "high",
+            "points_possible": 10.0,
+            "html_url": None,
+            "submission_types": ["online_upload", "online_text_entry"],
+        }
+        assert deadlines[2]["points_possible"] is None
+
+    def test_overdue_newest_first(self, db_session):
+        _seed(db_session, NOW)
+        overdue = AssignmentSnapshot.build(db_session).overdue_assignments(NOW)
+        # Assignment 6 has no workflow state and, as in SQL, is not counted
+        assert [(o["assignment_id"], o["days_overdue"]) for o in overdue] == [(4, 1)]
+
+    def test_course_workload(self, db_session):
+        _seed(db_session, NOW)
+        workload = AssignmentSnapshot.build(db_session).course_workload(NOW)
+
+        assert [(w["course_id"], w["assignment_count"]) for w in workload] == [(101, 2), (102, 2)]
+        chemistry, history = workload
+        assert chemistry["total_points"] == 310.0
+        assert chemistry["avg_days_until_due"] == 1.0
+        assert chemistry["intensity"] == "medium"
+        assert history["total_points"] == 40.0
+        assert history["intensity"] == "low"
+        assert [a["name"] for a in history["upcoming_assignments"]] == [
+            "Assignment 3",
+            "Assignment 7",
+        ]
+
+    def test_empty(self, db_session):
+        snapshot = AssignmentSnapshot.build(db_session)
+        assert snapshot.upcoming_deadlines(NOW, 7) == []
+        assert snapshot.overdue_assignments(NOW) == []
+        assert snapshot.course_workload(NOW) == []
+
+    @pytest.mark.benchmark
+    def test_queries_stay_fast(self):
+        courses = [(i, 100 + i, f"Course {i}") for i in range(20)]
+        assignments = [
+            (i, i % 20, f"A{i}", NOW + timedelta(hours=i - 5000), 10.0, "published", None, None)
+            for i in range(20000)
+        ]
+        snapshot = AssignmentSnapshot(assignments, courses)
+        started = time.perf_counter()
+        for _ in range(100):
+            snapshot.course_workload(NOW)
+        assert (time.perf_counter() - started) / 100 < 0.01
+
+
+class TestSnapshotInService:
+    """Test CanvasAIService reads the snapshot and sees syncs"""
+
+    def test_service_uses_snapshot_and_rebuilds_after_sync(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "analytics_snapshot_enabled", True)
+        get_snapshot_store().clear()
+        now = datetime.now(timezone.utc)
+        _seed(db_session, now)
+        service = CanvasAIService(db_session)
+
+        assert [d["assignment_id"] for d in service.get_upcoming_deadlines(1, 7)] == [1, 2, 3]
+
+        db_session.add(
+            Assignment(
+                canvas_assignment_id=10,
+                course_id=2,
+                due_at=now + timedelta(days=3),
+                workflow_state="published",
+            )
+        )
+        db_session.commit()
+        # Not visible until a sync bumps the generation
+        assert len(service.get_upcoming_deadlines(1, 7)) == 3
+        bump_sync_generation()
+        assert [d["assignment_id"] for d in service.get_upcoming_deadlines(1, 7)] == [1, 2, 10, 3]
+        assert [o["assignment_id"] for o in service.get_overdue_assignments(1)] == [4]
+        assert service.get_course_workload_analysis(1)[0]["course_id"] == 102
+        get_snapshot_store().clear()
+
+    def test_users_share_one_snapshot(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "analytics_snapshot_enabled", True)
+        store = get_snapshot_store()
+        store.clear()
+        _seed(db_session, datetime.now(timezone.utc))
+        service = CanvasAIService(db_session)
+
+        first = service.get_upcoming_deadlines(1, 7)
+        snapshot = store.get(db_session)
+        assert service.get_upcoming_deadlines(2, 7) == first
+        assert store.get(db_session) is snapshot
+        store.clear()
+
+    def test_rebuilds_after_a_sync_in_another_process(self, db_session, monkeypatch):
+        store = get_snapshot_store()
+        store.clear()
+        _seed(db_session, datetime.now(timezone.utc))
+        latest_sync = [1]
+        # A worker's sync moves the primary's latest sync id, never this process's counter
+        monkeypatch.setattr(get_response_cache(), "sync_generation", lambda: latest_sync[0])
+
+        snapshot = store.get(db_session)
+        assert store.get(db_session) is snapshot
+        latest_sync[0] = 2
+        assert store.get(db_session) is not snapshot
+        store.clear()
@@ -0,0 +1,107 @@
+"""
+Tests for compressed, deferred storage of syllabus and assignment HTML
+"""
+
+from types import SimpleNamespace
+
+from sqlalchemy import inspect, text
+
+from backend.config import get_settings
+from backend.db.query_audit import audit_queries
+from backend.models import Assignment, Course
+from backend.services.sync_service import CanvasSyncService
+
+SYLLABUS = "<h2>Grading</h2>" + "<p>Weekly quizzes count for 20% of the grade.</p>" * 200
+
+
+def _seed(db_session):
+    course = Course(canvas_course_id=1, name="Biology", syllabus_body=SYLLABUS)
+    db_session.add(course)
+    db_session.flush()
+    db_session.add(
+        Assignment(
+            canvas_assignment_id=10,
+            course_id=course.id,
+            name="Lab 1",
+            description="<p>Measure &amp; record.</p>",
+        )
+    )
+    db_session.commit()
+    db_session.expunge_all()
+
+
+class TestCompressedContent:
+    """Test compression, the cleaned text and deferred loading"""
+
+    def test_html_is_stored_compressed(self, db_session):
+        _seed(db_session)
+        stored = db_session.execute(text("SELECT syllabus_body_zlib FROM courses")).scalar()
+        assert len(stored) < len(SYLLABUS) / 10
+        assert db_session.query(Course).one().syllabus_body == SYLLABUS
+
+    def test_plain_text_is_kept_in_step(self, db_session):
+        _seed(db_session)
+        assignment = db_session.query(Assignment).one()
+        assert assignment.description_text == "Measure & record."
+
+        assignment.description = None
+        db_session.commit()
+        assert db_session.query(Assignment).one().description_text is None
+        assert db_session.query(Course).one().syllabus_text.startswith("Grading\n\nWeekly")
+
+    def test_large_columns_are_not_loaded_with_the_row(self, db_session):
+        _seed(db_session)
+        course = db_session.query(Course).one()
+        assignment = db_session.query(Assignment).one()
+        assert course.name == "Biology"
+        for obj, columns in (
+            (course, ("syllabus_body", "syllabus_text")),
+            (assignment, ("description", "description_text")),
+        ):
+            assert set(columns) <= inspect(obj).unloaded
+
+
+def _fake_canvas(course_count=3, assignment_count=4):
+    """Canvas double whose courses and assignments all carry HTML bodies."""
+    courses = [
+        SimpleNamespace(
+            id=course_id,
+            name=f"Course {course_id}",
+            syllabus_body=f"<p>Syllabus {course_id}</p>",
+            get_assignments=lambda course_id=course_id: [
+                SimpleNamespace(
+                    id=course_id * 100 + n,
+                    name=f"Assignment {n}",
+                    description=f"<p>Task {n}</p>",
+                    due_at="2026-11-01T23:59:00Z",
+                )
+                for n in range(assignment_count)
+            ],
+        )
+        for course_id in range(1, course_count + 1)
+    ]
+    user = SimpleNamespace(get_courses=lambda **kwargs: courses)
+    return SimpleNamespace(get_current_user=lambda: user)
+
+
+class TestResync:
+    """Test that re-syncing unchanged content does not lazy-load the deferred columns"""
+
+    def test_resync_runs_no_per_row_queries(self, db_session, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "canvas_api_url", "https://canvas.example.edu")
+        monkeypatch.setattr(settings, "canvas_api_key", "test-key")
+        service = CanvasSyncService(db_session)
+        service.canvas = _fake_canvas()
+        service.sync_courses(user_id=1)
+        service.sync_assignments(user_id=1)
+        db_session.expunge_all()
+
+        resync = CanvasSyncService(db_session)
+        resync.canvas = service.canvas
+        with audit_queries("resync", mode="raise", threshold=3) as audit:
+            courses_run = resync.sync_courses(user_id=1)
+            assignments_run = resync.sync_assignments(user_id=1)
+
+        assert (courses_run.items_updated, assignments_run.items_updated) == (3, 12)
+        assert audit.count <= 14
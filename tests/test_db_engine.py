@@ -0,0 +1,70 @@
+"""
+Tests for the settings-driven engine factory and pool statistics
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import StaticPool
+
+from backend.config import Settings
+from backend.db.session import InstrumentedQueuePool, _pool_limits, create_db_engine, pool_stats
+
+
+class TestEngineFactory:
+    """Test per-dialect tuning"""
+
+    def test_sqlite_file_pragmas(self, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", Settings())
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        engine.dispose()
+
+    def test_sqlite_memory_shares_one_connection(self):
+        engine = create_db_engine("sqlite://", Settings())
+        assert isinstance(engine.pool, StaticPool)
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert pool_stats(engine)["pool"] == "StaticPool"
+
+    def test_postgres_options(self):
+        pytest.importorskip("psycopg2")
+        settings = Settings(db_pool_size=7, db_max_overflow=3, db_statement_timeout_ms=1500)
+        engine = create_db_engine("postgresql://user:pw@localhost/canvas", settings)
+        assert engine.pool.size() == 7
+        assert engine.pool._pre_ping is True
+        assert engine.pool._recycle == 1800
+
+    def test_pool_limits_split_the_budget(self):
+        settings = Settings(db_connection_budget=60, worker_processes=2, sync_max_concurrency=2)
+        assert _pool_limits(settings) == (5, 5)  # 60 connections over 6 processes
+        assert _pool_limits(Settings(db_pool_size=3, db_max_overflow=0)) == (3, 0)
+
+
+class TestPoolStats:
+    """Exhaustion fails fast and is counted"""
+
+    def test_checkouts_and_timeouts(self, tmp_path):
+        settings = Settings(db_pool_size=1, db_max_overflow=0, db_pool_timeout_seconds=0.05)
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", settings)
+
+        held = engine.connect()
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 1
+        assert stats["timeouts"] == 1
+        held.close()
+
+        with engine.connect():
+            pass
+        stats = pool_stats(engine)
+        assert stats["checkouts"] == 2
+        assert stats["checked_out"] == 0
+        assert stats["wait_ms"]["max"] is not None
+
+        engine.dispose()
+        assert pool_stats(engine)["checkouts"] == 2  # counters survive dispose
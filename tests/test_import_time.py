@@ -0,0 +1,57 @@
+"""
+Import-time regression checks for the API entrypoint, using `python -X importtime`
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Generous ceilings for slow CI runners; locally the import takes about a third
+TOTAL_BUDGET_MS = 3000
+BACKEND_SELF_BUDGET_MS = 500  # time spent in our own modules, excluding dependencies
+
+# Only needed by syncs, the worker or optional features; never by API startup
+LAZY_MODULES = ("canvasapi", "numpy", "apscheduler.schedulers", "redis", "langchain_openai")
+
+
+@pytest.fixture(scope="module")
+def import_times():
+    """{module: (self_us, cumulative_us)} from a fresh interpreter importing backend.main."""
+    check_logging = "import logging; assert not logging.getLogger().handlers, 'root logging set'"
+    # Fixed script run by this interpreter; no untrusted input
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import backend.main; {check_logging}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestImportTime:
+    """Test that importing the API stays lazy and within budget"""
+
+    def test_heavy_dependencies_load_on_first_use(self, import_times):
+        loaded = [name for name in LAZY_MODULES if name in import_times]
+        assert loaded == []
+
+    @pytest.mark.benchmark
+    def test_total_within_budget(self, import_times):
+        assert import_times["backend.main"][1] / 1000 < TOTAL_BUDGET_MS
+
+    @pytest.mark.benchmark
+    def test_backend_modules_within_budget(self, import_times):
+        own = sum(s for name, (s, _) in import_times.items() if name.startswith("backend"))
+        assert own / 1000 < BACKEND_SELF_BUDGET_MS
@@ -0,0 +1,85 @@
+"""
+Unit tests for the database-backed background job queue
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.models import Job
+from backend.services import job_queue
+from backend.services.job_queue import JobQueue
+
+
+class TestJobQueue:
+    """Test enqueue/claim/settle semantics of JobQueue"""
+
+    def test_enqueue_then_claim_marks_running(self, db_session):
+        queue = JobQueue(db_session)
+        job = queue.enqueue("full_sync", {"user_id": 1}, user_id=1)
+        assert job.status == "queued"
+
+        claimed = queue.claim_next(limit=5)
+        assert [j.id for j in claimed] == [job.id]
+        assert claimed[0].status == "running"
+        assert claimed[0].attempts == 1
+
+        # Already-claimed jobs are not handed out twice
+        assert queue.claim_next(limit=5) == []
+
+    def test_claim_orders_by_priority(self, db_session):
+        queue = JobQueue(db_session)
+        low = queue.enqueue("full_sync", priority=10)
+        high = queue.enqueue("full_sync", priority=0)
+
+        claimed = queue.claim_next(limit=1)
+        assert claimed[0].id == high.id
+        assert queue.claim_next(limit=1)[0].id == low.id
+
+    def test_requeue_only_abandoned_jobs(self, db_session):
+        queue = JobQueue(db_session)
+        live = queue.enqueue("full_sync")
+        dead = queue.enqueue("full_sync")
+        queue.claim_next(limit=1, worker_id="worker-a")
+        queue.claim_next(limit=1, worker_id="worker-b")
+        # worker-b stopped heartbeating ten minutes ago
+        db_session.query(Job).filter(Job.id == dead.id).update(
+            {Job.heartbeat_at: datetime.now(timezone.utc) - timedelta(minutes=10)}
+        )
+        db_session.commit()
+
+        # A third worker starting up leaves worker-a's job running
+        assert queue.requeue_abandoned(lease_seconds=300, worker_id="worker-c") == 1
+        assert queue.get(live.id).status == "running"
+        assert queue.get(dead.id).status == "queued"
+        assert queue.get(dead.id).worker_id is None
+
+    def test_restarted_worker_requeues_its_own_jobs(self, db_session):
+        queue = JobQueue(db_session)
+        job = queue.enqueue("full_sync")
+        queue.claim_next(worker_id="worker-a")
+        assert queue.heartbeat("worker-a") == 1
+        assert queue.requeue_abandoned(lease_seconds=300) == 0
+        assert queue.requeue_abandoned(lease_seconds=300, worker_id="worker-a") == 1
+        assert queue.get(job.id).status == "queued"
+
+    def test_execute_unknown_job_type_fails(self, db_session):
+        queue = JobQueue(db_session)
+        job = queue.enqueue("does_not_exist")
+        with pytest.raises(ValueError):
+            job_queue._execute(db_session, job)
+
+        stored = db_session.query(Job).filter(Job.id == job.id).one()
+        assert stored.status == "failed"
+        assert "Unknown job type" in stored.error_message
+
+    def test_complete_stores_result(self, db_session):
+        queue = JobQueue(db_session)
+        job = queue.enqueue("full_sync")
+        queue.complete(job, {"items_processed": 3})
+
+        data = job_queue.serialize_job(job)
+        assert data["status"] == "completed"
+        assert data["result"] == {"items_processed": 3}
+        assert json.loads(job.payload) == {}
@@ -0,0 +1,72 @@
+"""
+Tests for the concurrent batch assignment analysis endpoint
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.session import get_db
+from backend.main import app
+from backend.models import Assignment, Course
+
+
+class TestCourseAssignmentBatch:
+    """Test POST /llm/course/{course_id}/assignments/analyze against the mock service"""
+
+    @pytest.fixture
+    def client(self, db_engine):
+        Session = sessionmaker(bind=db_engine, autoflush=False)
+        db = Session()
+        course = Course(canvas_course_id=10, name="Chemistry")
+        db.add(course)
+        db.flush()
+        for i, name in enumerate(["Quiz 1", "Homework 2", "Final Project", "Exam 1"]):
+            db.add(Assignment(canvas_assignment_id=100 + i, course_id=course.id, name=name))
+        db.commit()
+        db.close()
+
+        def _override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = _override_get_db
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+
+    @staticmethod
+    def _lines(response):
+        return [json.loads(line) for line in response.text.splitlines() if line]
+
+    def test_streams_all_results_then_summary(self, client):
+        response = client.post("/llm/course/10/assignments/analyze?max_concurrency=2")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        lines = self._lines(response)
+        results, summary = lines[:-1], lines[-1]
+        assert {r["assignment_id"] for r in results} == {100, 101, 102, 103}
+        assert summary == {
+            "course_id": 10,
+            "done": True,
+            "total": 4,
+            "cached": 0,
+            "analyzed": 4,
+            "failed": 0,
+        }
+
+    def test_second_run_is_served_from_cache(self, client):
+        client.post("/llm/course/10/assignments/analyze")
+        lines = self._lines(client.post("/llm/course/10/assignments/analyze"))
+        assert all(r["cached"] for r in lines[:-1])
+        assert lines[-1]["cached"] == 4
+        assert lines[-1]["analyzed"] == 0
+
+    def test_unknown_course(self, client):
+        lines = self._lines(client.post("/llm/course/999/assignments/analyze"))
+        assert lines == [{"course_id": 999, "error": "Course not found"}]
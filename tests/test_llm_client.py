@@ -0,0 +1,77 @@
+"""
+Tests for the shared LLM client registry and lazy langchain imports
+"""
+
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from backend.services import llm_client
+
+
+class TestLLMClientRegistry:
+    """Test that chat model clients are built once per process and share a pool"""
+
+    @pytest.fixture
+    def fake_langchain(self, monkeypatch):
+        built = []
+
+        class ChatOpenAI:
+            def __init__(self, **kwargs):
+                self.kwargs = kwargs
+                built.append(self)
+
+        module = types.ModuleType("langchain_openai")
+        module.ChatOpenAI = ChatOpenAI
+        monkeypatch.setitem(sys.modules, "langchain_openai", module)
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        llm_client.close_clients()
+        yield built
+        llm_client.close_clients()
+
+    def test_client_is_reused(self, fake_langchain):
+        first = llm_client.get_chat_model("gpt-4o-mini")
+        second = llm_client.get_chat_model("gpt-4o-mini")
+        assert first is second
+        assert len(fake_langchain) == 1
+
+    def test_clients_share_http_pool(self, fake_langchain):
+        mini = llm_client.get_chat_model("gpt-4o-mini")
+        other = llm_client.get_chat_model("gpt-4o", temperature=0.0)
+        assert mini is not other
+        assert mini.kwargs["http_client"] is other.kwargs["http_client"]
+
+    def test_missing_api_key(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with pytest.raises(ValueError):
+            llm_client.get_chat_model("gpt-4o-mini")
+
+
+class TestColdStart:
+    """Startup benchmark: importing the app must not load any LLM client library"""
+
+    def test_backend_main_does_not_import_langchain(self, tmp_path):
+        # A stand-in package, so the check holds whether or not langchain is installed
+        stub = tmp_path / "langchain_openai"
+        stub.mkdir()
+        (stub / "__init__.py").write_text("def __getattr__(name):\n    return object\n")
+        script = (
+            "import importlib.util, sys, time\n"
+            "started = time.perf_counter()\n"
+            "import backend.main\n"
+            "print(f'{(time.perf_counter() - started) * 1000:.0f}ms', file=sys.stderr)\n"
+            "print(importlib.util.find_spec('langchain_openai').origin)\n"
+            "print(','.join(m for m in sys.modules\n"
+            "    if m.split('.')[0] in ('langchain', 'langchain_core', 'langchain_openai', 'openai')))\n"
+        )
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), *sys.path])}
+        # Fixed script run by this interpreter; no untrusted input
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env
+        )
+        stub_origin, loaded = result.stdout.splitlines()
+        assert stub_origin == str(stub / "__init__.py")
+        assert loaded == ""
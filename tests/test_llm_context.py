@@ -0,0 +1,51 @@
+"""
+Tests for token-budgeted prompt context building
+"""
+
+from backend.services.llm_context import estimate_tokens, split_into_chunks, truncate_to_budget
+from backend.utils.text import html_to_text
+
+
+class TestHtmlToText:
+    """Test HTML cleaning keeps the structure chunking relies on"""
+
+    def test_block_tags_become_paragraph_breaks(self):
+        html = "<h2>Grading</h2><p>Exams &amp; quizzes: 40%</p><ul><li>Late: -10%</li></ul>"
+        text = html_to_text(html)
+        assert text.split("\n\n") == ["Grading", "Exams & quizzes: 40%", "- Late: -10%"]
+
+    def test_empty(self):
+        assert html_to_text("") == ""
+        assert html_to_text(None) == ""
+
+
+class TestChunking:
+    """Test splitting text into chunks within a token budget"""
+
+    def test_short_text_is_one_chunk(self):
+        assert split_into_chunks("Week 1\n\nIntro", 100) == ["Week 1\n\nIntro"]
+
+    def test_chunks_respect_budget_and_keep_all_paragraphs(self):
+        paragraphs = [f"Section {i}. " + "Readings and problem sets. " * 10 for i in range(20)]
+        chunks = split_into_chunks("\n\n".join(paragraphs), 200)
+
+        assert len(chunks) > 1
+        assert all(estimate_tokens(chunk) <= 200 for chunk in chunks)
+        # Paragraphs are packed whole, never split across chunks
+        assert [p for chunk in chunks for p in chunk.split("\n\n")] == [
+            p.strip() for p in paragraphs
+        ]
+
+    def test_oversized_paragraph_splits_on_sentences(self):
+        paragraph = " ".join(f"Sentence number {i} is here." for i in range(200))
+        chunks = split_into_chunks(paragraph, 50)
+
+        assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+        assert all(chunk.endswith(".") for chunk in chunks)
+        assert " ".join(" ".join(chunks).split()) == paragraph
+
+    def test_truncate_prefers_sentence_boundary(self):
+        text = "First sentence here. Second sentence is a good deal longer than the first."
+        truncated = truncate_to_budget(text, 8)
+        assert truncated == "First sentence here."
+        assert truncate_to_budget("short", 8) == "short"
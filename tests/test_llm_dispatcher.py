@@ -0,0 +1,131 @@
+"""
+Tests for the LLM dispatcher: concurrency cap, rate limiting and prompt coalescing
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.services.llm_dispatcher import LLMDispatcher, LLMQueueTimeout, TokenBucket
+
+
+class FakeLLM:
+    """Records calls and peak concurrency; blocks while `gate` is unset."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        self.gate.wait(5)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        if messages == ["boom"]:
+            raise RuntimeError("provider error")
+        return f"answer to {messages[0]}"
+
+    def stream(self, messages):
+        yield from ["a", "b"]
+
+
+class TestLLMDispatcher:
+    """Test admission control and metrics"""
+
+    def test_concurrency_is_capped(self):
+        dispatcher = LLMDispatcher(max_concurrency=2)
+        llm = FakeLLM(delay=0.02)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: dispatcher.invoke(llm, [f"q{i}"]), range(8)))
+
+        assert results == [f"answer to q{i}" for i in range(8)]
+        assert llm.peak <= 2
+        stats = dispatcher.stats()
+        assert stats["completed"] == 8
+        assert stats["running"] == 0
+        assert stats["queue_depth"] == 0
+        assert stats["max_queue_depth"] >= 1
+        assert stats["wait_ms"]["p95"] is not None
+
+    def test_identical_in_flight_prompts_are_coalesced(self):
+        dispatcher = LLMDispatcher(max_concurrency=4)
+        llm = FakeLLM()
+        llm.gate.clear()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(dispatcher.invoke, llm, ["same"]) for _ in range(3)]
+            while dispatcher.stats()["coalesced"] < 2:
+                time.sleep(0.005)
+            llm.gate.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["answer to same"] * 3
+        assert llm.calls == 1
+        stats = dispatcher.stats()
+        assert stats["requests"] == 3
+        assert stats["coalesced"] == 2
+        assert stats["in_flight_prompts"] == 0
+
+    def test_failures_propagate_and_are_counted(self):
+        dispatcher = LLMDispatcher(max_concurrency=1)
+        llm = FakeLLM()
+        with pytest.raises(RuntimeError):
+            dispatcher.invoke(llm, ["boom"])
+        assert dispatcher.stats()["failed"] == 1
+
+    def test_queue_timeout_rejects(self):
+        dispatcher = LLMDispatcher(max_concurrency=1, queue_timeout=0.05)
+        llm = FakeLLM()
+        llm.gate.clear()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            holder = pool.submit(dispatcher.invoke, llm, ["slow"])
+            while dispatcher.stats()["running"] == 0:
+                time.sleep(0.005)
+            with pytest.raises(LLMQueueTimeout):
+                dispatcher.invoke(llm, ["other"])
+            llm.gate.set()
+            holder.result()
+        assert dispatcher.stats()["rejected"] == 1
+
+    def test_batch_preserves_order_and_exceptions(self):
+        dispatcher = LLMDispatcher(max_concurrency=2)
+        results = dispatcher.batch(
+            FakeLLM(), [["a"], ["boom"], ["c"]], max_concurrency=3, return_exceptions=True
+        )
+        assert results[0] == "answer to a"
+        assert isinstance(results[1], RuntimeError)
+        assert results[2] == "answer to c"
+
+    def test_stream_holds_a_slot(self):
+        dispatcher = LLMDispatcher(max_concurrency=1)
+        stream = dispatcher.stream(FakeLLM(), ["q"])
+        assert next(stream) == "a"
+        assert dispatcher.stats()["running"] == 1
+        assert list(stream) == ["b"]
+        assert dispatcher.stats()["running"] == 0
+
+
+class TestTokenBucket:
+    """Test requests-per-minute pacing"""
+
+    def test_paces_after_burst(self):
+        bucket = TokenBucket(per_minute=1200, capacity=1)  # one token every 50ms
+        started = time.monotonic()
+        assert bucket.acquire()
+        assert bucket.acquire()
+        assert time.monotonic() - started >= 0.04
+
+    def test_deadline(self):
+        bucket = TokenBucket(per_minute=1, capacity=1)
+        assert bucket.acquire()
+        assert bucket.acquire(deadline=time.monotonic() + 0.01) is False
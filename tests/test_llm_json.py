@@ -0,0 +1,202 @@
+"""
+Tests for incremental JSON extraction from LLM responses, including fuzzed model output
+"""
+
+import json
+import random
+import time
+
+from backend.services.llm_json import (
+    ASSIGNMENT_SCHEMA,
+    SYLLABUS_SCHEMA,
+    JSONStreamParser,
+    conform,
+    conform_string_list,
+    extract_json,
+)
+
+ANALYSIS = {
+    "summary": 'Intro chemistry. Covers {stoichiometry} and "bonding".',
+    "key_points": ["Weekly labs", "Two midterms, one final"],
+    "grading_policy": {"breakdown": {"labs": 30, "exams": 70}, "late_policy": "10%/day"},
+    "important_dates": [{"date": "2026-10-01", "event": "Midterm [1]"}],
+    "requirements": ["Lab coat"],
+    "resources": ["Textbook \\ 5th ed."],
+}
+
+
+def _response(value):
+    return (
+        f"Here is the analysis:\n```json\n{json.dumps(value, indent=2)}\n```\nHope this {{helps}}!"
+    )
+
+
+def _is_prefix_of(partial, full):
+    """Whether `partial` could be a truncation of `full`."""
+    if isinstance(full, dict):
+        return isinstance(partial, dict) and all(
+            key in full and _is_prefix_of(value, full[key]) for key, value in partial.items()
+        )
+    if isinstance(full, list):
+        return (
+            isinstance(partial, list)
+            and len(partial) <= len(full)
+            and all(_is_prefix_of(p, f) for p, f in zip(partial, full, strict=False))
+        )
+    if isinstance(full, str):
+        return isinstance(partial, str) and full.startswith(partial)
+    if isinstance(full, (int, float)) and not isinstance(full, bool):
+        return isinstance(partial, (int, float)) and str(full).startswith(str(partial))
+    return partial == full
+
+
+class TestExtractJSON:
+    """Test single-pass extraction around prose, fences and decoy braces"""
+
+    def test_ignores_surrounding_prose_and_trailing_braces(self):
+        assert extract_json(_response(ANALYSIS)) == (ANALYSIS, True)
+
+    def test_skips_braces_that_are_not_json(self):
+        text = 'Use {curly} or [this, that]: {"assignment_type": "quiz"} then }'
+        assert extract_json(text) == ({"assignment_type": "quiz"}, True)
+
+    def test_array(self):
+        text = 'Tips:\n["Start early", "Sleep"]\n'
+        assert extract_json(text, expect=list) == (["Start early", "Sleep"], True)
+        assert extract_json(text) == (None, False)
+
+    def test_bracketed_citations_before_object_are_skipped(self):
+        text = 'Sure! See note [1] below.\n{"summary": "x", "key_points": ["a"]}'
+        assert extract_json(text) == ({"summary": "x", "key_points": ["a"]}, True)
+
+    def test_no_json(self):
+        assert extract_json("I cannot help with that.") == (None, False)
+        assert extract_json("") == (None, False)
+
+    def test_truncated_output_is_repaired(self):
+        value, complete = extract_json('{"summary": "Intro chem", "key_points": ["Labs", "Mid')
+        assert complete is False
+        assert value == {"summary": "Intro chem", "key_points": ["Labs", "Mid"]}
+
+        value, _ = extract_json('{"summary": "Intro chem", "grading_policy":')
+        assert value == {"summary": "Intro chem"}
+
+        value, _ = extract_json('{"summary": "Intro chem", "flag": tru')
+        assert value == {"summary": "Intro chem"}
+
+    def test_large_response_is_linear(self):
+        big = {"key_points": [f"point {i} {{x}}" for i in range(20000)]}
+        text = "prefix { " + json.dumps(big) + " } trailing }" * 3
+        started = time.perf_counter()
+        assert extract_json(text)[0] == big
+        assert time.perf_counter() - started < 1.0
+
+
+class TestStreamParser:
+    """Test feeding chunks as they arrive from a stream"""
+
+    def test_partial_objects_grow_as_chunks_arrive(self):
+        text = _response(ANALYSIS)
+        parser = JSONStreamParser()
+        seen = []
+        for start in range(0, len(text), 7):
+            parser.feed(text[start : start + 7])
+            partial = parser.value()
+            if partial is not None:
+                assert _is_prefix_of(partial, ANALYSIS)
+                seen.append(partial)
+        assert parser.done
+        assert seen[-1] == ANALYSIS
+        assert any(p.get("summary", "").startswith("Intro") for p in seen[:-1])
+
+    def test_stops_at_first_complete_value(self):
+        parser = JSONStreamParser()
+        assert parser.feed('{"a": 1}') is True
+        assert parser.feed('{"b": 2}') is True
+        assert parser.value() == {"a": 1}
+
+
+class TestFuzz:
+    """Malformed and truncated model output must never raise"""
+
+    def test_every_truncation_is_a_valid_prefix(self):
+        text = _response(ANALYSIS)
+        for cut in range(len(text) + 1):
+            value, complete = extract_json(text[:cut])
+            if complete:
+                assert value == ANALYSIS
+            elif value is not None:
+                assert _is_prefix_of(value, ANALYSIS), text[:cut]
+
+    def test_random_mutations(self):
+        rng = random.Random(39)  # noqa: S311 - seeded fuzzing, not security
+        base = _response(ANALYSIS)
+        alphabet = '{}[]",:\\ abc01\n'
+        for _ in range(2000):
+            chars = list(base)
+            for _ in range(rng.randint(1, 6)):
+                op = rng.random()
+                position = rng.randrange(len(chars))
+                if op < 0.4:
+                    del chars[position]
+                elif op < 0.8:
+                    chars.insert(position, rng.choice(alphabet))
+                else:
+                    chars[position] = rng.choice(alphabet)
+            text = "".join(chars)[: rng.randint(0, len(chars))]
+
+            value, complete = extract_json(text)
+            if complete:
+                assert value == json.loads(json.dumps(value))
+            analysis = conform(value, SYLLABUS_SCHEMA)
+            assert set(analysis) == set(SYLLABUS_SCHEMA)
+            assert isinstance(analysis["summary"], str)
+            assert all(isinstance(point, str) for point in analysis["key_points"])
+
+    def test_random_chunking_matches_one_shot(self):
+        rng = random.Random(7)  # noqa: S311 - seeded fuzzing, not security
+        text = _response(ANALYSIS) + ' {"second": true}'
+        for _ in range(200):
+            parser = JSONStreamParser()
+            position = 0
+            while position < len(text):
+                size = rng.randint(1, 40)
+                parser.feed(text[position : position + size])
+                position += size
+            assert parser.value() == ANALYSIS
+
+
+class TestSchemas:
+    """Test per-operation schema coercion"""
+
+    def test_assignment_schema_coerces_and_defaults(self):
+        analysis = conform(
+            {
+                "assignment_type": "Essay",
+                "complexity": "extreme",
+                "estimated_hours": "4 hours",
+                "key_concepts": ["thesis", 3, None],
+                "suggested_approach": 12,
+                "extra": "dropped",
+            },
+            ASSIGNMENT_SCHEMA,
+        )
+        assert analysis == {
+            "assignment_type": "essay",
+            "complexity": "medium",
+            "estimated_hours": 4.0,
+            "key_concepts": ["thesis"],
+            "suggested_approach": "12",
+            "potential_challenges": [],
+            "preparation_tips": [],
+        }
+
+    def test_non_object_uses_defaults(self):
+        analysis = conform(["not", "an", "object"], ASSIGNMENT_SCHEMA)
+        assert analysis["assignment_type"] == "other"
+        assert analysis["complexity"] == "medium"
+        assert analysis["estimated_hours"] is None
+
+    def test_string_list(self):
+        assert conform_string_list(["Sleep", "", 4, "Eat"]) == ["Sleep", "Eat"]
+        assert conform_string_list({"tips": []}) == []
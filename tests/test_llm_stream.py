@@ -0,0 +1,62 @@
+"""
+Tests for the /llm/ask/stream Server-Sent Events endpoint
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from backend.db.session import get_db
+from backend.main import app
+from backend.services.mock_llm_service import MockCanvasLLMService
+
+
+def _parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestAskStream:
+    """Test token streaming from the mock service"""
+
+    @pytest.fixture
+    def client(self, db_engine):
+        Session = sessionmaker(bind=db_engine, autoflush=False)
+
+        def _override_get_db():
+            session = Session()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = _override_get_db
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+
+    def test_streams_tokens_then_done(self, client):
+        response = client.get("/llm/ask/stream", params={"question": "When is my deadline?"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = _parse_sse(response.text)
+        tokens = [data["content"] for name, data in events if name == "token"]
+        name, done = events[-1]
+        assert name == "done"
+        assert len(tokens) > 1
+        assert "".join(tokens) == done["answer"]
+        assert done["timing"]["time_to_first_token_ms"] is not None
+        assert done["timing"]["total_ms"] >= done["timing"]["time_to_first_token_ms"]
+
+    def test_mock_stream_is_deterministic_and_matches_ask(self, db_session):
+        service = MockCanvasLLMService(db_session)
+        # Separate users so the answer cache does not serve the repeats
+        first = [e["data"] for e in service.stream_answer(1, "How should I study?")]
+        second = [e["data"] for e in service.stream_answer(2, "How should I study?")]
+        assert first[:-1] == second[:-1]
+        assert first[-1]["answer"] == service.ask_question(3, "How should I study?")["answer"]
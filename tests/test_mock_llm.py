@@ -0,0 +1,139 @@
+"""
+Tests for the mock LLM's simulated latency and failures, and per-route backend selection
+"""
+
+import statistics
+import time
+
+import pytest
+
+from backend.config import get_settings
+from backend.models import Assignment, Course
+from backend.services.llm_backend import llm_backend, llm_service_for, parse_route_backends
+from backend.services.mock_llm_service import (
+    MockCanvasLLMService,
+    MockChatModel,
+    MockLLMError,
+    MockRateLimitError,
+)
+
+
+def _seed_course(db_session):
+    course = Course(canvas_course_id=1, name="Biology", syllabus_body="<p>Labs</p>")
+    db_session.add(course)
+    db_session.flush()
+    for i in range(3):
+        db_session.add(
+            Assignment(canvas_assignment_id=10 + i, course_id=course.id, name=f"Homework {i}")
+        )
+    db_session.commit()
+
+
+class TestMockChatModel:
+    """Test latency distributions, streaming pace and fault injection"""
+
+    def test_seed_makes_latencies_reproducible(self):
+        first = MockChatModel(latency_ms=100, distribution="lognormal", seed=7)
+        second = MockChatModel(latency_ms=100, distribution="lognormal", seed=7)
+        assert [first.sample_latency() for _ in range(20)] == [
+            second.sample_latency() for _ in range(20)
+        ]
+
+    def test_distributions(self):
+        fixed = MockChatModel(latency_ms=200, distribution="fixed")
+        assert fixed.sample_latency() == 0.2
+
+        uniform = MockChatModel(latency_ms=5000, distribution="uniform", spread=0.6, seed=1)
+        samples = [uniform.sample_latency() for _ in range(500)]
+        assert 2.0 <= min(samples) and max(samples) <= 8.0
+
+        lognormal = MockChatModel(latency_ms=100, distribution="lognormal", spread=0.5, seed=1)
+        samples = [lognormal.sample_latency() for _ in range(2000)]
+        assert statistics.median(samples) == pytest.approx(0.1, rel=0.1)
+        assert max(samples) > 0.2
+
+        with pytest.raises(ValueError):
+            MockChatModel(distribution="pareto")
+
+    def test_invoke_waits_and_echoes_reply(self):
+        model = MockChatModel(latency_ms=30)
+        started = time.perf_counter()
+        assert model.invoke(["prompt", {"a": 1}]).content == {"a": 1}
+        assert time.perf_counter() - started >= 0.025
+
+    def test_stream_is_paced(self):
+        model = MockChatModel(tokens_per_second=200)
+        started = time.perf_counter()
+        chunks = [c.content for c in model.stream(["prompt", "one two three four five six"])]
+        assert chunks == ["one two three ", "four five six"]
+        assert time.perf_counter() - started >= 0.025
+
+    def test_fault_injection(self):
+        with pytest.raises(MockRateLimitError) as exc_info:
+            MockChatModel(rate_limit_rate=1.0).invoke(["prompt", "reply"])
+        assert exc_info.value.status_code == 429
+        with pytest.raises(MockLLMError):
+            MockChatModel(error_rate=1.0).invoke(["prompt", "reply"])
+
+        model = MockChatModel(error_rate=0.3, seed=3)
+        outcomes = []
+        for _ in range(200):
+            try:
+                model.invoke(["prompt", "reply"])
+                outcomes.append(True)
+            except MockLLMError:
+                outcomes.append(False)
+        assert 0.2 < outcomes.count(False) / len(outcomes) < 0.4
+
+
+class TestMockServiceFailures:
+    """Injected failures surface the same way as in the real service"""
+
+    def test_errors_are_reported_and_not_cached(self, db_session):
+        _seed_course(db_session)
+        service = MockCanvasLLMService(db_session, llm=MockChatModel(error_rate=1.0))
+
+        assert service.summarize_syllabus(1)["summary"].startswith("Analysis failed")
+        assert "error" in service.analyze_assignment(10)
+        assert "error" in service.ask_question(1, "When is the exam?")
+        events = list(service.stream_answer(1, "When is the exam?"))
+        assert [e["event"] for e in events] == ["error"]
+
+        results = list(service.analyze_course_assignments(1))
+        assert results[-1]["failed"] == 3 and results[-1]["analyzed"] == 0
+
+        healthy = MockCanvasLLMService(db_session, llm=MockChatModel())
+        assert healthy.summarize_syllabus(1)["cached"] is False
+
+    def test_study_plan_keeps_default_tips_on_failure(self, db_session):
+        service = MockCanvasLLMService(db_session, llm=MockChatModel(rate_limit_rate=1.0))
+        assert service.generate_study_plan(1)["study_plan"] == []
+
+
+class TestBackendSelection:
+    """Test the per-route mock/real setting"""
+
+    def test_parse_route_backends(self):
+        assert parse_route_backends("") == {}
+        assert parse_route_backends(" ask=REAL , study_plan=mock") == {
+            "ask": "real",
+            "study_plan": "mock",
+        }
+        with pytest.raises(ValueError):
+            parse_route_backends("chat=real")
+        with pytest.raises(ValueError):
+            parse_route_backends("ask")
+
+    def test_overrides_default(self, monkeypatch, db_session):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "llm_backend", "mock")
+        monkeypatch.setattr(settings, "llm_backend_routes", "ask=real")
+        assert llm_backend("syllabus") == "mock"
+        assert llm_backend("ask") == "real"
+        assert isinstance(llm_service_for("syllabus")(db_session), MockCanvasLLMService)
+
+        monkeypatch.setattr(settings, "llm_backend", "fake")
+        with pytest.raises(ValueError):
+            llm_backend("syllabus")
+        with pytest.raises(ValueError):
+            llm_service_for("unknown")
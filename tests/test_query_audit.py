@@ -0,0 +1,135 @@
+"""
+Tests for per-request and per-job SQL statement auditing and N+1 detection
+"""
+
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.config import get_settings
+from backend.db.query_audit import NPlusOneError, audit_queries, statement_shape
+from backend.main import audit_request_queries
+from backend.models import Course, Job
+from backend.services import job_queue
+from backend.services.job_handlers import JOB_HANDLERS
+from backend.services.job_queue import JobQueue
+
+
+def _seed(db_session, count=5):
+    db_session.add_all(
+        [Course(id=i, canvas_course_id=100 + i, name=f"C{i}") for i in range(1, count + 1)]
+    )
+    db_session.commit()
+
+
+def _load_one_by_one(db_session, count=5):
+    return [db_session.get(Course, i, populate_existing=True).name for i in range(1, count + 1)]
+
+
+class TestStatementShape:
+    """Test that statements differing only in parameters share a shape"""
+
+    def test_collapses_whitespace_and_parameter_lists(self):
+        assert statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == (
+            "SELECT * FROM t WHERE id IN (?)"
+        )
+        assert statement_shape("SELECT * FROM t WHERE id IN (%(id_1)s, %(id_2)s)") == (
+            "SELECT * FROM t WHERE id IN (?)"
+        )
+
+    def test_collapses_multi_row_values(self):
+        assert statement_shape("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == (
+            "INSERT INTO t (a, b) VALUES (?)"
+        )
+
+
+class TestQueryAudit:
+    """Test counting and the warn/raise modes"""
+
+    def test_counts_statements_and_time(self, db_session):
+        _seed(db_session)
+        with audit_queries("count", mode="raise") as audit:
+            db_session.execute(select(Course)).all()
+            db_session.execute(select(Course.name)).all()
+        assert audit.count == 2
+        assert audit.total_ms > 0
+        assert audit.repeated() == []
+
+    def test_repeated_shape_raises(self, db_session):
+        _seed(db_session)
+        with pytest.raises(NPlusOneError, match="ran 5 times"):
+            with audit_queries("loop", mode="raise", threshold=3):
+                _load_one_by_one(db_session)
+
+    def test_repeated_shape_warns(self, db_session, caplog):
+        _seed(db_session)
+        with caplog.at_level(logging.WARNING, logger="backend.db.query_audit"):
+            with audit_queries("loop", mode="warn", threshold=3) as audit:
+                _load_one_by_one(db_session)
+        assert "Possible N+1 in loop" in caplog.text
+        assert audit.summary()["repeated"][0]["count"] == 5
+
+    def test_off_mode_and_no_audit_are_silent(self, db_session):
+        _seed(db_session)
+        with audit_queries("loop", mode="off", threshold=3) as audit:
+            _load_one_by_one(db_session)
+        assert audit.count == 5
+        # Outside any audit nothing is recorded
+        _load_one_by_one(db_session)
+        assert audit.count == 5
+
+
+class TestRequestAndJobAudit:
+    """Test the HTTP middleware and the job wrapper"""
+
+    @staticmethod
+    def _client(db_session):
+        app = FastAPI()
+        app.middleware("http")(audit_request_queries)
+
+        def get_db():
+            return db_session
+
+        @app.get("/courses")
+        def courses(n_plus_one: bool = False, db: Session = Depends(get_db)):
+            if n_plus_one:
+                return _load_one_by_one(db)
+            return [c.name for c in db.execute(select(Course)).scalars()]
+
+        return TestClient(app)
+
+    def test_dev_header_reports_counts(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "query_audit_header", True)
+        _seed(db_session)
+        response = self._client(db_session).get("/courses")
+
+        assert response.json() == ["C1", "C2", "C3", "C4", "C5"]
+        assert response.headers["X-DB-Queries"] == "1"
+        assert float(response.headers["X-DB-Time-Ms"]) >= 0
+
+    def test_n_plus_one_request_fails_in_tests(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "query_audit_repeat_threshold", 3)
+        _seed(db_session)
+        client = self._client(db_session)
+
+        assert "X-DB-Queries" not in client.get("/courses").headers
+        with pytest.raises(NPlusOneError, match="GET /courses"):
+            client.get("/courses", params={"n_plus_one": True})
+
+    def test_n_plus_one_job_fails(self, db_session, monkeypatch):
+        monkeypatch.setattr(get_settings(), "query_audit_repeat_threshold", 3)
+        monkeypatch.setitem(
+            JOB_HANDLERS, "load_courses", lambda db: {"names": _load_one_by_one(db)}
+        )
+        _seed(db_session)
+        job = JobQueue(db_session).enqueue("load_courses")
+
+        with pytest.raises(NPlusOneError, match="job load_courses"):
+            job_queue._execute(db_session, job)
+        stored = db_session.get(Job, job.id)
+        assert stored.status == "failed"
+        assert "Possible N+1" in stored.error_message
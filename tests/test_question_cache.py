@@ -0,0 +1,67 @@
+"""
+Tests for the repeated-question answer cache
+"""
+
+from backend.services.mock_llm_service import MockCanvasLLMService
+from backend.services.question_cache import QuestionCache, normalize_question
+
+
+class TestQuestionCache:
+    """Test normalization, near-duplicate matching, scoping and invalidation"""
+
+    def test_normalize_question(self):
+        assert normalize_question("When's the MIDTERM?!") == "when is the midterm"
+        assert normalize_question("What’s due  this week") == "what is due this week"
+
+    def test_near_duplicate_hits(self, db_session):
+        cache = QuestionCache(db_session)
+        cache.set(1, 10, "mock", "When is the midterm exam?", "October 30th.")
+
+        hit = cache.get(1, 10, "mock", "when's the midterm exam")
+        assert hit["answer"] == "October 30th."
+        assert hit["similarity"] == 1.0
+
+        near = cache.get(1, 10, "mock", "When is the midterm exam again?")
+        assert near["answer"] == "October 30th."
+        assert near["similarity"] < 1.0
+
+        assert cache.get(1, 10, "mock", "When is the final project due?") is None
+
+    def test_different_numbers_do_not_match(self, db_session):
+        cache = QuestionCache(db_session)
+        cache.set(1, 10, "mock", "What is due in week 3?", "Lab 3.")
+        assert cache.get(1, 10, "mock", "What is due in week 4?") is None
+
+    def test_scoped_per_user_course_and_model(self, db_session):
+        cache = QuestionCache(db_session)
+        cache.set(1, 10, "mock", "When is the midterm?", "Soon.")
+        assert cache.get(2, 10, "mock", "When is the midterm?") is None
+        assert cache.get(1, 20, "mock", "When is the midterm?") is None
+        assert cache.get(1, None, "mock", "When is the midterm?") is None
+        assert cache.get(1, 10, "gpt-4o-mini", "When is the midterm?") is None
+
+    def test_invalidate_course(self, db_session):
+        cache = QuestionCache(db_session)
+        cache.set(1, 10, "mock", "When is the midterm?", "Soon.")
+        cache.set(1, 20, "mock", "When is the midterm?", "Later.")
+        cache.set(1, None, "mock", "What is due this week?", "Two labs.")
+        cache.set(2, 10, "mock", "When is the midterm?", "Soon.")
+        cache.set(2, None, "mock", "What is due this week?", "One essay.")
+
+        assert cache.invalidate_course(10, user_id=1) == 3
+        db_session.commit()
+        assert cache.get(1, 10, "mock", "When is the midterm?") is None
+        assert cache.get(2, 10, "mock", "When is the midterm?") is None
+        assert cache.get(1, None, "mock", "What is due this week?") is None
+        assert cache.get(1, 20, "mock", "When is the midterm?")["answer"] == "Later."
+        # Another user's course-less answers survive this user's sync
+        assert cache.get(2, None, "mock", "What is due this week?")["answer"] == "One essay."
+
+    def test_service_serves_repeats_from_cache(self, db_session):
+        service = MockCanvasLLMService(db_session)
+        assert service.ask_question(1, "What is due this week?")["cached"] is False
+        assert service.ask_question(1, "what's due this week")["cached"] is True
+
+        events = list(service.stream_answer(1, "What is due this week?"))
+        assert [e["event"] for e in events] == ["token", "done"]
+        assert events[-1]["data"]["cached"] is True
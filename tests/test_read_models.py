@@ -0,0 +1,124 @@
+"""
+Tests for the lean read models, with a memory and throughput comparison to ORM entities
+"""
+
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import contains_eager
+
+from backend.models import Assignment, Course
+from backend.services.ai_service import CanvasAIService
+from backend.services.read_models import load_assignment, load_assignments, select_assignments
+
+NOW = datetime.now(timezone.utc)
+
+
+def _seed(db_session, count=6, courses=2):
+    for course_id in range(1, courses + 1):
+        db_session.add(Course(id=course_id, canvas_course_id=100 + course_id, name=f"C{course_id}"))
+    for i in range(count):
+        db_session.add(
+            Assignment(
+                canvas_assignment_id=i + 1,
+                course_id=i % courses + 1,
+                name=f"Assignment {i + 1}",
+                description="<p>Read <b>chapter</b> 3.</p>",
+                due_at=NOW + timedelta(days=i - 2, hours=1),
+                points_possible=float(10 * i) if i % 3 else None,
+                workflow_state="published",
+                submission_types="online_upload",
+            )
+        )
+    db_session.commit()
+
+
+class TestReadModels:
+    """Test row loading and the services that read through it"""
+
+    def test_rows_share_courses_and_are_timezone_aware(self, db_session):
+        _seed(db_session)
+        rows = load_assignments(db_session, select_assignments().order_by(Assignment.id))
+
+        assert [r.canvas_assignment_id for r in rows] == [1, 2, 3, 4, 5, 6]
+        assert rows[0].course is rows[2].course
+        assert rows[1].course.name == "C2"
+        assert rows[0].due_at.tzinfo is not None
+        assert rows[0].description_text is None
+        assert rows[0]._fields[-2:] == ("course", "description_text")
+        assert rows[5].points_possible == 50.0 and rows[0].points_possible is None
+
+    def test_text_is_loaded_on_request(self, db_session):
+        _seed(db_session)
+        row = load_assignment(db_session, Assignment.canvas_assignment_id == 2, with_text=True)
+        assert row.description_text == "Read chapter 3."
+        assert load_assignment(db_session, Assignment.canvas_assignment_id == 99) is None
+
+    def test_ai_service_reads_rows(self, db_session):
+        _seed(db_session)
+        service = CanvasAIService(db_session)
+
+        upcoming = service.get_upcoming_deadlines(1, days_ahead=7)
+        assert [d["assignment_id"] for d in upcoming] == [3, 4, 5, 6]
+        assert upcoming[0]["urgency"] == "high"
+        assert upcoming[0]["submission_types"] == ["online_upload"]
+        assert [o["assignment_id"] for o in service.get_overdue_assignments(1)] == [2, 1]
+        workload = service.get_course_workload_analysis(1)
+        assert [(w["course_id"], w["assignment_count"]) for w in workload] == [(101, 2), (102, 2)]
+
+    def test_matches_snapshot(self, db_session):
+        pytest.importorskip("numpy")
+        from backend.services.assignment_snapshot import AssignmentSnapshot
+
+        _seed(db_session, count=40, courses=3)
+        service = CanvasAIService(db_session)
+        snapshot = AssignmentSnapshot.build(db_session)
+        now = datetime.now(timezone.utc)
+
+        assert service.get_upcoming_deadlines(1, 14) == snapshot.upcoming_deadlines(now, 14)
+        assert service.get_overdue_assignments(1) == snapshot.overdue_assignments(now)
+        assert service.get_course_workload_analysis(1) == snapshot.course_workload(now)
+
+
+@pytest.mark.benchmark
+class TestReadModelBenchmark:
+    """Compare rows to ORM entities for the deadline query"""
+
+    @staticmethod
+    def _measure(load):
+        """Best of three timings, then peak memory of one traced run."""
+        elapsed = []
+        for _ in range(3):
+            started = time.perf_counter()
+            load()
+            elapsed.append(time.perf_counter() - started)
+        tracemalloc.start()
+        result = load()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return result, min(elapsed), peak
+
+    def test_rows_are_faster_and_smaller_than_entities(self, db_session):
+        _seed(db_session, count=3000, courses=10)
+
+        def orm():
+            db_session.expunge_all()
+            return (
+                db_session.query(Assignment)
+                .join(Course)
+                .options(contains_eager(Assignment.course))
+                .order_by(Assignment.due_at)
+                .all()
+            )
+
+        def rows():
+            return load_assignments(db_session, select_assignments().order_by(Assignment.due_at))
+
+        entities, orm_seconds, orm_peak = self._measure(orm)
+        tuples, row_seconds, row_peak = self._measure(rows)
+
+        assert len(tuples) == len(entities) == 3000
+        assert row_seconds < orm_seconds
+        assert row_peak < orm_peak / 2
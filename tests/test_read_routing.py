@@ -0,0 +1,125 @@
+"""
+Tests for read-replica routing with read-your-writes after a sync, using two SQLite files
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import backend.models  # noqa: F401  (register all tables on Base.metadata)
+from backend.config import Settings
+from backend.db.base import Base
+from backend.db.routing import ReadOnlySessionError, ReadRouter
+from backend.db.session import create_db_engine
+from backend.models import Course, SyncRun, User
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """Primary and replica SQLite files with the same schema."""
+    engines = [
+        create_db_engine(f"sqlite:///{tmp_path / name}", Settings())
+        for name in ("primary.db", "replica.db")
+    ]
+    factories = []
+    for engine in engines:
+        Base.metadata.create_all(engine)
+        factories.append(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    yield factories
+    for engine in engines:
+        engine.dispose()
+
+
+def _write(factory, *rows):
+    with factory() as session:
+        session.add_all(rows)
+        session.commit()
+
+
+def _sync(user_id, sync_id):
+    return SyncRun(
+        id=sync_id,
+        user_id=user_id,
+        sync_type="full",
+        status="completed",
+        completed_at=datetime.now(timezone.utc),
+    )
+
+
+def _database_of(session):
+    return session.get_bind().url.database.rsplit("/", 1)[-1]
+
+
+class TestReadRouter:
+    """Test replica selection, fallback and the read-only guard"""
+
+    def test_without_replica_reads_primary(self, databases):
+        primary, _ = databases
+        with ReadRouter(primary).session() as session:
+            assert _database_of(session) == "primary.db"
+
+    def test_replica_used_once_it_has_the_latest_sync(self, databases):
+        primary, replica = databases
+        router = ReadRouter(primary, replica)
+        user = User(id=1, canvas_user_id=1, name="Student")
+        _write(primary, user, _sync(1, 1))
+        _write(replica, User(id=1, canvas_user_id=1, name="Student"), _sync(1, 1))
+
+        with router.session() as session:
+            assert _database_of(session) == "replica.db"
+
+        # A sync finishes on the primary; the replica has not replayed it yet
+        _write(primary, Course(canvas_course_id=5, name="New course"), _sync(1, 2))
+        router.sync_finished()
+        with router.session() as session:
+            assert _database_of(session) == "primary.db"
+            assert session.query(Course).count() == 1
+
+        # Replica catches up
+        _write(replica, Course(canvas_course_id=5, name="New course"), _sync(1, 2))
+        with router.session() as session:
+            assert _database_of(session) == "replica.db"
+
+        assert router.stats()["reads"] == {
+            "replica": 2,
+            "primary_lagging": 1,
+            "replica_unavailable": 0,
+        }
+
+    def test_primary_sync_id_is_cached_until_a_sync_finishes(self, databases):
+        primary, replica = databases
+        router = ReadRouter(primary, replica, sync_ttl_seconds=60)
+        _write(primary, _sync(1, 1))
+        _write(replica, _sync(1, 1))
+        with router.session() as session:
+            assert _database_of(session) == "replica.db"
+
+        # Within the TTL the primary is not asked again
+        _write(primary, _sync(1, 2))
+        with router.session() as session:
+            assert _database_of(session) == "replica.db"
+
+        router.sync_finished()
+        with router.session() as session:
+            assert _database_of(session) == "primary.db"
+
+        expired = ReadRouter(primary, replica, sync_ttl_seconds=0)
+        with expired.session() as session:
+            assert _database_of(session) == "primary.db"
+
+    def test_broken_replica_falls_back_to_primary(self, databases, tmp_path):
+        primary, _ = databases
+        empty = create_db_engine(f"sqlite:///{tmp_path / 'empty.db'}", Settings())
+        router = ReadRouter(primary, sessionmaker(bind=empty))
+        with router.session() as session:
+            assert _database_of(session) == "primary.db"
+        assert router.stats()["reads"]["replica_unavailable"] == 1
+        empty.dispose()
+
+    def test_read_sessions_reject_writes(self, databases):
+        primary, _ = databases
+        with ReadRouter(primary).session() as session:
+            session.add(Course(canvas_course_id=9, name="Oops"))
+            with pytest.raises(ReadOnlySessionError):
+                session.commit()
@@ -0,0 +1,200 @@
+"""
+Tests for the dashboard response cache and its sync-generation invalidation
+"""
+
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import backend.models  # noqa: F401  (register all tables on Base.metadata)
+from backend.config import Settings
+from backend.db.base import Base
+from backend.db.routing import ReadRouter
+from backend.db.session import create_db_engine
+from backend.services.response_cache import MISSING, LRUCache, RedisTier, ResponseCache
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# A worker process finishing a sync against the shared database
+FINISH_SYNC = """
+import sys
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from backend.models import SyncRun
+with Session(create_engine(sys.argv[1])) as session:
+    session.add(
+        SyncRun(user_id=1, sync_type="full", status="completed",
+                completed_at=datetime.now(timezone.utc))
+    )
+    session.commit()
+"""
+
+
+class FakeRedis:
+    """The slice of the redis client the cache uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise ConnectionError("redis down")
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def incr(self, key):
+        self._check()
+        self.values[key] = str(int(self.values.get(key, 0)) + 1).encode()
+        return int(self.values[key])
+
+
+def _counting(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+
+    return compute, calls
+
+
+class TestLRUCache:
+    """Test eviction and expiry of the in-process tier"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get("b") is MISSING
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_entries=10, ttl_seconds=0)
+        cache.set("a", 1)
+        assert cache.get("a") is MISSING
+
+
+class TestResponseCache:
+    """Test keys, hits and invalidation on sync"""
+
+    def test_hits_until_generation_bumps(self):
+        cache = ResponseCache(LRUCache(100, 60))
+        compute, calls = _counting({"due": datetime(2026, 10, 20, tzinfo=timezone.utc)})
+
+        first = cache.get_or_compute("ai_deadlines", 1, {"days_ahead": 7}, compute)
+        second = cache.get_or_compute("ai_deadlines", 1, {"days_ahead": 7}, compute)
+        assert first == second == {"due": "2026-10-20T00:00:00+00:00"}
+        assert len(calls) == 1
+
+        cache.bump_generation()
+        cache.get_or_compute("ai_deadlines", 1, {"days_ahead": 7}, compute)
+        assert len(calls) == 2
+        assert cache.stats()["local_hits"] == 1
+
+    def test_keys_separate_users_and_params(self):
+        cache = ResponseCache(LRUCache(100, 60))
+        compute, calls = _counting({})
+        cache.get_or_compute("ai_deadlines", 1, {"days_ahead": 7}, compute)
+        cache.get_or_compute("ai_deadlines", 2, {"days_ahead": 7}, compute)
+        cache.get_or_compute("ai_deadlines", 1, {"days_ahead": 14}, compute)
+        cache.get_or_compute("ai_workload", 1, {"days_ahead": 7}, compute)
+        assert len(calls) == 4
+
+    def test_disabled_always_computes(self):
+        cache = ResponseCache(LRUCache(100, 60), enabled=False)
+        compute, calls = _counting({})
+        cache.get_or_compute("metrics", None, {}, compute)
+        cache.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 2
+
+    def test_redis_shares_results_and_generation_between_processes(self):
+        redis = FakeRedis()
+        api = ResponseCache(LRUCache(100, 60), RedisTier(redis))
+        worker = ResponseCache(LRUCache(100, 60), RedisTier(redis))
+        compute, calls = _counting({"count": 3})
+
+        api.get_or_compute("metrics", None, {}, compute)
+        other = ResponseCache(LRUCache(100, 60), RedisTier(redis))
+        assert other.get_or_compute("metrics", None, {}, compute) == {"count": 3}
+        assert other.stats()["remote_hits"] == 1
+
+        # A sync in the worker invalidates the API's in-process entries too
+        worker.bump_generation()
+        api.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 2
+
+    def test_redis_outage_falls_back_to_local_tier(self):
+        redis = FakeRedis()
+        cache = ResponseCache(LRUCache(100, 60), RedisTier(redis))
+        compute, calls = _counting({"count": 1})
+        redis.fail = True
+
+        assert cache.get_or_compute("metrics", None, {}, compute) == {"count": 1}
+        assert cache.get_or_compute("metrics", None, {}, compute) == {"count": 1}
+        assert len(calls) == 1
+        assert cache.stats()["redis"] is False
+
+        cache.bump_generation()
+        cache.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 2
+
+    def test_against_fakeredis(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        cache = ResponseCache(LRUCache(100, 60), RedisTier(fakeredis.FakeRedis()))
+        compute, calls = _counting({"count": 2})
+        cache.get_or_compute("metrics", None, {}, compute)
+        cache.local.clear()
+        assert cache.get_or_compute("metrics", None, {}, compute) == {"count": 2}
+        cache.bump_generation()
+        cache.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 2
+
+    def test_sync_in_another_process_invalidates_without_redis(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'shared.db'}"
+        engine = create_db_engine(url, Settings())
+        Base.metadata.create_all(engine)
+        router = ReadRouter(sessionmaker(bind=engine), sync_ttl_seconds=0)
+        api = ResponseCache(LRUCache(100, 60), sync_generation=router.primary_latest_sync)
+        compute, calls = _counting({"count": 1})
+
+        api.get_or_compute("metrics", None, {}, compute)
+        api.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 1
+
+        # Fixed script run by this interpreter; no untrusted input
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", FINISH_SYNC, url],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        assert result.returncode == 0, result.stderr[-2000:]
+
+        api.get_or_compute("metrics", None, {}, compute)
+        assert len(calls) == 2
+        assert api.generation() == "s1.l0"
+        engine.dispose()
+
+    def test_unreadable_sync_generation_falls_back_to_local(self):
+        def broken():
+            raise RuntimeError("database down")
+
+        cache = ResponseCache(LRUCache(100, 60), sync_generation=broken)
+        assert cache.generation() == "l0"
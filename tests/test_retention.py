@@ -0,0 +1,134 @@
+"""
+Tests for history table retention
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+from backend.config import Settings
+from backend.models import NotificationLog, SchedulerJobRun, SyncRun, User
+from backend.services.job_handlers import JOB_HANDLERS
+from backend.services.retention import RetentionService, month_starts, partition_upper_bound
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _seed(db_session, sync_ages_days, notification_ages_days):
+    db_session.add(User(id=1, canvas_user_id=1, name="Student"))
+    for age in sync_ages_days:
+        db_session.add(
+            SyncRun(
+                user_id=1,
+                sync_type="full",
+                status="completed",
+                started_at=NOW - timedelta(days=age),
+                completed_at=NOW - timedelta(days=age),
+            )
+        )
+    for age in notification_ages_days:
+        db_session.add(
+            NotificationLog(
+                user_id=1,
+                notification_type="24h_deadline",
+                title=f"Due ({age}d)",
+                message="Due soon",
+                sent_at=NOW - timedelta(days=age),
+            )
+        )
+    db_session.commit()
+
+
+class TestRetentionService:
+    """Test windows, batching, archival and the time budget"""
+
+    def test_prunes_old_rows_in_batches(self, db_session):
+        _seed(db_session, [40, 35, 31, 32, 33, 1], [100, 95, 10])
+        settings = Settings(retention_batch_size=2)
+
+        result = RetentionService(db_session, settings, now=NOW).run()
+
+        assert result["rows_removed"] == 7
+        assert result["tables"]["sync_runs"]["deleted"] == 5
+        assert result["tables"]["sync_runs"]["batches"] == 3
+        assert result["tables"]["notification_logs"]["deleted"] == 2
+        assert db_session.query(SyncRun).count() == 1
+        assert [n.title for n in db_session.query(NotificationLog)] == ["Due (10d)"]
+
+    def test_prunes_scheduler_job_runs(self, db_session):
+        db_session.add_all(
+            [
+                SchedulerJobRun(
+                    job_id="daily_sync",
+                    job_key="daily_sync",
+                    outcome="success",
+                    finished_at=NOW - timedelta(days=age),
+                )
+                for age in (30, 20, 3)
+            ]
+        )
+        db_session.commit()
+        # The window never drops below the week /scheduler/status reports on
+        settings = Settings(retention_scheduler_job_runs_days=1)
+
+        result = RetentionService(db_session, settings, now=NOW).run()
+
+        assert result["tables"]["scheduler_job_runs"]["deleted"] == 2
+        assert db_session.query(SchedulerJobRun).count() == 1
+
+    def test_window_never_drops_below_dedup_lookback(self, db_session):
+        _seed(db_session, [], [2, 5])
+        settings = Settings(retention_notification_logs_days=1)
+        result = RetentionService(db_session, settings, now=NOW).run()
+        assert result["tables"]["notification_logs"]["deleted"] == 1
+        assert [n.title for n in db_session.query(NotificationLog)] == ["Due (2d)"]
+
+    def test_zero_days_keeps_everything(self, db_session):
+        _seed(db_session, [400], [])
+        settings = Settings(retention_sync_runs_days=0)
+        result = RetentionService(db_session, settings, now=NOW).run()
+        assert result["tables"]["sync_runs"] == {"skipped": True}
+        assert db_session.query(SyncRun).count() == 1
+
+    def test_archives_before_deleting(self, db_session, tmp_path):
+        _seed(db_session, [60, 45], [])
+        settings = Settings(retention_archive_dir=str(tmp_path), retention_batch_size=1)
+        result = RetentionService(db_session, settings, now=NOW).run()
+
+        assert result["tables"]["sync_runs"]["archived"] == 2
+        (archive,) = tmp_path.glob("sync_runs-*.jsonl.gz")
+        with gzip.open(archive, "rt", encoding="utf-8") as handle:
+            records = [json.loads(line) for line in handle]
+        assert [r["sync_type"] for r in records] == ["full", "full"]
+        assert records[0]["started_at"].startswith("2026-08-20")
+
+    def test_time_budget_defers_work(self, db_session):
+        _seed(db_session, [40], [])
+        settings = Settings(retention_max_seconds=0)
+        result = RetentionService(db_session, settings, now=NOW).run()
+        assert result["tables"]["sync_runs"]["complete"] is False
+        assert db_session.query(SyncRun).count() == 1
+
+    def test_job_handler_reports(self, db_session):
+        _seed(db_session, [400], [])
+        result = JOB_HANDLERS["retention"](db_session)
+        assert result["rows_removed"] == 1
+        assert "duration_ms" in result
+
+
+class TestPartitionHelpers:
+    """Test the Postgres partition bound parsing and monthly ranges"""
+
+    def test_partition_upper_bound(self):
+        bound = "FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2026-02-01 00:00:00+00')"
+        assert partition_upper_bound(bound) == datetime(2026, 2, 1, tzinfo=timezone.utc)
+        assert partition_upper_bound("DEFAULT") is None
+
+    def test_month_starts(self):
+        months = month_starts(datetime(2026, 11, 30, tzinfo=timezone.utc), 2)
+        assert [m.strftime("%Y-%m-%d") for m in months] == [
+            "2026-11-01",
+            "2026-12-01",
+            "2027-01-01",
+            "2027-02-01",
+        ]
@@ -0,0 +1,153 @@
+"""
+Unit tests for per-user sync scheduling in the scheduler service
+"""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_SUBMITTED,
+)
+from sqlalchemy.orm import sessionmaker
+
+from backend.models import SchedulerJobRun, User
+from backend.services import scheduler_service
+from backend.services.job_history import JobRunRecorder, load_job_runs, summarize_runs
+from backend.services.scheduler_service import CanvasSchedulerService, sync_offset_seconds
+
+
+class TestSyncOffsets:
+    """Test the deterministic hash-based sync offsets"""
+
+    def test_offset_is_deterministic_and_in_window(self):
+        for user_id in range(1, 200):
+            offset = sync_offset_seconds(user_id, 3600)
+            assert 0 <= offset < 3600
+            assert offset == sync_offset_seconds(user_id, 3600)
+
+    def test_offsets_spread_across_window(self):
+        offsets = [sync_offset_seconds(user_id, 3600) for user_id in range(1, 1001)]
+        # Every 10-minute bucket of the hour should receive a share of the users
+        buckets = [0] * 6
+        for offset in offsets:
+            buckets[offset // 600] += 1
+        assert min(buckets) > 100
+
+    def test_zero_window_runs_immediately(self):
+        assert sync_offset_seconds(42, 0) == 0
+
+
+class TestPlanUserSyncs:
+    """Test that scheduled syncs fan out to every active user"""
+
+    @pytest.fixture
+    def service(self, db_engine, monkeypatch):
+        monkeypatch.setattr(
+            scheduler_service, "SessionLocal", sessionmaker(bind=db_engine, autoflush=False)
+        )
+        service = CanvasSchedulerService(max_processes=1)
+        yield service
+        service.shutdown()
+
+    def test_plans_one_job_per_active_user(self, service, db_session):
+        db_session.add_all(
+            [
+                User(canvas_user_id=101, is_active=True),
+                User(canvas_user_id=102, is_active=True),
+                User(canvas_user_id=103, is_active=False),
+            ]
+        )
+        db_session.commit()
+
+        before = datetime.now(timezone.utc)
+        service._plan_user_syncs("full_sync")
+
+        jobs = {job.id: job for job in service.scheduler.get_jobs()}
+        assert set(jobs) == {"full_sync_user_1", "full_sync_user_2"}
+        for user_id in (1, 2):
+            job = jobs[f"full_sync_user_{user_id}"]
+            assert job.kwargs == {"user_id": user_id}
+            assert job.executor == "sync"
+            window_end = before + timedelta(minutes=service.settings.sync_window_minutes, seconds=5)
+            assert before <= job.next_run_time <= window_end
+
+
+class TestJobRunHistory:
+    """Test the APScheduler run-history listener"""
+
+    @staticmethod
+    def _event(code, job_id, exception=None):
+        return SimpleNamespace(code=code, job_id=job_id, exception=exception)
+
+    def test_records_duration_outcome_and_errors(self):
+        recorder = JobRunRecorder(size=10)
+        recorder(self._event(EVENT_JOB_SUBMITTED, "full_sync_user_1"))
+        assert recorder.running() == {"full_sync_user_1": 1}
+        recorder(self._event(EVENT_JOB_EXECUTED, "full_sync_user_1"))
+        recorder(self._event(EVENT_JOB_SUBMITTED, "full_sync_user_2"))
+        recorder(self._event(EVENT_JOB_ERROR, "full_sync_user_2", RuntimeError("boom")))
+        recorder(self._event(EVENT_JOB_MAX_INSTANCES, "deadline_notifications"))
+
+        summary = recorder.summary()
+        assert summary["full_sync"]["runs"] == 2
+        assert summary["full_sync"]["errors"] == 1
+        assert summary["full_sync"]["p95_ms"] is not None
+        assert "boom" in summary["full_sync"]["last_error"]["exception"]
+        assert summary["deadline_notifications"]["overlaps"] == 1
+        assert recorder.running() == {}
+
+    def test_ring_buffer_is_bounded(self):
+        recorder = JobRunRecorder(size=3)
+        for _ in range(10):
+            recorder(self._event(EVENT_JOB_SUBMITTED, "daily_sync"))
+            recorder(self._event(EVENT_JOB_EXECUTED, "daily_sync"))
+        assert len(recorder.runs()) == 3
+
+    def test_queue_dispatch_successes_are_not_persisted(self, monkeypatch):
+        recorder = JobRunRecorder(size=10, persist=True)
+        saved = []
+        monkeypatch.setattr(recorder, "_save", lambda run, *args: saved.append(run["outcome"]))
+        recorder(self._event(EVENT_JOB_SUBMITTED, "queue_dispatch"))
+        recorder(self._event(EVENT_JOB_EXECUTED, "queue_dispatch"))
+        recorder(self._event(EVENT_JOB_SUBMITTED, "queue_dispatch"))
+        recorder(self._event(EVENT_JOB_ERROR, "queue_dispatch", RuntimeError("db down")))
+
+        assert saved == ["error"]
+        assert recorder.summary()["queue_dispatch"]["runs"] == 2
+
+    def test_persisted_history_is_limited_per_job(self, db_session):
+        now = datetime.now(timezone.utc)
+        db_session.add_all(
+            [
+                SchedulerJobRun(job_id=job_id, job_key=job_id, outcome="success", finished_at=now)
+                for job_id in ["daily_sync"] * 2 + ["deadline_notifications"] * 10
+            ]
+        )
+        db_session.commit()
+
+        runs = load_job_runs(db_session, limit_per_job=3)
+        assert (
+            sorted(run["job_key"] for run in runs)
+            == ["daily_sync"] * 2 + ["deadline_notifications"] * 3
+        )
+
+    def test_percentiles(self):
+        runs = [
+            {
+                "job_key": "daily_sync",
+                "outcome": "success",
+                "duration_ms": float(ms),
+                "overlapped": False,
+                "finished_at": None,
+                "exception": None,
+            }
+            for ms in range(1, 101)
+        ]
+        summary = summarize_runs(runs)["daily_sync"]
+        assert summary["p50_ms"] == 50.0
+        assert summary["p95_ms"] == 95.0
+        assert summary["max_ms"] == 100.0
@@ -0,0 +1,98 @@
+"""
+Tests for the local BM25 search index over course content
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.models import Assignment, Course, SearchPassage, SearchPosting
+from backend.services.search_index import SearchIndex, tokenize
+
+
+class TestSearchIndex:
+    """Test indexing, incremental re-indexing and retrieval"""
+
+    @pytest.fixture
+    def index(self, db_session):
+        chemistry = Course(
+            canvas_course_id=10,
+            name="Chemistry",
+            syllabus_body="<h2>Grading</h2><p>Midterm exam 30%, final exam 40%.</p>"
+            "<p>Lab reports are due every Friday.</p>",
+        )
+        history = Course(canvas_course_id=20, name="History", syllabus_body="<p>Essays weekly.</p>")
+        db_session.add_all([chemistry, history])
+        db_session.flush()
+        db_session.add_all(
+            [
+                Assignment(
+                    canvas_assignment_id=100,
+                    course_id=chemistry.id,
+                    name="Titration Lab",
+                    description="<p>Measure the acid concentration by titration.</p>",
+                    due_at=datetime(2026, 11, 2, tzinfo=timezone.utc),
+                    points_possible=20,
+                ),
+                Assignment(
+                    canvas_assignment_id=200,
+                    course_id=history.id,
+                    name="Midterm Essay",
+                    description="<p>Write about the causes of the First World War.</p>",
+                ),
+            ]
+        )
+        db_session.commit()
+
+        index = SearchIndex(db_session)
+        for course in (chemistry, history):
+            index.index_syllabus(course)
+            for assignment in course.assignments:
+                index.index_assignment(assignment, course)
+        db_session.commit()
+        return index
+
+    def test_tokenize_drops_stopwords(self):
+        assert tokenize("When is the Midterm exam in CHEM 101?") == [
+            "midterm",
+            "exam",
+            "chem",
+            "101",
+        ]
+
+    def test_search_ranks_relevant_passage_first(self, index):
+        results = index.search("titration acid")
+        assert results[0]["source_type"] == "assignment"
+        assert results[0]["source_id"] == 100
+        assert "Due: 2026-11-02" in results[0]["title"]
+
+    def test_search_spans_courses_and_boosts_context_course(self, index):
+        results = index.search("midterm")
+        assert {r["course_id"] for r in results} == {10, 20}
+
+        boosted = index.search("midterm", boost_course_id=20)
+        assert boosted[0]["course_id"] == 20
+
+    def test_unchanged_documents_are_not_reindexed(self, index, db_session):
+        course = db_session.query(Course).filter(Course.canvas_course_id == 10).one()
+        assert index.index_syllabus(course) is False
+        assert SearchIndex(db_session).index_syllabus(course) is False
+
+    def test_changed_document_replaces_its_passages(self, index, db_session):
+        course = db_session.query(Course).filter(Course.canvas_course_id == 20).one()
+        course.syllabus_body = "<p>Weekly quizzes on Mondays.</p>"
+        assert index.index_syllabus(course) is True
+        db_session.commit()
+
+        assert index.search("essays") == []
+        assert index.search("quizzes")[0]["course_id"] == 20
+        passages = db_session.query(SearchPassage).filter(SearchPassage.source_id == 20).all()
+        assert len(passages) == 1
+        # No postings left behind for the old passage
+        assert db_session.query(SearchPosting).filter(SearchPosting.term == "essays").count() == 0
+
+    def test_build_context_respects_token_budget(self, index):
+        context = index.build_context("midterm exam grading", token_budget=30)
+        assert context
+        assert len(context) <= 30 * 4
+        assert index.build_context("the and of", token_budget=100) == ""
@@ -0,0 +1,106 @@
+"""
+Tests for the deterministic study plan solver
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from backend.models import Assignment, Course
+from backend.services.mock_llm_service import MockCanvasLLMService
+from backend.services.study_planner import estimate_hours, plan_study_schedule
+
+NOW = datetime(2026, 10, 19, 9, 0, tzinfo=timezone.utc)
+
+
+def _assignment(assignment_id, name, due_in_days, points=None):
+    return SimpleNamespace(
+        canvas_assignment_id=assignment_id,
+        name=name,
+        due_at=NOW + timedelta(days=due_in_days, hours=14),
+        points_possible=points,
+        course=SimpleNamespace(name="Chemistry"),
+    )
+
+
+class TestStudyPlanner:
+    """Test packing, deadlines, the daily cap and overload handling"""
+
+    def test_estimate_hours(self):
+        assert estimate_hours("Quiz 3", None) == 1.5
+        assert estimate_hours("Final Project", 100) == 16.0
+        assert estimate_hours("Reading response", 10) == 1.0
+
+    def test_work_is_done_before_due_and_under_cap(self):
+        assignments = [
+            _assignment(1, "Homework 1", 2, points=20),
+            _assignment(2, "Lab Report", 4, points=50),
+            _assignment(3, "Midterm Exam", 6, points=100),
+        ]
+        plan = plan_study_schedule(assignments, days_ahead=7, daily_hours=4, now=NOW)
+
+        due_dates = {a.canvas_assignment_id: a.due_at.date() for a in assignments}
+        for day in plan["daily_plan"]:
+            assert day["total_hours"] <= 4
+            for task in day["tasks"]:
+                assert day["date"] < due_dates[task["assignment_id"]].isoformat()
+
+        planned = {}
+        for day in plan["daily_plan"]:
+            for task in day["tasks"]:
+                planned[task["assignment_id"]] = (
+                    planned.get(task["assignment_id"], 0) + task["estimated_hours"]
+                )
+        assert planned == {1: 1.0, 2: 3.0, 3: 12.0}
+        assert plan["unscheduled"] == []
+        assert plan["total_estimated_hours"] == 16.0
+
+    def test_overload_cuts_lowest_priority_work(self):
+        assignments = [
+            _assignment(1, "Big Project", 1, points=100),
+            _assignment(2, "Small Homework", 1, points=5),
+        ]
+        plan = plan_study_schedule(assignments, days_ahead=3, daily_hours=4, now=NOW)
+
+        assert plan["total_estimated_hours"] == 4.0
+        assert [t["assignment_id"] for t in plan["daily_plan"][0]["tasks"]] == [1]
+        short = {item["assignment_id"]: item["hours_short"] for item in plan["unscheduled"]}
+        assert short == {1: 12.0, 2: 1.0}
+        assert plan["study_strategy"] == "sprint"
+
+    def test_deterministic(self):
+        assignments = [_assignment(i, f"Homework {i}", i % 5, points=i) for i in range(20)]
+        first = plan_study_schedule(assignments, days_ahead=7, daily_hours=3, now=NOW)
+        second = plan_study_schedule(
+            list(reversed(assignments)), days_ahead=7, daily_hours=3, now=NOW
+        )
+        assert first == second
+
+    def test_hundreds_of_assignments_in_milliseconds(self):
+        assignments = [
+            _assignment(i, f"Assignment {i}", i % 30, points=(i * 7) % 100) for i in range(500)
+        ]
+        started = time.perf_counter()
+        plan = plan_study_schedule(assignments, days_ahead=30, daily_hours=6, now=NOW)
+        assert (time.perf_counter() - started) < 0.2
+        assert all(day["total_hours"] <= 6 for day in plan["daily_plan"])
+
+    def test_mock_service_uses_solver(self, db_session):
+        course = Course(canvas_course_id=10, name="Chemistry")
+        db_session.add(course)
+        db_session.flush()
+        db_session.add(
+            Assignment(
+                canvas_assignment_id=100,
+                course_id=course.id,
+                name="Quiz 1",
+                due_at=datetime.now(timezone.utc) + timedelta(days=3),
+            )
+        )
+        db_session.commit()
+
+        result = MockCanvasLLMService(db_session).generate_study_plan(1, days_ahead=7)
+        tasks = [t for day in result["study_plan"]["daily_plan"] for t in day["tasks"]]
+        assert tasks[0]["task"] == "Study for Quiz 1"
+        assert tasks[0]["course"] == "Chemistry"
+        assert result["study_plan"]["total_estimated_hours"] == 1.5
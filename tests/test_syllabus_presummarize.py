@@ -0,0 +1,104 @@
+"""
+Tests for sync-triggered background syllabus summarization
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from backend.config import get_settings
+from backend.models import Course, Job, SyncRun
+from backend.services import sync_service as sync_module
+from backend.services.job_handlers import summarize_syllabus_job
+from backend.services.job_queue import JobQueue
+from backend.services.mock_llm_service import MockCanvasLLMService
+from backend.services.sync_service import CanvasSyncService
+
+
+class _FakeCanvasUser:
+    def __init__(self, courses):
+        self._courses = courses
+
+    def get_courses(self, **kwargs):
+        return list(self._courses)
+
+
+class _FakeCanvas:
+    def __init__(self, courses):
+        self.courses = courses
+
+    def get_current_user(self):
+        return _FakeCanvasUser(self.courses)
+
+
+def _canvas_course(course_id, syllabus):
+    return SimpleNamespace(
+        id=course_id,
+        name=f"Course {course_id}",
+        course_code=f"C{course_id}",
+        workflow_state="available",
+        syllabus_body=syllabus,
+    )
+
+
+class TestSyllabusPresummarize:
+    """Sync enqueues summaries for changed syllabi; the job fills the cache"""
+
+    @pytest.fixture
+    def sync_service(self, db_session, monkeypatch):
+        settings = get_settings()
+        monkeypatch.setattr(settings, "canvas_api_url", "https://canvas.example.edu")
+        monkeypatch.setattr(settings, "canvas_api_key", "test-key")
+        service = CanvasSyncService(db_session)
+        service.canvas = _FakeCanvas([_canvas_course(1, "<p>v1</p>"), _canvas_course(2, None)])
+        return service
+
+    def _summary_jobs(self, db_session):
+        return db_session.query(Job).filter(Job.job_type == "summarize_syllabus").all()
+
+    def test_sync_enqueues_only_changed_syllabi(self, sync_service, db_session):
+        sync_service.sync_courses(user_id=1)
+        jobs = self._summary_jobs(db_session)
+        assert [job.payload for job in jobs] == ['{"course_id": 1}']
+        assert jobs[0].priority == get_settings().syllabus_summary_priority
+
+        course = db_session.query(Course).filter(Course.canvas_course_id == 1).one()
+        assert course.syllabus_summary_status == "pending"
+
+        # Unchanged syllabus: no new job; changed syllabus: deduped against the queued one
+        sync_service.sync_courses(user_id=1)
+        sync_service.canvas.courses[0].syllabus_body = "<p>v2</p>"
+        sync_service.sync_courses(user_id=1)
+        assert len(self._summary_jobs(db_session)) == 1
+
+    def test_caches_are_invalidated_only_after_the_sync_finishes(
+        self, sync_service, db_session, monkeypatch
+    ):
+        statuses = []
+        monkeypatch.setattr(
+            sync_module,
+            "bump_sync_generation",
+            lambda: statuses.append(db_session.query(SyncRun.status).one()[0]),
+        )
+        sync_service.sync_courses(user_id=1)
+        # The "running" row is committed without a bump; the finishing commit bumps once
+        assert statuses[0] == "completed"
+
+    def test_job_marks_ready_and_endpoint_reads_cache(self, sync_service, db_session):
+        sync_service.sync_courses(user_id=1)
+        result = summarize_syllabus_job(db_session, course_id=1)
+        assert result == {"course_id": 1, "cached": False}
+
+        course = db_session.query(Course).filter(Course.canvas_course_id == 1).one()
+        assert course.syllabus_summary_status == "ready"
+        assert MockCanvasLLMService(db_session).summarize_syllabus(1)["cached"] is True
+
+    def test_claim_respects_type_limits(self, db_session):
+        queue = JobQueue(db_session)
+        for course_id in (1, 2):
+            queue.enqueue("summarize_syllabus", {"course_id": course_id}, priority=10)
+        queue.enqueue("full_sync", {"user_id": 1})
+
+        claimed = queue.claim_next(limit=5, type_limits={"summarize_syllabus": 1})
+        assert [job.job_type for job in claimed] == ["full_sync", "summarize_syllabus"]
+        assert queue.claim_next(limit=5, type_limits={"summarize_syllabus": 1}) == []
@@ -0,0 +1,177 @@
+"""
+Tests for the Prometheus-format operational metrics behind /internal/metrics
+"""
+
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.llm_dispatcher import LLMDispatcher
+from backend.services.response_cache import LRUCache, ResponseCache
+from backend.services.telemetry import (
+    CACHE_LOOKUPS,
+    CANVAS_PAGES,
+    LLM_TOKENS,
+    Registry,
+    canvas_endpoint,
+    instrument_canvas,
+)
+
+# name{labels} value, as Prometheus parses it
+SAMPLE_LINE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_]\w*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+def _samples(text):
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+def _app_metrics():
+    response = TestClient(app).get("/internal/metrics")
+    assert response.status_code == 200
+    return response.text
+
+
+class TestRegistry:
+    """Test the text format of counters and histograms"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        histogram = registry.histogram("job_seconds", "Job time.", ("job",), buckets=(1, 5))
+        for value in (0.5, 1.0, 3, 30):
+            histogram.observe(value, job="sync")
+
+        assert registry.render().splitlines() == [
+            "# HELP job_seconds Job time.",
+            "# TYPE job_seconds histogram",
+            'job_seconds_bucket{job="sync",le="1"} 2',
+            'job_seconds_bucket{job="sync",le="5"} 3',
+            'job_seconds_bucket{job="sync",le="+Inf"} 4',
+            'job_seconds_sum{job="sync"} 34.5',
+            'job_seconds_count{job="sync"} 4',
+        ]
+
+    def test_counter_labels_are_escaped_and_checked(self):
+        registry = Registry()
+        counter = registry.counter("calls_total", "Calls.", ("path",))
+        counter.inc(path='a"b\\c')
+        counter.inc(2, path='a"b\\c')
+
+        assert 'calls_total{path="a\\"b\\\\c"} 3' in registry.render()
+        with pytest.raises(ValueError):
+            counter.inc(route="/")
+
+    def test_failing_collector_is_skipped(self):
+        registry = Registry()
+        registry.counter("calls_total", "Calls.").inc()
+
+        def broken():
+            raise RuntimeError("down")
+
+        registry.add_collector(broken)
+        assert registry.render().endswith("calls_total 1\n")
+
+    @pytest.mark.benchmark
+    def test_scrape_stays_cheap(self):
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route", "status"))
+        for route in range(100):
+            for status in (200, 404, 500):
+                histogram.observe(0.02, route=f"/r{route}", status=status)
+
+        started = time.perf_counter()
+        for _ in range(10):
+            registry.render()
+        assert (time.perf_counter() - started) / 10 < 0.05
+
+
+class TestInstrumentation:
+    """Test the Canvas, LLM and cache hooks"""
+
+    def test_canvas_endpoint_label(self):
+        assert canvas_endpoint("courses/123/assignments?per_page=100") == "courses/:id/assignments"
+        assert canvas_endpoint("/users/self/courses") == "users/self/courses"
+        assert canvas_endpoint(None) == "unknown"
+
+    def test_canvas_calls_and_pages(self):
+        def request(method, endpoint=None, **kwargs):
+            if endpoint == "courses/7":
+                raise RuntimeError("Not Found")
+            headers = {"Link": '<...>; rel="next"'} if "assignments" in endpoint else {}
+            return SimpleNamespace(status_code=200, headers=headers)
+
+        requester = SimpleNamespace(request=request)
+        canvas = instrument_canvas(SimpleNamespace(_Canvas__requester=requester))
+        instrument_canvas(canvas)  # idempotent
+        before = CANVAS_PAGES.value(endpoint="courses/:id/assignments")
+
+        requester.request("GET", "courses/1/assignments")
+        requester.request("GET", "courses/2/assignments?page=2")
+        requester.request("GET", "users/self")
+        with pytest.raises(RuntimeError):
+            requester.request("GET", "courses/7")
+
+        assert CANVAS_PAGES.value(endpoint="courses/:id/assignments") == before + 2
+        text = _app_metrics()
+        assert (
+            'canvas_api_request_duration_seconds_count{method="GET",endpoint="courses/:id",status="error"}'
+            in text
+        )
+
+    def test_llm_tokens_from_usage_metadata(self):
+        class FakeLLM:
+            model_name = "fake-model"
+
+            def invoke(self, messages):
+                return SimpleNamespace(usage_metadata={"input_tokens": 12, "output_tokens": 5})
+
+            def stream(self, messages):
+                yield SimpleNamespace(content="a", usage_metadata=None)
+                yield SimpleNamespace(
+                    content="", usage_metadata={"input_tokens": 3, "output_tokens": 2}
+                )
+
+        dispatcher = LLMDispatcher(max_concurrency=2)
+        before = LLM_TOKENS.value(model="fake-model", direction="input")
+        dispatcher.invoke(FakeLLM(), ["hi"])
+        assert len(list(dispatcher.stream(FakeLLM(), ["hi"]))) == 2
+
+        assert LLM_TOKENS.value(model="fake-model", direction="input") == before + 15
+        text = _app_metrics()
+        assert (
+            'llm_request_duration_seconds_count{model="fake-model",mode="stream",outcome="ok"}'
+            in text
+        )
+
+    def test_response_cache_lookups(self):
+        cache = ResponseCache(LRUCache(max_entries=10, ttl_seconds=60))
+        hits = CACHE_LOOKUPS.value(cache="response", result="hit")
+        misses = CACHE_LOOKUPS.value(cache="response", result="miss")
+        for _ in range(3):
+            cache.get_or_compute("metrics", 1, {}, lambda: {"n": 1})
+
+        assert CACHE_LOOKUPS.value(cache="response", result="hit") == hits + 2
+        assert CACHE_LOOKUPS.value(cache="response", result="miss") == misses + 1
+
+
+class TestMetricsEndpoint:
+    """Test /internal/metrics against the app"""
+
+    def test_exposes_request_histograms_and_pool_gauges(self):
+        client = TestClient(app)
+        client.get("/health")
+        client.get("/no/such/page")
+        response = client.get("/internal/metrics")
+
+        assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+        text = response.text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+        )
+        assert 'route="unmatched",status="404"' in text
+        assert 'db_pool_checkouts_total{database="primary"}' in text
+        assert "llm_dispatcher_queue_depth 0" in text
+        assert all(SAMPLE_LINE.match(line) for line in _samples(text))